@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import async_views
+
+# Served ahead of urls.py under ASGI; see todo_web_application.asgi_urls
+urlpatterns = [
+    path('api/tasks/', async_views.task_list, name='task-list'),
+    path('api/tasks/<int:pk>/', async_views.task_detail, name='task-detail'),
+    path('api/notifications/', async_views.notification_list, name='notification-list'),
+    path('api/notifications/unread_count/', async_views.notification_unread_count,
+         name='notification-unread-count'),
+    path('api/stats/', async_views.task_stats, name='task_stats'),
+    path('api/dashboard-stats/', async_views.get_dashboard_stats, name='dashboard_stats'),
+]
@@ -0,0 +1,91 @@
+"""
+Async variants of the read endpoints the dashboard polls, served under ASGI.
+
+``todo_web_application.asgi_urls`` routes the task and notification lists,
+task detail, the unread count and both stats endpoints here when the app
+runs under ASGI. Authentication, the stats aggregate, the unread counter and
+task lookups go through the async ORM, so a request only needs the sync
+thread for its queries, not for authentication, serialization or
+rendering. Writes, other methods and browsable API requests fall back to
+the DRF views in ``views``, which still serve everything under WSGI.
+Responses are the same as those views give, ETags included.
+"""
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import NotFound
+
+from todo_web_application.async_api import async_api_view, json_response, root_urlconf_view
+
+from .counters import aget_unread_count
+from .serializers import NotificationSerializer, TaskRowSerializer, TaskSerializer
+from .stats import aget_task_stats, dashboard_stats_data, parse_days, task_stats_data
+from .versioning import NOTIFICATIONS, TASKS, conditional_collection
+from .views import NotificationViewSet, TaskViewSet
+
+
+def _viewset(viewset_class, api_request, action, **kwargs):
+    """A viewset instance, for its queryset, filters and paginator"""
+    return viewset_class(request=api_request, args=(), kwargs=kwargs, format_kwarg=None, action=action)
+
+
+async def _page(view, prepare=None):
+    """
+    The page of ``view``'s filtered queryset, ``prepare``d first if given.
+    Full-text search counts matches and the cursor paginator evaluates the
+    queryset itself, so the whole page is read in one hop to the sync
+    thread, as an async query would be.
+    """
+    def page():
+        queryset = view.filter_queryset(view.get_queryset())
+        return view.paginate_queryset(prepare(queryset) if prepare else queryset)
+    return await sync_to_async(page)()
+
+
+@async_api_view(methods=['GET'], authenticated=True, fallback=root_urlconf_view)
+@conditional_collection(TASKS)
+async def task_list(request, api_request):
+    """TaskViewSet.list"""
+    view = _viewset(TaskViewSet, api_request, 'list')
+    page = await _page(view, TaskRowSerializer.values)
+    return json_response(view.get_paginated_response(TaskRowSerializer().serialize(page)).data)
+
+
+@async_api_view(methods=['GET'], authenticated=True, fallback=root_urlconf_view)
+async def task_detail(request, api_request, pk):
+    """TaskViewSet.retrieve"""
+    view = _viewset(TaskViewSet, api_request, 'retrieve', pk=pk)
+    # ?search= and ?ordering= only apply to the list here
+    task = await view.get_queryset().filter(pk=pk).afirst()
+    if task is None:
+        raise NotFound('No Task matches the given query.')
+    return json_response(TaskSerializer(task).data)
+
+
+@async_api_view(methods=['GET'], authenticated=True, fallback=root_urlconf_view)
+@conditional_collection(NOTIFICATIONS, per_minute=True)
+async def notification_list(request, api_request):
+    """NotificationViewSet.list"""
+    view = _viewset(NotificationViewSet, api_request, 'list')
+    page = await _page(view)
+    return json_response(view.get_paginated_response(NotificationSerializer(page, many=True).data).data)
+
+
+@async_api_view(methods=['GET'], authenticated=True, fallback=root_urlconf_view)
+@conditional_collection(NOTIFICATIONS)
+async def notification_unread_count(request, api_request):
+    """NotificationViewSet.unread_count"""
+    return json_response({'unread': await aget_unread_count(request.user.id)})
+
+
+@async_api_view(methods=['GET'], authenticated=True, fallback=root_urlconf_view)
+@conditional_collection(TASKS)
+async def get_dashboard_stats(request, api_request):
+    """Get comprehensive dashboard statistics"""
+    days = parse_days(api_request.query_params.get('days'))
+    return json_response(dashboard_stats_data(await aget_task_stats(request.user, days=days)))
+
+
+@async_api_view(methods=['GET'], authenticated=True, fallback=root_urlconf_view)
+@conditional_collection(TASKS)
+async def task_stats(request, api_request):
+    """Get task statistics for the current user"""
+    return json_response(task_stats_data(await aget_task_stats(request.user)))
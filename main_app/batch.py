@@ -0,0 +1,113 @@
+"""
+Batched task writes.
+
+A batch is a list of create / partial update / delete operations. The whole
+batch is validated with list serializers and applied in one transaction,
+which locks the tasks it updates or deletes, with a single
+``bulk_create``, ``bulk_update`` and DELETE, so a thousand-item import
+costs a handful of queries instead of a thousand.
+Either every operation is applied or none is.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import notifications
+from .models import Task
+from .serializers import TaskBatchOperationSerializer, TaskSerializer
+from .sync import delete_tasks
+from .versioning import TASKS, mark_changed
+
+
+def _collect_errors(errors, positions, list_errors):
+    """Attach list serializer errors to the operations they belong to"""
+    for position, item_errors in zip(positions, list_errors):
+        if item_errors:
+            # Keep an id error already found for the same operation
+            errors.setdefault(position, {})['data'] = item_errors
+
+
+def apply_task_batch(user, payload):
+    """
+    Validate and apply a batch of task operations for ``user``.
+
+    Returns ``(results, errors)``. ``errors`` maps operation index to its
+    validation errors; when it is non-empty nothing was written.
+    """
+    max_operations = settings.TASK_BATCH_MAX_OPERATIONS
+    if not isinstance(payload, list) or not payload:
+        return [], {'non_field_errors': ['Expected a non-empty list of operations']}
+    if len(payload) > max_operations:
+        return [], {'non_field_errors': [f'At most {max_operations} operations per batch']}
+
+    operations = TaskBatchOperationSerializer(data=payload, many=True)
+    if not operations.is_valid():
+        return [], {index: e for index, e in enumerate(operations.errors) if e}
+    operations = operations.validated_data
+
+    errors = {}
+    creates, updates, deletes = [], [], []
+    seen_ids = set()
+    for index, operation in enumerate(operations):
+        if operation['op'] == 'create':
+            creates.append(index)
+            continue
+        if operation['id'] in seen_ids:
+            errors[index] = {'id': ['Task appears more than once in this batch']}
+            continue
+        seen_ids.add(operation['id'])
+        (updates if operation['op'] == 'update' else deletes).append(index)
+
+    with transaction.atomic():
+        # Locked until the batch commits, so updates are applied to (and
+        # notifications diffed against) the rows as they are now, and a
+        # concurrent edit is not overwritten with stale values
+        existing = Task.objects.select_for_update().filter(user=user, id__in=seen_ids).in_bulk()
+        for index in updates + deletes:
+            if operations[index]['id'] not in existing:
+                errors[index] = {'id': ['Task not found']}
+
+        create_data = TaskSerializer(data=[operations[i]['data'] for i in creates], many=True)
+        if not create_data.is_valid():
+            _collect_errors(errors, creates, create_data.errors)
+        update_data = TaskSerializer(data=[operations[i]['data'] for i in updates], many=True, partial=True)
+        if not update_data.is_valid():
+            _collect_errors(errors, updates, update_data.errors)
+
+        if errors:
+            return [], errors
+
+        now = timezone.now()
+        new_tasks = [Task(user=user, **data) for data in create_data.validated_data]
+        changed_tasks = []
+        changed_fields = {'updated_at'}
+        for index, data in zip(updates, update_data.validated_data):
+            task = existing[operations[index]['id']]
+            for field, value in data.items():
+                setattr(task, field, value)
+            # bulk_update() does not apply auto_now
+            task.updated_at = now
+            changed_fields.update(data)
+            changed_tasks.append(task)
+        delete_ids = [operations[index]['id'] for index in deletes]
+
+        if new_tasks:
+            Task.objects.bulk_create(new_tasks)
+            notifications.tasks_created(new_tasks)
+        if changed_tasks:
+            Task.objects.bulk_update(changed_tasks, sorted(changed_fields))
+            notifications.tasks_updated(changed_tasks)
+        if delete_ids:
+            delete_tasks(user, Task.objects.filter(id__in=delete_ids))
+        # Bulk writes skip the save signals, so notifications are emitted
+        # above and the version bump here
+        mark_changed(user.id, TASKS)
+
+    results = [None] * len(operations)
+    for index, task in zip(creates, new_tasks):
+        results[index] = {'op': 'create', 'status': 'created', 'task': task}
+    for index, task in zip(updates, changed_tasks):
+        results[index] = {'op': 'update', 'status': 'updated', 'task': task}
+    for index in deletes:
+        results[index] = {'op': 'delete', 'status': 'deleted', 'id': operations[index]['id']}
+    return results, {}
@@ -0,0 +1,77 @@
+"""
+Per-user unread notification counters.
+
+Every write path adjusts ``NotificationCounter`` in the same transaction
+as the notification rows, so the badge is a primary key lookup instead of
+a COUNT over the user's notifications. A missing counter is rebuilt from
+a count on first read, and ``reconcile_unread`` (run by the retention
+command) repairs any drift from writes that bypass the API, such as the
+admin.
+"""
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, NotificationCounter
+
+
+def adjust_unread(user_id, delta):
+    """Add ``delta`` to the user's unread count, never going below zero"""
+    if delta:
+        NotificationCounter.objects.filter(user_id=user_id).update(
+            unread=Greatest(F('unread') + delta, 0)
+        )
+
+
+def reset_unread(user_id):
+    NotificationCounter.objects.filter(user_id=user_id).update(unread=0)
+
+
+def get_unread_count(user_id):
+    """The user's unread count, initialising the counter if it is missing"""
+    unread = (
+        NotificationCounter.objects.filter(user_id=user_id)
+        .values_list('unread', flat=True)
+        .first()
+    )
+    if unread is None:
+        unread = Notification.objects.filter(user_id=user_id, read=False).count()
+        counter, _ = NotificationCounter.objects.get_or_create(
+            user_id=user_id, defaults={'unread': unread}
+        )
+        unread = counter.unread
+    return unread
+
+
+async def aget_unread_count(user_id):
+    """``get_unread_count`` for async views"""
+    unread = await (
+        NotificationCounter.objects.filter(user_id=user_id)
+        .values_list('unread', flat=True)
+        .afirst()
+    )
+    if unread is None:
+        unread = await Notification.objects.filter(user_id=user_id, read=False).acount()
+        counter, _ = await NotificationCounter.objects.aget_or_create(
+            user_id=user_id, defaults={'unread': unread}
+        )
+        unread = counter.unread
+    return unread
+
+
+def reconcile_unread(user_ids):
+    """Recount unread notifications for ``user_ids`` and fix counters that drifted"""
+    actual = dict(
+        Notification.objects.filter(user_id__in=user_ids, read=False)
+        .values_list('user_id')
+        .annotate(unread=Count('id'))
+        .order_by()
+    )
+    counters = NotificationCounter.objects.in_bulk(user_ids)
+    stale = []
+    for user_id, counter in counters.items():
+        unread = actual.get(user_id, 0)
+        if counter.unread != unread:
+            counter.unread = unread
+            stale.append(counter)
+    NotificationCounter.objects.bulk_update(stale, ['unread'])
+    return len(stale)
@@ -0,0 +1,119 @@
+"""
+Change events pushed to connected clients.
+
+Writers call ``publish`` (from any thread, usually after commit) and the
+Server-Sent Events endpoint consumes a per-user ``subscribe`` stream. The
+broadcast layer is chosen by EVENT_BROADCAST_BACKEND. The default
+``InProcessBroadcast`` only reaches clients connected to the same process;
+a multi-node deployment swaps in a backend built on a shared pub/sub
+channel by implementing the ``BaseBroadcast`` interface.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseBroadcast:
+    """Interface every broadcast backend implements"""
+
+    def publish(self, user_id, event):
+        """Deliver ``event`` (a JSON-serializable dict) to the user's subscribers"""
+        raise NotImplementedError
+
+    def has_subscribers(self, user_id):
+        """Whether building an event for this user is worth it"""
+        return True
+
+    def subscribe(self, user_id):
+        """Return a Subscription for the user, to be used with ``async with``"""
+        raise NotImplementedError
+
+
+class Subscription:
+    """An asyncio queue of events for one connected client"""
+
+    def __init__(self, broadcast, user_id, maxsize):
+        self.broadcast = broadcast
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.broadcast._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broadcast._remove(self)
+
+    def put(self, event):
+        """Called on the subscriber's event loop; drops the oldest event when full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        """Next event, or None if nothing arrived within ``timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroadcast(BaseBroadcast):
+    """Fan events out to subscribers held in this process's memory"""
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.EVENT_STREAM_QUEUE_SIZE
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def _add(self, subscription):
+        with self._lock:
+            self._subscribers[subscription.user_id].add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscribers
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            # Publishers run in sync threads; hand over to the subscriber's loop
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Loop already closed; the subscription is being torn down
+                pass
+
+    def subscribe(self, user_id):
+        return Subscription(self, user_id, self.queue_size)
+
+
+_broadcast = None
+_broadcast_lock = threading.Lock()
+
+
+def get_broadcast():
+    """The process-wide broadcast backend configured in settings"""
+    global _broadcast
+    if _broadcast is None:
+        with _broadcast_lock:
+            if _broadcast is None:
+                _broadcast = import_string(settings.EVENT_BROADCAST_BACKEND)()
+    return _broadcast
+
+
+def publish(user_id, event_type, data):
+    get_broadcast().publish(user_id, {'type': event_type, 'data': data})
@@ -0,0 +1,80 @@
+"""
+Streaming task export.
+
+Rows are read as ``values()`` with ``QuerySet.iterator()`` (a server-side
+cursor where the database supports one) and serialized one chunk at a
+time by the TaskRowSerializer fast path, so memory use depends on the
+chunk size rather than on how many tasks the user has. Under ASGI the
+exporters are wrapped in ``aiter_chunks``, as Django 4.2 reads a sync
+iterator to the end before sending any of it there.
+"""
+import csv
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import TaskRowSerializer, TaskSerializer
+
+EXPORT_FIELDS = TaskSerializer.Meta.fields
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def _chunks(queryset, chunk_size):
+    serializer = TaskRowSerializer()
+    chunk = []
+    for row in TaskRowSerializer.values(queryset).iterator(chunk_size=chunk_size):
+        chunk.append(serializer.to_representation(row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_ndjson(queryset, chunk_size=None):
+    """One JSON object per line, one yield per chunk"""
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for rows in _chunks(queryset, chunk_size or settings.EXPORT_CHUNK_SIZE):
+        yield ''.join(encoder.encode(row) + '\n' for row in rows)
+
+
+def iter_csv(queryset, chunk_size=None):
+    """A header line, then one CSV line per task, one yield per chunk"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for rows in _chunks(queryset, chunk_size or settings.EXPORT_CHUNK_SIZE):
+        yield ''.join(writer.writerow([row[field] for field in EXPORT_FIELDS]) for row in rows)
+
+
+async def aiter_chunks(chunks):
+    """
+    ``chunks`` as an async iterator, each chunk read on the request's sync
+    thread, where its server-side cursor lives.
+    """
+    done = object()
+    try:
+        while True:
+            chunk = await sync_to_async(next)(chunks, done)
+            if chunk is done:
+                break
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+EXPORTERS = {
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
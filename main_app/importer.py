@@ -0,0 +1,144 @@
+"""
+Streaming task import.
+
+Uploads are parsed one line (NDJSON) or record (CSV) at a time and
+validated with ``TaskSerializer``'s own field instances, created once per
+import rather than once per row. Valid rows are inserted with fixed-size
+``bulk_create`` batches inside one transaction; invalid rows are skipped
+and reported with their line number. Nothing but the current batch and
+the (capped) error list is held in memory, whatever the upload size.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SkipField, empty
+
+from . import notifications
+from .models import Task
+from .serializers import TaskSerializer
+from .versioning import TASKS, mark_changed
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+
+class InvalidUpload(ValueError):
+    """The upload could not be read at all (bad encoding or broken CSV)"""
+
+
+class TaskRowValidator:
+    """Validate plain dicts against TaskSerializer's writable fields"""
+
+    def __init__(self):
+        serializer = TaskSerializer()
+        self.fields = [field for field in serializer.fields.values() if not field.read_only]
+
+    def validate(self, row):
+        """Return ``(values, None)`` or ``(None, errors)`` for one row"""
+        values, errors = {}, {}
+        for field in self.fields:
+            try:
+                value = field.run_validation(row.get(field.field_name, empty))
+            except SkipField:
+                continue
+            except ValidationError as exc:
+                errors[field.field_name] = exc.detail
+                continue
+            values[field.source] = value
+        return (None, errors) if errors else (values, None)
+
+    def from_csv(self, row):
+        """
+        CSV has no null, so an empty cell means null for nullable fields
+        and "not given" for fields that cannot be blank.
+        """
+        cleaned = dict(row)
+        for field in self.fields:
+            if cleaned.get(field.field_name) != '':
+                continue
+            if field.allow_null:
+                cleaned[field.field_name] = None
+            elif not getattr(field, 'allow_blank', False):
+                del cleaned[field.field_name]
+        return cleaned
+
+
+def _decoded(lines):
+    """Decode byte lines as UTF-8, dropping a leading byte order mark"""
+    first = True
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        yield line
+
+
+def _ndjson_rows(lines, validator):
+    for line_number, line in enumerate(_decoded(lines), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, {'non_field_errors': [f'Invalid JSON: {exc}']}
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, {'non_field_errors': ['Expected a JSON object']}
+            continue
+        yield (line_number, *validator.validate(row))
+
+
+def _csv_rows(lines, validator):
+    reader = csv.DictReader(_decoded(lines))
+    for row in reader:
+        yield (reader.line_num, *validator.validate(validator.from_csv(row)))
+
+
+def _import_rows(user, rows, report, batch_size, max_errors):
+    batch = []
+    for line_number, values, errors in rows:
+        if errors:
+            report['failed'] += 1
+            if len(report['errors']) < max_errors:
+                report['errors'].append({'line': line_number, 'errors': errors})
+            continue
+        batch.append(Task(user=user, **values))
+        if len(batch) >= batch_size:
+            Task.objects.bulk_create(batch)
+            report['created'] += len(batch)
+            batch = []
+    if batch:
+        Task.objects.bulk_create(batch)
+        report['created'] += len(batch)
+
+    if report['created']:
+        # One summary notification instead of one per imported task
+        notifications.tasks_imported(user.id, report['created'])
+        mark_changed(user.id, TASKS)
+
+
+def import_tasks(user, lines, import_format, batch_size=None, max_errors=None):
+    """
+    Import tasks for ``user`` from an iterable of lines (bytes or str).
+
+    Returns a report with the number of tasks created and failed, and the
+    first ``max_errors`` row errors keyed by line number.
+    """
+    batch_size = batch_size or settings.TASK_IMPORT_BATCH_SIZE
+    max_errors = settings.TASK_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+    validator = TaskRowValidator()
+    parse = _csv_rows if import_format == 'csv' else _ndjson_rows
+    report = {'created': 0, 'failed': 0, 'errors': []}
+
+    try:
+        with transaction.atomic():
+            _import_rows(user, parse(lines, validator), report, batch_size, max_errors)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise InvalidUpload(str(exc)) from exc
+
+    report['errors_truncated'] = report['failed'] > len(report['errors'])
+    return report
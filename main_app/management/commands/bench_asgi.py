@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from importlib import import_module
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+
+from todo_web_application.bench import committed_bench_user, seed_tasks, summarize
+
+PASSWORD = 'bench-password'
+
+# What the dashboard polls
+PATHS = [
+    '/tasko/api/tasks/',
+    '/tasko/api/stats/',
+    '/tasko/api/dashboard-stats/',
+    '/tasko/api/notifications/',
+    '/tasko/api/notifications/unread_count/',
+]
+
+
+class Command(BaseCommand):
+    help = "Compare req/s and latency of the dashboard API under WSGI and ASGI"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Requests per deployment and concurrency level')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+        parser.add_argument('--tasks', type=int, default=500)
+
+    def handle(self, *args, **options):
+        # Both test clients send Host: testserver
+        with committed_bench_user() as user, override_settings(ALLOWED_HOSTS=['testserver']):
+            seed_tasks(user, options['tasks'])
+            login = Client()
+            login.post('/useraccounts/api/user/login/', {'email': user.email, 'password': PASSWORD},
+                       content_type='application/json')
+            cookies = login.cookies
+
+            deployments = [
+                # A threaded WSGI server: one thread per request in flight
+                ('wsgi', self.run_wsgi),
+                # One ASGI worker, every view running on its sync thread
+                ('asgi sync views', self.run_asgi_sync),
+                # One ASGI worker with the async views in asgi_urls
+                ('asgi async views', self.run_asgi),
+            ]
+            try:
+                for label, run in deployments:
+                    for concurrency in options['concurrency']:
+                        timings, elapsed = run(cookies, options['requests'], concurrency)
+                        self.stdout.write(
+                            f"{label:<16} c={concurrency:<3} {len(timings) / elapsed:>7.1f} req/s, "
+                            f"{summarize(timings)}"
+                        )
+            finally:
+                engine = import_module(settings.SESSION_ENGINE)
+                engine.SessionStore(cookies[settings.SESSION_COOKIE_NAME].value).delete()
+
+    def run_wsgi(self, cookies, total, concurrency):
+        timings = []
+        queue = iter(range(total))
+        lock = threading.Lock()
+
+        def worker():
+            client = Client()
+            client.cookies = cookies
+            try:
+                while True:
+                    with lock:
+                        i = next(queue, None)
+                    if i is None:
+                        return
+                    start = time.perf_counter()
+                    response = client.get(PATHS[i % len(PATHS)])
+                    timings.append((time.perf_counter() - start) * 1000)
+                    assert response.status_code == 200, response.status_code
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, time.perf_counter() - start
+
+    def run_asgi_sync(self, cookies, total, concurrency):
+        with override_settings(ASGI_URLCONF=settings.ROOT_URLCONF):
+            return self.run_asgi(cookies, total, concurrency)
+
+    def run_asgi(self, cookies, total, concurrency):
+        return async_to_sync(self._run_asgi)(cookies, total, concurrency)
+
+    async def _run_asgi(self, cookies, total, concurrency):
+        timings = []
+        queue = iter(range(total))
+
+        async def worker():
+            client = AsyncClient()
+            client.cookies = cookies
+            for i in queue:
+                start = time.perf_counter()
+                response = await client.get(PATHS[i % len(PATHS)])
+                timings.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.status_code
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return timings, time.perf_counter() - start
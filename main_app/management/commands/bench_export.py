@@ -0,0 +1,68 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from main_app.models import Task
+from main_app.serializers import TaskSerializer
+from todo_web_application.bench import create_bench_user, rolled_back, seed_tasks
+
+PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = "Measure streaming export time and peak memory against an in-memory list"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000,
+                            help='Tasks to seed and export')
+        parser.add_argument('--baseline-rows', type=int, default=100_000,
+                            help='Tasks serialized into one list for comparison (0 to skip)')
+
+    def measure(self, label, rows, func):
+        """Time ``func`` untraced, then run it again under tracemalloc for the peak"""
+        start = time.perf_counter()
+        size = func()
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"{label:<28} {elapsed:>7.2f} s, {rows / elapsed:>9.0f} rows/s, "
+            f"{size / 2 ** 20:>8.1f} MiB out, peak {peak / 2 ** 20:>7.1f} MiB"
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with rolled_back():
+            user = create_bench_user()
+            self.stdout.write(f"Seeding {rows} tasks...")
+            seed_tasks(user, rows)
+
+            client = Client(HTTP_HOST='localhost')
+            client.post('/useraccounts/api/user/login/',
+                        {'email': user.email, 'password': PASSWORD},
+                        content_type='application/json')
+
+            def export(export_format):
+                def run():
+                    response = client.get(f'/tasko/api/tasks/export/?as={export_format}')
+                    assert response.status_code == 200, response.status_code
+                    return sum(len(chunk) for chunk in response.streaming_content)
+                return run
+
+            self.measure(f'export ndjson x{rows}', rows, export('ndjson'))
+            self.measure(f'export csv x{rows}', rows, export('csv'))
+
+            baseline = options['baseline_rows']
+            if baseline:
+                def serialize_list():
+                    tasks = Task.objects.filter(user=user)[:baseline]
+                    return len(JSONRenderer().render(TaskSerializer(tasks, many=True).data))
+
+                self.measure(f'in-memory list x{baseline}', baseline, serialize_list)
@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from main_app.importer import import_tasks
+from todo_web_application.bench import create_bench_user, rolled_back
+
+
+class Command(BaseCommand):
+    help = "Measure streaming import throughput and peak memory for a generated file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000,
+                            help='Rows in the generated NDJSON file')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as upload:
+            for i in range(rows):
+                upload.write(json.dumps({
+                    'title': f'Imported task {i}',
+                    'desc': 'Imported from another tool',
+                    'date': '2026-01-01' if i % 3 else None,
+                    'priority': ('high', 'medium', 'low')[i % 3],
+                    'done': i % 4 == 0,
+                    'project': 'work' if i % 2 else None,
+                }) + '\n')
+        size = os.path.getsize(upload.name)
+
+        try:
+            # DEBUG keeps the SQL of the last 9000 queries, which would
+            # dominate the peak for bulk inserts
+            with override_settings(DEBUG=False), rolled_back():
+                user = create_bench_user()
+                tracemalloc.start()
+                start = time.perf_counter()
+                with open(upload.name, 'rb') as lines:
+                    report = import_tasks(user, lines, 'ndjson')
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+        finally:
+            os.unlink(upload.name)
+
+        self.stdout.write(
+            f"imported {report['created']} rows ({size / 2 ** 20:.1f} MiB) in {elapsed:.2f} s "
+            f"under tracemalloc, {report['created'] / elapsed:.0f} rows/s, peak {peak / 2 ** 20:.1f} MiB"
+        )
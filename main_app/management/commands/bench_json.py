@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from rest_framework import renderers
+
+from main_app.views import TaskViewSet
+from todo_web_application.bench import (
+    create_bench_user, rolled_back, seed_tasks, summarize, time_calls,
+)
+from todo_web_application.renderers import JSONRenderer, orjson
+
+PASSWORD = 'bench-password'
+
+ENCODERS = [
+    ('stdlib json', renderers.JSONRenderer),
+    ('orjson', JSONRenderer),
+]
+
+
+class Command(BaseCommand):
+    help = "Compare JSON encoders on the task list endpoint (encode time and full request latency)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1000)
+        parser.add_argument('--page-size', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed; both encoders would be the stdlib one")
+
+        url = f"/tasko/api/tasks/?page_size={options['page_size']}"
+        with rolled_back():
+            user = create_bench_user()
+            seed_tasks(user, options['tasks'])
+
+            client = Client(HTTP_HOST='localhost')
+            client.post('/useraccounts/api/user/login/',
+                        {'email': user.email, 'password': PASSWORD},
+                        content_type='application/json')
+
+            original = TaskViewSet.renderer_classes
+            try:
+                bodies = {}
+                for label, renderer_class in ENCODERS:
+                    TaskViewSet.renderer_classes = [renderer_class]
+                    response = client.get(url)
+                    assert response.status_code == 200, response.status_code
+                    bodies[label] = response.content
+                    data = response.data
+
+                    def encode(renderer=renderer_class()):
+                        return renderer.render(data)
+
+                    def request():
+                        return client.get(url)
+
+                    self.stdout.write(f"{label:<12} encode   {summarize(time_calls(encode, options['repeat']))}")
+                    self.stdout.write(f"{label:<12} request  {summarize(time_calls(request, options['repeat']))}")
+            finally:
+                TaskViewSet.renderer_classes = original
+
+            if len(set(bodies.values())) != 1:
+                raise CommandError("Encoders rendered different responses")
+            size = len(next(iter(bodies.values())))
+            self.stdout.write(f"Responses identical ({size / 1024:.0f} KiB per page)")
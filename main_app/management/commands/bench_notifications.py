@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, TestCase
+
+from main_app.models import Notification, Task
+from main_app.notifications import build_notification
+from todo_web_application.bench import (
+    count_queries, create_bench_user, rolled_back, seed_tasks,
+)
+
+PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = "Measure notification fan-out cost of large bulk task actions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=500,
+                            help='Tasks touched by each bulk action')
+
+    def timed(self, label, user, request):
+        """Run ``request`` plus the on-commit notification writes it queues"""
+        last = Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        start = time.perf_counter()
+
+        def run():
+            # The benchmark never commits, so run the on-commit callbacks
+            # in place to include the notification insert in the timing
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                return request()
+
+        response, queries = count_queries(run)
+        elapsed = time.perf_counter() - start
+        assert response is None or response.status_code in (200, 201), response.content
+        created = Notification.objects.filter(user=user, id__gt=last).count()
+        self.stdout.write(
+            f"{label:<32} {elapsed * 1000:>9.1f} ms, {queries:>5} queries, {created:>5} notifications"
+        )
+
+    def handle(self, *args, **options):
+        count = options['tasks']
+        with rolled_back():
+            user = create_bench_user()
+            client = Client(HTTP_HOST='localhost')
+            client.post('/useraccounts/api/user/login/',
+                        {'email': user.email, 'password': PASSWORD},
+                        content_type='application/json')
+
+            def post(path, data):
+                return lambda: client.post(path, data, content_type='application/json')
+
+            seed_tasks(user, count)
+            Task.objects.filter(user=user).update(done=False, important=False)
+            tasks = list(Task.objects.filter(user=user).values_list('id', 'title'))
+            ids = [task_id for task_id, _ in tasks]
+
+            def one_insert_per_task():
+                for task_id, title in tasks:
+                    build_notification(user.id, 'task_completed', title, task_id).save()
+
+            self.timed(f'baseline: {count} single INSERTs', user, one_insert_per_task)
+
+            self.timed(f'bulk mark_done x{count}', user, post(
+                '/tasko/api/tasks/bulk_update/', {'task_ids': ids, 'action': 'mark_done'}))
+            self.timed(f'bulk mark_done again (no-op)', user, post(
+                '/tasko/api/tasks/bulk_update/', {'task_ids': ids, 'action': 'mark_done'}))
+
+            updates = [{'op': 'update', 'id': task_id, 'data': {'important': True, 'project': 'work'}}
+                       for task_id in ids]
+            self.timed(f'batch update x{count}', user, post('/tasko/api/tasks/batch/', updates))
+
+            self.timed(f'clear_all x{count}', user, post(
+                '/tasko/api/bulk-operations/', {'operation': 'clear_all'}))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from main_app.models import Task
+from main_app.search import TaskSearchFilter
+from main_app.views import TaskViewSet
+from todo_web_application.bench import (
+    create_bench_user, rolled_back, seed_tasks, summarize, time_calls,
+)
+
+# A rare word, a prefix, a word in every row and a two word query
+QUERIES = ['4242', 'gen', 'task', 'description 99']
+
+
+class Command(BaseCommand):
+    help = "Compare ?search= latency of the full-text index against DRF's icontains filter"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        view = TaskViewSet()
+        with rolled_back():
+            user = create_bench_user()
+            self.stdout.write(f"Seeding {options['tasks']} tasks...")
+            seed_tasks(user, options['tasks'])
+
+            for text in QUERIES:
+                request = Request(factory.get('/', {'search': text}))
+                base = Task.objects.filter(user=user)
+                for label, backend in (('icontains', filters.SearchFilter()),
+                                       ('full-text', TaskSearchFilter())):
+                    def first_page(backend=backend):
+                        # What the list endpoint fetches: the first page and
+                        # whether there is a next one
+                        return list(backend.filter_queryset(request, base, view)[:51])
+
+                    rows = len(first_page())
+                    self.stdout.write(
+                        f"{text!r:<18} {label:<10} {rows:>3} rows  "
+                        f"{summarize(time_calls(first_page, options['repeat']))}"
+                    )
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from main_app.models import Task
+from main_app.serializers import TaskRowSerializer, TaskSerializer
+from todo_web_application.bench import create_bench_user, rolled_back, seed_tasks
+
+
+class Command(BaseCommand):
+    help = "Compare TaskSerializer with the TaskRowSerializer fast path (rows/s, identical output)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=20_000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def best_of(self, repeat, func):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        count = options['tasks']
+        renderer = JSONRenderer()
+        with rolled_back():
+            user = create_bench_user()
+            seed_tasks(user, count)
+            queryset = Task.objects.filter(user=user).order_by('-created_at', '-id')
+
+            def full():
+                return TaskSerializer(queryset, many=True).data
+
+            def fast():
+                return TaskRowSerializer().serialize(TaskRowSerializer.values(queryset))
+
+            # The fast path must render the same bytes, in any current timezone
+            for zone in ('UTC', 'Asia/Kolkata'):
+                with timezone.override(zone):
+                    if renderer.render(full()) != renderer.render(fast()):
+                        raise CommandError(f"Fast path output differs from TaskSerializer in {zone}")
+            self.stdout.write(f"Output identical for {count} tasks")
+
+            for label, func in (('TaskSerializer', full), ('TaskRowSerializer', fast)):
+                elapsed = self.best_of(options['repeat'], func)
+                self.stdout.write(f"{label:<18} {elapsed * 1000:>8.1f} ms, {count / elapsed:>9.0f} rows/s")
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main_app.models import Task
+from main_app.stats import compute_task_stats
+from todo_web_application.bench import (
+    count_queries, create_bench_user, rolled_back, seed_tasks, summarize, time_calls,
+)
+
+
+def legacy_stats(user, days=7):
+    """The per-counter queries plus Python loop the stats views used to run"""
+    tasks = Task.objects.filter(user=user)
+    today = timezone.now().date()
+    weekly_tasks = tasks.filter(created_at__date__gte=today - timedelta(days=days))
+    project_stats = {}
+    for task in tasks:
+        if task.project:
+            project_stats[task.project] = project_stats.get(task.project, 0) + 1
+    return {
+        'total': tasks.count(),
+        'completed': tasks.filter(done=True).count(),
+        'pending': tasks.filter(done=False).count(),
+        'overdue': tasks.filter(done=False, date__lt=today).count(),
+        'important': tasks.filter(important=True).count(),
+        'weekly_total': weekly_tasks.count(),
+        'weekly_completed': weekly_tasks.filter(done=True).count(),
+        'priority_stats': {
+            value: tasks.filter(priority=value).count()
+            for value, _ in Task.PRIORITY_CHOICES
+        },
+        'due_soon': tasks.filter(
+            done=False, date__gte=today, date__lte=today + timedelta(days=3)
+        ).count(),
+        'project_stats': project_stats,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark the task stats engine against the legacy per-counter queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, nargs='+', default=[10000, 100000],
+                            help='Task counts per user to benchmark')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for count in options['tasks']:
+            with rolled_back():
+                user = create_bench_user()
+                seed_tasks(user, count)
+                self.stdout.write(f"{count} tasks per user")
+
+                for label, func in (('legacy', legacy_stats), ('engine', compute_task_stats)):
+                    result, queries = count_queries(func, user)
+                    timings = time_calls(func, options['repeat'], user)
+                    self.stdout.write(f"  {label:<7} {queries:>3} queries, {summarize(timings)}")
+
+                expected = legacy_stats(user)
+                actual = compute_task_stats(user)
+                mismatched = [key for key in expected if expected[key] != actual[key]]
+                if mismatched:
+                    self.stderr.write(f"  counters differ: {', '.join(mismatched)}")
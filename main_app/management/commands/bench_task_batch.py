@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from main_app.models import Task
+from todo_web_application.bench import count_queries, create_bench_user, rolled_back
+
+PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = "Measure task batch endpoint throughput against one POST per task"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000,
+                            help='Operations per batch request')
+
+    def timed(self, label, items, request):
+        start = time.perf_counter()
+        response, queries = count_queries(request)
+        elapsed = time.perf_counter() - start
+        assert response.status_code in (200, 201), response.content
+        self.stdout.write(
+            f"{label:<28} {elapsed * 1000:>9.1f} ms, {items / elapsed:>9.0f} items/s, {queries} queries"
+        )
+        return response
+
+    def handle(self, *args, **options):
+        items = options['items']
+        with rolled_back():
+            user = create_bench_user()
+            client = Client(HTTP_HOST='localhost')
+            client.post('/useraccounts/api/user/login/',
+                        {'email': user.email, 'password': PASSWORD},
+                        content_type='application/json')
+
+            def post(path, data):
+                return lambda: client.post(path, data, content_type='application/json')
+
+            def single_creates():
+                for i in range(items):
+                    response = client.post('/tasko/api/tasks/', {'title': f'Single {i}'},
+                                           content_type='application/json')
+                return response
+
+            self.timed(f'{items} single POSTs', items, single_creates)
+
+            creates = [{'op': 'create', 'data': {'title': f'Batch {i}', 'priority': 'high'}}
+                       for i in range(items)]
+            self.timed(f'batch create x{items}', items, post('/tasko/api/tasks/batch/', creates))
+
+            ids = list(Task.objects.filter(user=user, title__startswith='Batch')
+                       .values_list('id', flat=True))
+            updates = [{'op': 'update', 'id': task_id, 'data': {'done': True}} for task_id in ids]
+            self.timed(f'batch update x{len(ids)}', len(ids), post('/tasko/api/tasks/batch/', updates))
+
+            deletes = [{'op': 'delete', 'id': task_id} for task_id in ids]
+            self.timed(f'batch delete x{len(ids)}', len(ids), post('/tasko/api/tasks/batch/', deletes))
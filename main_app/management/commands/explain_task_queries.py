@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from main_app.models import Task
+from useraccount.models import AppUser
+
+# Plan fragments that show a query was answered from an index
+INDEX_MARKERS = {
+    'sqlite': ('USING INDEX', 'USING COVERING INDEX', 'USING PRIMARY KEY'),
+    'postgresql': ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan'),
+}
+
+
+def stock_queries(user):
+    """The Task query shapes issued by the API, keyed by a short label"""
+    today = timezone.now().date()
+    tasks = Task.objects.filter(user=user)
+    return {
+        'task list': tasks.order_by('-created_at', '-id')[:50],
+        'task list ?done=': tasks.filter(done=False).order_by('-created_at', '-id')[:50],
+        'task list ?priority=': tasks.filter(priority='high').order_by('-created_at', '-id')[:50],
+        'task list ?project=': tasks.filter(project='work').order_by('-created_at', '-id')[:50],
+        'task list ?important=': tasks.filter(important=True).order_by('-created_at', '-id')[:50],
+        'overdue': tasks.filter(done=False, date__lt=today).order_by(),
+        'due soon': tasks.filter(
+            done=False, date__gte=today, date__lte=today + timedelta(days=3),
+        ).order_by(),
+        'stats aggregate': tasks.order_by().values('user').annotate(
+            total=Count('id'), completed=Count('id', filter=Q(done=True)),
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the stock Task queries and report whether each one uses an index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email of the user to build the queries for '
+                                           '(defaults to the first user)')
+        parser.add_argument('--verbose-plan', action='store_true',
+                            help='Print the full query plan for every query')
+
+    def handle(self, *args, **options):
+        markers = INDEX_MARKERS.get(connection.vendor)
+        if markers is None:
+            raise CommandError(f"EXPLAIN checks are not supported on {connection.vendor}")
+
+        users = AppUser.objects.order_by('id')
+        if options['user']:
+            users = users.filter(email=options['user'])
+        user = users.first()
+        if user is None:
+            raise CommandError("No matching user found to build the queries for")
+
+        missing = 0
+        for label, queryset in stock_queries(user).items():
+            plan = queryset.explain()
+            uses_index = any(marker in plan for marker in markers)
+            if uses_index:
+                self.stdout.write(self.style.SUCCESS(f"index    {label}"))
+            else:
+                missing += 1
+                self.stdout.write(self.style.WARNING(f"no index {label}"))
+            if options['verbose_plan'] or not uses_index:
+                for line in plan.splitlines():
+                    self.stdout.write(f"           {line}")
+
+        if missing:
+            raise CommandError(f"{missing} stock queries do not use an index")
@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main_app.importer import IMPORT_FORMATS, InvalidUpload, import_tasks
+from useraccount.models import AppUser
+
+
+class Command(BaseCommand):
+    help = "Import tasks for a user from an NDJSON or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Owner of the imported tasks')
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--as', dest='import_format', choices=IMPORT_FORMATS,
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Rows per bulk_create (default TASK_IMPORT_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        try:
+            user = AppUser.objects.get(email=options['email'])
+        except AppUser.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+
+        path = options['path']
+        import_format = options['import_format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        try:
+            with open(path, 'rb') as lines:
+                report = import_tasks(user, lines, import_format, batch_size=options['batch_size'])
+        except (OSError, InvalidUpload) as exc:
+            raise CommandError(f"Could not read {path}: {exc}")
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        if report['errors_truncated']:
+            self.stderr.write(f"... {report['failed'] - len(report['errors'])} more rows failed")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} tasks for {user.email}, {report['failed']} rows failed"
+        ))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main_app.retention import prune_notifications
+
+
+class Command(BaseCommand):
+    help = "Apply the notification retention policy and reconcile unread counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Users examined per aggregate query')
+        parser.add_argument('--delete-chunk', type=int, default=1000,
+                            help='Notifications deleted per statement')
+
+    def handle(self, *args, **options):
+        result = prune_notifications(options['chunk_size'], options['delete_chunk'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result['users']} users: removed {result['expired']} expired and "
+            f"{result['over_limit']} over the {settings.NOTIFICATION_MAX_PER_USER} per user limit, "
+            f"fixed {result['counters_fixed']} unread counters"
+        ))
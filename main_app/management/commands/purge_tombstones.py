@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main_app.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = purge_tombstones(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {count} tombstones older than {settings.SYNC_TOMBSTONE_RETENTION_DAYS} days"
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from main_app.reminders import scan_due_tasks
+
+
+class Command(BaseCommand):
+    help = "Send overdue and due soon reminders; resumes an interrupted scan for today"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Users per committed chunk (default DUE_SCAN_USER_CHUNK)')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Tasks fetched per round trip')
+        parser.add_argument('--restart', action='store_true',
+                            help="Start today's scan from the first user again")
+
+    def handle(self, *args, **options):
+        result = scan_due_tasks(
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            restart=options['restart'],
+        )
+        seconds = result['seconds'] or 1e-9
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Resumed: ' if result['resumed'] else ''}"
+            f"scanned {result['tasks']} tasks for {result['users']} users in {seconds:.2f}s "
+            f"({result['tasks'] / seconds:.0f} tasks/s), sent {result['notifications']} reminders"
+        ))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main_app", "0003_alter_notification_notification_type_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="main_app_ta_user_id_7694df_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "done", "date"], name="main_app_ta_user_id_af0ffe_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "priority"], name="main_app_ta_user_id_7c2fd4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "project"], name="main_app_ta_user_id_12dc73_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("date__isnull", False), ("done", False)),
+                fields=["user", "date"],
+                name="task_user_open_due_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("important", True)),
+                fields=["user", "-created_at", "-id"],
+                name="task_user_important_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("useraccount", "0004_outboundemail"),
+        ("main_app", "0004_task_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeletedRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("task", "Task"), ("notification", "Notification")],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "updated_at"], name="main_app_no_user_id_5f5a69_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "updated_at"], name="main_app_ta_user_id_a2f1be_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="deletedrecord",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="deleted_records",
+                to="useraccount.appuser",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="deletedrecord",
+            index=models.Index(
+                fields=["user", "deleted_at"], name="main_app_de_user_id_41e8cf_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main_app", "0005_sync_markers"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DueDateAlert",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("overdue", "Overdue"), ("due_soon", "Due Soon")],
+                        max_length=20,
+                    ),
+                ),
+                ("due_date", models.DateField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ScanCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("run_date", models.DateField(blank=True, null=True)),
+                ("last_user_id", models.BigIntegerField(default=0)),
+                ("completed", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["done", "date"], name="main_app_ta_done_b990b3_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="duedatealert",
+            name="task",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="due_date_alerts",
+                to="main_app.task",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="duedatealert",
+            index=models.Index(
+                fields=["due_date"], name="main_app_du_due_dat_1b74bd_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="duedatealert",
+            constraint=models.UniqueConstraint(
+                fields=("task", "kind", "due_date"), name="unique_due_date_alert"
+            ),
+        ),
+    ]
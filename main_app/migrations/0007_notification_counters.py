@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("useraccount", "0004_outboundemail"),
+        ("main_app", "0006_due_date_alerts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="notification_counter",
+                        serialize=False,
+                        to="useraccount.appuser",
+                    ),
+                ),
+                ("unread", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def install_search_index(apps, schema_editor):
+    from main_app import search
+
+    search.install(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from main_app import search
+
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main_app", "0007_notification_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskSearchEntry",
+            fields=[
+                (
+                    "task",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="main_app.task",
+                    ),
+                ),
+                ("document", models.TextField(db_column="main_app_task_fts")),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "main_app_task_fts",
+                "managed": False,
+            },
+        ),
+        # FTS5 table and triggers on SQLite, a GIN tsvector index on
+        # PostgreSQL; nothing elsewhere (search falls back to LIKE)
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import time
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("useraccount", "0006_revokedtoken"),
+        ("main_app", "0008_task_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CollectionVersion",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="collection_version",
+                        serialize=False,
+                        to="useraccount.appuser",
+                    ),
+                ),
+                ("tasks", models.BigIntegerField(default=time.time_ns)),
+                ("notifications", models.BigIntegerField(default=time.time_ns)),
+            ],
+        ),
+    ]
@@ -1,3 +1,5 @@
+import time
+
 from django.db import models
 from django.utils import timezone
 from useraccount.models import AppUser
@@ -36,6 +38,29 @@ class Task(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Default list ordering and the user-scoped stats aggregate
+            models.Index(fields=['user', '-created_at', '-id']),
+            # Status filter plus overdue / due soon date ranges
+            models.Index(fields=['user', 'done', 'date']),
+            models.Index(fields=['user', 'priority']),
+            models.Index(fields=['user', 'project']),
+            # Open tasks with a due date, for the overdue and due soon counters
+            models.Index(
+                fields=['user', 'date'],
+                condition=models.Q(done=False, date__isnull=False),
+                name='task_user_open_due_idx',
+            ),
+            models.Index(
+                fields=['user', '-created_at', '-id'],
+                condition=models.Q(important=True),
+                name='task_user_important_idx',
+            ),
+            # Delta sync: rows changed since a watermark
+            models.Index(fields=['user', 'updated_at']),
+            # Due date scanner: open tasks in a date window across all users
+            models.Index(fields=['done', 'date']),
+        ]
     
     def __str__(self):
         return self.title
@@ -47,6 +72,13 @@ class Task(models.Model):
             return self.date < timezone.now().date()
         return False
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded values so saves can be diffed for notifications"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
     def save(self, *args, **kwargs):
         """Override save to track if this is a new task"""
         if not self.pk:
@@ -55,6 +87,10 @@ class Task(models.Model):
         else:
             self._is_new = False
         super().save(*args, **kwargs)
+        # The saved state is the baseline for the next diff
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+        }
 
 class Notification(models.Model):
     """User notifications model"""
@@ -80,16 +116,25 @@ class Notification(models.Model):
     user = models.ForeignKey(AppUser, on_delete=models.CASCADE, related_name='notifications')
     task = models.ForeignKey(Task, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'read', '-created_at']),
+            models.Index(fields=['user', 'updated_at']),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.user.email}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded read flag so saves can adjust the unread counter"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_read = dict(zip(field_names, values)).get('read')
+        return instance
+    
     @property
     def time_ago(self):
         """Human readable time ago"""
@@ -104,4 +149,101 @@ class Notification(models.Model):
             minutes = delta.seconds // 60
             return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
         else:
-            return "Just now"
\ No newline at end of file
+            return "Just now"
+
+class TaskSearchEntry(models.Model):
+    """
+    Row of the SQLite FTS5 index over task title and description. The table
+    and the triggers that fill it are created by main_app.search, not by
+    Django; this model only lets task queries join it.
+    """
+    task = models.OneToOneField(
+        Task, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        related_name='search_entry',
+    )
+    # FTS5 hidden columns: comparing the table-named column runs a
+    # full-text query, rank is its weighted bm25 score (lower is better)
+    document = models.TextField(db_column='main_app_task_fts')
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'main_app_task_fts'
+
+class NotificationCounter(models.Model):
+    """Denormalized unread notification count, so the badge is a single row read"""
+    user = models.OneToOneField(
+        AppUser, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter'
+    )
+    unread = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+class CollectionVersion(models.Model):
+    """
+    Time (in ns) of each user's last write per collection, the validator
+    for conditional GETs and the key of cached stats (see ``versioning``)
+    """
+    user = models.OneToOneField(
+        AppUser, on_delete=models.CASCADE, primary_key=True, related_name='collection_version'
+    )
+    tasks = models.BigIntegerField(default=time.time_ns)
+    notifications = models.BigIntegerField(default=time.time_ns)
+    
+    def __str__(self):
+        return f"{self.user_id}: tasks {self.tasks}, notifications {self.notifications}"
+
+class DeletedRecord(models.Model):
+    """Tombstone for a deleted task or notification, read by the sync API"""
+    KIND_CHOICES = [
+        ('task', 'Task'),
+        ('notification', 'Notification'),
+    ]
+    
+    user = models.ForeignKey(AppUser, on_delete=models.CASCADE, related_name='deleted_records')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted"
+
+class DueDateAlert(models.Model):
+    """Records that an overdue / due soon notification was sent for a due date"""
+    KIND_CHOICES = [
+        ('overdue', 'Overdue'),
+        ('due_soon', 'Due Soon'),
+    ]
+    
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='due_date_alerts')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    due_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'kind', 'due_date'], name='unique_due_date_alert'),
+        ]
+        indexes = [
+            models.Index(fields=['due_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} alert for task {self.task_id} ({self.due_date})"
+
+class ScanCheckpoint(models.Model):
+    """Progress of a chunked background scan, so an interrupted run can resume"""
+    name = models.CharField(max_length=50, unique=True)
+    run_date = models.DateField(null=True, blank=True)
+    last_user_id = models.BigIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} @ user {self.last_user_id} ({self.run_date})"
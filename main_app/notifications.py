@@ -0,0 +1,200 @@
+"""
+Task notification fan-out.
+
+Every task write is turned into notifications by diffing the task's old
+and new state: ``Task.from_db`` remembers the values a task was loaded
+with, single saves are diffed in the post_save signal, and the bulk paths
+(bulk actions, batches, deletes) report the rows they touch through the
+helpers below. Notifications are buffered per transaction and written
+with one ``bulk_create`` after it commits, so a 500-task bulk action
+makes a single INSERT and a rolled back write notifies nobody.
+"""
+import logging
+
+from django.db import transaction
+
+from . import counters, events
+from .models import Notification, Task
+from .serializers import NotificationSerializer
+from .transactions import defer_until_commit
+from .versioning import NOTIFICATIONS, mark_changed
+
+logger = logging.getLogger(__name__)
+
+# Field changes that get their own notification; anything else in
+# TRACKED_FIELDS changing is reported as a plain update
+TRACKED_FIELDS = ('title', 'desc', 'date', 'priority', 'done', 'important', 'project')
+
+NOTIFICATION_TEMPLATES = {
+    'task_created': ('✅', 'Task Created', 'You created task "{title}"'),
+    'task_updated': ('📝', 'Task Updated', 'You updated task "{title}"'),
+    'task_deleted': ('🗑️', 'Task Deleted', 'You deleted task "{title}"'),
+    'task_completed': ('✅', 'Task Completed', 'You completed task "{title}"'),
+    'task_uncompleted': ('🔄', 'Task Reopened', 'You reopened task "{title}"'),
+    'task_important': ('⭐', 'Task Marked Important', 'You marked task "{title}" as important'),
+    'task_unimportant': ('☆', 'Task Unmarked Important', 'You unmarked task "{title}" as important'),
+    'project_assigned': ('📁', 'Project Assigned', 'You moved task "{title}" to {project}'),
+    'project_changed': ('📁', 'Project Changed', 'You moved task "{title}" to {project}'),
+    'overdue': ('⚠️', 'Task Overdue', 'Task "{title}" is overdue'),
+    'due_soon': ('⏰', 'Due Soon', 'Task "{title}" is due soon'),
+}
+
+# Flipping one of these fields to the given value emits the given type
+FLAG_TYPES = {
+    ('done', True): 'task_completed',
+    ('done', False): 'task_uncompleted',
+    ('important', True): 'task_important',
+    ('important', False): 'task_unimportant',
+}
+
+
+def snapshot(task):
+    """The tracked field values of ``task`` as they are now"""
+    return {field: getattr(task, field) for field in TRACKED_FIELDS}
+
+
+def build_notification(user_id, notification_type, title, task_id=None, project=None):
+    icon, heading, desc = NOTIFICATION_TEMPLATES[notification_type]
+    project = dict(Task.PROJECT_CHOICES).get(project, 'No project')
+    return Notification(
+        user_id=user_id,
+        task_id=task_id,
+        notification_type=notification_type,
+        icon=icon,
+        title=heading,
+        desc=desc.format(title=title, project=project),
+    )
+
+
+def diff_task(previous, task):
+    """
+    Notification types for the change from ``previous`` (a dict of loaded
+    values, possibly partial) to ``task``'s current state.
+    """
+    changed = [
+        field for field in TRACKED_FIELDS
+        if field in previous and previous[field] != getattr(task, field)
+    ]
+    types = []
+    other = False
+    for field in changed:
+        if field == 'project':
+            types.append('project_changed' if previous['project'] else 'project_assigned')
+        elif (field, getattr(task, field)) in FLAG_TYPES:
+            types.append(FLAG_TYPES[field, getattr(task, field)])
+        else:
+            other = True
+    if other:
+        types.append('task_updated')
+    return types
+
+
+def _write(notifications):
+    """Insert buffered notifications and tell the owners' clients"""
+    if not notifications:
+        return
+    by_user = {}
+    for notification in notifications:
+        by_user.setdefault(notification.user_id, []).append(notification)
+
+    with transaction.atomic():
+        # A task may have been deleted since its write committed; drop the
+        # link rather than losing the notification. Foreign keys are only
+        # checked at commit, so this cannot wait for an IntegrityError, and
+        # the row locks keep the linked tasks until the insert commits.
+        task_ids = {n.task_id for n in notifications if n.task_id}
+        if task_ids:
+            live = set(
+                Task.objects.filter(id__in=task_ids).select_for_update().values_list('id', flat=True)
+            )
+            for notification in notifications:
+                if notification.task_id not in live:
+                    notification.task_id = None
+        Notification.objects.bulk_create(notifications, batch_size=500)
+        # bulk_create() skips the post_save signal
+        for user_id, created in by_user.items():
+            counters.adjust_unread(user_id, len(created))
+            mark_changed(user_id, NOTIFICATIONS)
+
+    for user_id, created in by_user.items():
+        if events.get_broadcast().has_subscribers(user_id):
+            for data in NotificationSerializer(created, many=True).data:
+                events.publish(user_id, 'notification', data)
+
+
+def emit(notifications):
+    """Queue notifications to be written once the current transaction commits"""
+    if notifications:
+        defer_until_commit('task_notifications', notifications, _write)
+
+
+def task_saved(task, created):
+    """Notify about a single ``Task.save()``"""
+    if created:
+        emit([build_notification(task.user_id, 'task_created', task.title, task.id, task.project)])
+        return
+    previous = getattr(task, '_loaded_values', None)
+    if previous is None:
+        logger.debug('Task %s saved without loaded values; not diffed', task.pk)
+        return
+    emit([
+        build_notification(task.user_id, t, task.title, task.id, task.project)
+        for t in diff_task(previous, task)
+    ])
+
+
+def tasks_created(tasks):
+    emit([
+        build_notification(task.user_id, 'task_created', task.title, task.id, task.project)
+        for task in tasks
+    ])
+
+
+def tasks_updated(tasks):
+    """Notify about tasks changed in memory and written with ``bulk_update``"""
+    notifications = []
+    for task in tasks:
+        previous = getattr(task, '_loaded_values', None) or {}
+        notifications.extend(
+            build_notification(task.user_id, t, task.title, task.id, task.project)
+            for t in diff_task(previous, task)
+        )
+        task._loaded_values = snapshot(task)
+    emit(notifications)
+
+
+def tasks_deleted(rows):
+    """Notify about deleted tasks given ``(user_id, title)`` rows"""
+    emit([build_notification(user_id, 'task_deleted', title) for user_id, title in rows])
+
+
+def tasks_imported(user_id, count):
+    """One summary notification for an import, however many tasks it created"""
+    emit([Notification(
+        user_id=user_id,
+        notification_type='task_created',
+        icon='📥',
+        title='Tasks Imported',
+        desc=f'You imported {count} task{"s" if count != 1 else ""}',
+    )])
+
+
+def update_tasks(queryset, **values):
+    """
+    ``queryset.update(**values)`` for a single boolean flag, notifying
+    about the rows whose flag actually flips. Returns the number of rows
+    that changed.
+    """
+    (field, value), = [(f, v) for f, v in values.items() if f != 'updated_at']
+    with transaction.atomic():
+        changing = queryset.exclude(**{field: value}).select_for_update()
+        rows = list(changing.values_list('id', 'user_id', 'title', 'project'))
+        if not rows:
+            return 0
+        Task.objects.filter(id__in=[row[0] for row in rows]).update(**values)
+        notification_type = FLAG_TYPES[field, value]
+        emit([
+            build_notification(user_id, notification_type, title, task_id, project)
+            for task_id, user_id, title, project in rows
+        ])
+    return len(rows)
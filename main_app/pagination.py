@@ -0,0 +1,72 @@
+from datetime import date
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import DateField, Value
+from django.db.models.functions import Coalesce
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered by newest first.
+
+    Each page is fetched with a ``created_at`` bound instead of an OFFSET, so
+    page cost stays constant as the table grows and rows inserted while a
+    client is paging do not shift later pages. ``id`` breaks ties between
+    rows created in the same instant.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    # Annotated by TaskSearchFilter on full-text searches
+    rank_annotation = 'search_rank'
+
+    # Nullable date columns are paged on a non-null key; NULL sorts last
+    # ascending, the same as PostgreSQL does natively
+    null_date_key = date.max
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = super().get_ordering(request, queryset, view)
+        field_name = ordering[0].lstrip('-')
+        if self._is_nullable_date(queryset.model, field_name):
+            queryset = queryset.annotate(**{
+                self._sort_key(field_name): Coalesce(field_name, Value(self.null_date_key)),
+            })
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        # Ranked search results page best match first unless ?ordering= is given
+        if self.rank_annotation in queryset.query.annotations and not self._ordering_requested(request, view):
+            ordering = ('-' + self.rank_annotation,)
+        first = ordering[0]
+        field_name = first.lstrip('-')
+        if self._is_nullable_date(queryset.model, field_name):
+            ordering = (first.replace(field_name, self._sort_key(field_name)),) + tuple(ordering[1:])
+        # Keep the order total when ?ordering= picks a non-unique field
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering = tuple(ordering) + ('-id',)
+        return tuple(ordering)
+
+    @staticmethod
+    def _ordering_requested(request, view):
+        return any(
+            isinstance(backend, type) and issubclass(backend, OrderingFilter)
+            and request.query_params.get(backend.ordering_param)
+            for backend in getattr(view, 'filter_backends', [])
+        )
+
+    @staticmethod
+    def _sort_key(field_name):
+        return f'{field_name}_sort_key'
+
+    @staticmethod
+    def _is_nullable_date(model, field_name):
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return False
+        return type(field) is DateField and field.null
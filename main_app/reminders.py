@@ -0,0 +1,121 @@
+"""
+Overdue and due soon reminders.
+
+``scan_due_tasks`` walks the open tasks whose due date falls in the
+reminder window, one chunk of users at a time. Each chunk is committed
+together with a checkpoint, so an interrupted scan resumes where it
+stopped. ``DueDateAlert`` rows make the scan idempotent: a task gets at
+most one reminder of each kind per due date, however often the scan runs.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import notifications
+from .models import DueDateAlert, ScanCheckpoint, Task
+from .stats import DUE_SOON_DAYS
+
+CHECKPOINT_NAME = 'due_tasks'
+
+
+def _chunk_user_ids(window, after, chunk_size):
+    """Next ``chunk_size`` users with open tasks due in ``window``"""
+    return list(
+        Task.objects.filter(done=False, date__range=window, user_id__gt=after)
+        .order_by('user_id')
+        .values_list('user_id', flat=True)
+        .distinct()[:chunk_size]
+    )
+
+
+def _alerts_for(rows, today):
+    """Reminder kind for each ``(id, user_id, title, project, date)`` row"""
+    for row in rows:
+        yield row, 'overdue' if row[4] < today else 'due_soon'
+
+
+def _process_batch(rows, today):
+    """Emit reminders for one batch of candidate tasks; returns how many"""
+    alerts = list(_alerts_for(rows, today))
+    sent = set(
+        DueDateAlert.objects.filter(task_id__in=[row[0] for row in rows])
+        .values_list('task_id', 'kind', 'due_date')
+    )
+    new = [(row, kind) for row, kind in alerts if (row[0], kind, row[4]) not in sent]
+    if not new:
+        return 0
+    DueDateAlert.objects.bulk_create([
+        DueDateAlert(task_id=row[0], kind=kind, due_date=row[4]) for row, kind in new
+    ])
+    notifications.emit([
+        notifications.build_notification(user_id, kind, title, task_id, project)
+        for (task_id, user_id, title, project, _), kind in new
+    ])
+    return len(new)
+
+
+def scan_due_tasks(today=None, chunk_size=None, batch_size=2000, restart=False):
+    """
+    Send overdue / due soon reminders, resuming today's scan if one was
+    interrupted. Returns counters for reporting.
+    """
+    today = today or timezone.now().date()
+    chunk_size = chunk_size or settings.DUE_SCAN_USER_CHUNK
+    window = (
+        today - timedelta(days=settings.DUE_SCAN_LOOKBACK_DAYS),
+        today + timedelta(days=DUE_SOON_DAYS),
+    )
+    result = {'users': 0, 'tasks': 0, 'notifications': 0, 'resumed': False, 'seconds': 0.0}
+    start = time.perf_counter()
+
+    checkpoint, _ = ScanCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+    if restart or checkpoint.run_date != today:
+        checkpoint.run_date = today
+        checkpoint.last_user_id = 0
+        checkpoint.completed = False
+        checkpoint.save()
+    elif checkpoint.completed:
+        result['seconds'] = time.perf_counter() - start
+        return result
+    else:
+        result['resumed'] = checkpoint.last_user_id > 0
+
+    while True:
+        with transaction.atomic():
+            # Holding the checkpoint row lock keeps concurrent scans from
+            # processing the same chunk twice
+            checkpoint = ScanCheckpoint.objects.select_for_update().get(pk=checkpoint.pk)
+            user_ids = _chunk_user_ids(window, checkpoint.last_user_id, chunk_size)
+            if not user_ids:
+                checkpoint.completed = True
+                checkpoint.save(update_fields=['completed', 'updated_at'])
+                break
+
+            rows = (
+                Task.objects.filter(done=False, date__range=window, user_id__in=user_ids)
+                .order_by('user_id', 'id')
+                .values_list('id', 'user_id', 'title', 'project', 'date')
+                .iterator(chunk_size=batch_size)
+            )
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    result['notifications'] += _process_batch(batch, today)
+                    result['tasks'] += len(batch)
+                    batch = []
+            if batch:
+                result['notifications'] += _process_batch(batch, today)
+                result['tasks'] += len(batch)
+
+            checkpoint.last_user_id = user_ids[-1]
+            checkpoint.save(update_fields=['last_user_id', 'updated_at'])
+            result['users'] += len(user_ids)
+
+    # Alerts for due dates that left the window can never match again
+    DueDateAlert.objects.filter(due_date__lt=window[0]).delete()
+    result['seconds'] = time.perf_counter() - start
+    return result
@@ -0,0 +1,80 @@
+"""
+Notification retention.
+
+``prune_notifications`` enforces the retention policy one chunk of users
+at a time: notifications older than NOTIFICATION_RETENTION_DAYS (read ones
+already after NOTIFICATION_READ_RETENTION_DAYS) are removed, then users
+still above NOTIFICATION_MAX_PER_USER lose their oldest rows, read ones
+first. Deletes go through ``delete_notifications`` so sync tombstones and
+unread counters stay correct, and each chunk's counters are reconciled
+against the remaining rows.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from useraccount.models import AppUser
+
+from .counters import reconcile_unread
+from .models import Notification
+from .sync import delete_notifications
+
+
+def _expired(now):
+    return Q(created_at__lt=now - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)) | Q(
+        read=True,
+        created_at__lt=now - timedelta(days=settings.NOTIFICATION_READ_RETENTION_DAYS),
+    )
+
+
+def _delete_in_chunks(user, ids, delete_chunk):
+    deleted = 0
+    for start in range(0, len(ids), delete_chunk):
+        chunk = ids[start:start + delete_chunk]
+        deleted += delete_notifications(user, Notification.objects.filter(id__in=chunk))
+    return deleted
+
+
+def prune_notifications(chunk_size=500, delete_chunk=1000, now=None):
+    """Enforce the retention policy for every user. Returns counters for reporting."""
+    now = now or timezone.now()
+    expired = _expired(now)
+    max_per_user = settings.NOTIFICATION_MAX_PER_USER
+    result = {'users': 0, 'expired': 0, 'over_limit': 0, 'counters_fixed': 0}
+
+    last_id = 0
+    while True:
+        user_ids = list(
+            AppUser.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return result
+        last_id = user_ids[-1]
+        result['users'] += len(user_ids)
+
+        # One aggregate per chunk finds the few users that need work
+        candidates = list(
+            Notification.objects.filter(user_id__in=user_ids)
+            .values('user_id')
+            .annotate(total=Count('id'), expired=Count('id', filter=expired))
+            .filter(Q(expired__gt=0) | Q(total__gt=max_per_user))
+            .order_by()
+        )
+        users = AppUser.objects.only('id').in_bulk([row['user_id'] for row in candidates])
+        for row in candidates:
+            user = users[row['user_id']]
+            notifications = Notification.objects.filter(user=user)
+            if row['expired']:
+                ids = list(notifications.filter(expired).values_list('id', flat=True))
+                result['expired'] += _delete_in_chunks(user, ids, delete_chunk)
+            excess = row['total'] - row['expired'] - max_per_user
+            if excess > 0:
+                ids = list(
+                    notifications.order_by('-read', 'created_at', 'id')
+                    .values_list('id', flat=True)[:excess]
+                )
+                result['over_limit'] += _delete_in_chunks(user, ids, delete_chunk)
+
+        result['counters_fixed'] += reconcile_unread(user_ids)
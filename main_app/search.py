@@ -0,0 +1,163 @@
+"""
+Full-text task search.
+
+On SQLite, title and description are indexed by an FTS5 table that
+triggers keep in step with every write to ``main_app_task``, including
+bulk inserts, updates and deletes. On PostgreSQL a GIN index over a
+weighted tsvector expression does the same job. ``TaskSearchFilter``
+serves ``?search=`` from whichever exists, matching every word as a
+prefix and annotating ``search_rank`` (higher is better, title matches
+count more than description matches). Other databases fall back to
+DRF's ``icontains`` search.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import TaskSearchEntry
+
+TASK_TABLE = 'main_app_task'
+FTS_TABLE = 'main_app_task_fts'
+
+# Title matches weigh ten times description matches in both backends
+SQLITE_RANK = 'bm25(10.0, 1.0)'
+
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, "desc",
+        content='{TASK_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, "desc") VALUES (new.id, new.title, new."desc");
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, "desc")
+        VALUES ('delete', old.id, old.title, old."desc");
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, "desc" ON {TASK_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, "desc")
+        VALUES ('delete', old.id, old.title, old."desc");
+        INSERT INTO {FTS_TABLE}(rowid, title, "desc") VALUES (new.id, new.title, new."desc");
+    END""",
+]
+SQLITE_TRIGGERS = [f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au']
+SQLITE_DROP = [f'DROP TRIGGER IF EXISTS {name}' for name in SQLITE_TRIGGERS] + [
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+PG_VECTOR = (
+    f"""(setweight(to_tsvector('simple', coalesce("{TASK_TABLE}"."title", '')), 'A') || """
+    f"""setweight(to_tsvector('simple', coalesce("{TASK_TABLE}"."desc", '')), 'B'))"""
+)
+PG_INDEX = 'task_search_vector_idx'
+PG_SCHEMA = [f'CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {TASK_TABLE} USING GIN ({PG_VECTOR})']
+PG_DROP = [f'DROP INDEX IF EXISTS {PG_INDEX}']
+
+
+def install(conn):
+    """Create the search index for ``conn``'s database, filling it from existing rows"""
+    if conn.vendor == 'sqlite':
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+                SQLITE_TRIGGERS,
+            )
+            complete = cursor.fetchone()[0] == len(SQLITE_TRIGGERS)
+            for statement in SQLITE_SCHEMA:
+                cursor.execute(statement)
+            # Persisted in the index's config table; used by its rank column
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', %s)", [SQLITE_RANK])
+            if not complete:
+                # Writes made while a trigger was missing never reached the index
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif conn.vendor == 'postgresql':
+        with conn.cursor() as cursor:
+            for statement in PG_SCHEMA:
+                cursor.execute(statement)
+
+
+def uninstall(conn):
+    statements = {'sqlite': SQLITE_DROP, 'postgresql': PG_DROP}.get(conn.vendor, [])
+    with conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def ensure_installed(sender, using='default', **kwargs):
+    """
+    post_migrate hook. SQLite applies most Task schema changes by copying
+    the table, which drops its triggers, so put them back after migrating.
+    """
+    conn = connections[using]
+    if conn.vendor == 'sqlite' and TASK_TABLE in conn.introspection.table_names():
+        install(conn)
+
+
+def search_terms(text):
+    """Words in a search string; punctuation and operators are ignored"""
+    return re.findall(r'\w+', text)
+
+
+def _too_many(matches):
+    """
+    Whether ``matches`` is too broad to rank. Scoring costs time for every
+    match (about 250 ms per 100k on SQLite), so very broad queries are
+    returned newest first instead.
+    """
+    limit = settings.SEARCH_RANK_MAX_MATCHES
+    return matches.order_by()[:limit + 1].count() > limit
+
+
+def full_text_search(queryset, terms):
+    """
+    Filter ``queryset`` to tasks matching every term as a prefix and,
+    unless the query matches too many of them, annotate ``search_rank``.
+    Returns None when the database has no full-text index.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        entries = TaskSearchEntry.objects.using(queryset.db).filter(document=match)
+        if _too_many(entries):
+            return queryset.filter(id__in=entries.values('task_id'))
+        # Joined through TaskSearchEntry so the full-text query runs once
+        return queryset.filter(search_entry__document=match).annotate(
+            search_rank=F('search_entry__rank') * -1,
+        )
+    if vendor == 'postgresql':
+        query = ' & '.join(f'{term}:*' for term in terms)
+        matches = RawSQL(
+            f"{PG_VECTOR} @@ to_tsquery('simple', %s)", [query], output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f"ts_rank('{{0, 0, 0.1, 1.0}}', {PG_VECTOR}, to_tsquery('simple', %s))",
+            [query],
+            output_field=FloatField(),
+        )
+        results = queryset.alias(search_match=matches).filter(search_match=True)
+        if _too_many(results):
+            return results
+        return results.annotate(search_rank=rank)
+    return None
+
+
+class TaskSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by the full-text index, ranked best match first"""
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        terms = search_terms(text)
+        if not terms:
+            return queryset
+        results = full_text_search(queryset, terms)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        if 'search_rank' not in results.query.annotations:
+            return results
+        # Explicit ?ordering= still wins, as OrderingFilter runs after this
+        return results.order_by('-search_rank', '-id')
@@ -1,4 +1,9 @@
-from rest_framework import serializers
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import Task, Notification  # Remove Project
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -14,14 +19,94 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user']
     
+    # Display names for project values
+    PROJECT_DISPLAY = {
+        'work': 'Work',
+        'personal': 'Personal',
+        'health': 'Health'
+    }
+    
     def get_project_name(self, obj):
         # Return proper display name for project
-        project_display = {
-            'work': 'Work',
-            'personal': 'Personal',
-            'health': 'Health'
+        return self.PROJECT_DISPLAY.get(obj.project, obj.project)
+
+class TaskRowSerializer:
+    """
+    Read-only fast path producing exactly TaskSerializer's output from
+    ``.values()`` rows instead of model instances.
+
+    Field formatting is resolved once per instance: "today" for
+    ``is_overdue``, the current timezone and output formats for the
+    timestamps, and the project display table.
+    """
+    VALUES_FIELDS = [
+        'id', 'title', 'desc', 'date', 'priority', 'done', 'important',
+        'project', 'created_at', 'updated_at',
+    ]
+
+    def __init__(self, today=None):
+        self.today = today or timezone.now().date()
+        fields = TaskSerializer().fields
+        self.project_names = TaskSerializer.PROJECT_DISPLAY
+        self.format_date = self._date_formatter(fields['date'])
+        self.format_created = self._datetime_formatter(fields['created_at'])
+        self.format_updated = self._datetime_formatter(fields['updated_at'])
+
+    @staticmethod
+    def _date_formatter(field):
+        if getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+            return lambda value: value.isoformat() if value else None
+        return field.to_representation
+
+    @staticmethod
+    def _datetime_formatter(field):
+        if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601:
+            return field.to_representation
+        tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if tz is None or not settings.USE_TZ:
+            return field.to_representation
+
+        utc_output = getattr(tz, 'key', None) == 'UTC' or tz is dt_timezone.utc
+
+        def format_datetime(value):
+            if not value:
+                return None
+            # Database values are already UTC; skip the conversion when
+            # the output zone is UTC too
+            if utc_output and value.tzinfo is dt_timezone.utc:
+                return value.isoformat()[:-6] + 'Z'
+            value = value.astimezone(tz).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return format_datetime
+
+    @classmethod
+    def values(cls, queryset):
+        """``queryset`` as values() rows, keeping annotations used for ordering"""
+        # annotation_select leaves out alias()es, which cannot be selected
+        return queryset.values(*cls.VALUES_FIELDS, *queryset.query.annotation_select)
+
+    def to_representation(self, row):
+        date, done, project = row['date'], row['done'], row['project']
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'desc': row['desc'],
+            'date': self.format_date(date),
+            'priority': row['priority'],
+            'done': done,
+            'important': row['important'],
+            'project': project,
+            'project_name': self.project_names.get(project, project),
+            'is_overdue': bool(date and not done and date < self.today),
+            'created_at': self.format_created(row['created_at']),
+            'updated_at': self.format_updated(row['updated_at']),
         }
-        return project_display.get(obj.project, obj.project)
+
+    def serialize(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
 
 class NotificationSerializer(serializers.ModelSerializer):
     time = serializers.CharField(source='time_ago', read_only=True)
@@ -29,4 +114,19 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'title', 'desc', 'notification_type', 'icon', 'read', 'time', 'created_at']
-        read_only_fields = ['user']
\ No newline at end of file
+        read_only_fields = ['user']
+
+class TaskBatchOperationSerializer(serializers.Serializer):
+    """One entry of a batched task write: create, partial update or delete"""
+    OPERATIONS = ['create', 'update', 'delete']
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False, default=dict)
+
+    def validate(self, attrs):
+        if attrs['op'] != 'create' and 'id' not in attrs:
+            raise serializers.ValidationError({'id': f"id is required for {attrs['op']}"})
+        if attrs['op'] == 'create' and 'id' in attrs:
+            raise serializers.ValidationError({'id': "id is not allowed for create"})
+        return attrs
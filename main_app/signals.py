@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import counters, events, notifications
+from .models import Notification, Task
+from .serializers import NotificationSerializer
+from .versioning import NOTIFICATIONS, TASKS, mark_changed
+
+
+# Deletes are marked changed by sync.delete_tasks and delete_notifications:
+# a post_delete receiver would make Django load every row it deletes
+@receiver(post_save, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    """Any task save makes the owner's cached stats and ETags stale"""
+    mark_changed(instance.user_id, TASKS)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, raw, **kwargs):
+    """Diff the saved task against its loaded state and notify the owner"""
+    # Fixtures (loaddata) are saved as they are, with nothing to notify
+    if raw:
+        return
+    notifications.task_saved(instance, created)
+
+
+@receiver(post_save, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    mark_changed(instance.user_id, NOTIFICATIONS)
+
+
+@receiver(post_save, sender=Notification)
+def notification_read_changed(sender, instance, created, **kwargs):
+    """Keep the owner's unread counter in step with single saves"""
+    if created:
+        delta = 0 if instance.read else 1
+    else:
+        loaded = getattr(instance, '_loaded_read', None)
+        if loaded is None or loaded == instance.read:
+            return
+        delta = -1 if instance.read else 1
+    counters.adjust_unread(instance.user_id, delta)
+    instance._loaded_read = instance.read
+
+
+@receiver(post_save, sender=Notification)
+def notification_created(sender, instance, created, **kwargs):
+    """Push new notifications to the owner's open event streams"""
+    if created and events.get_broadcast().has_subscribers(instance.user_id):
+        data = NotificationSerializer(instance).data
+        transaction.on_commit(lambda: events.publish(instance.user_id, 'notification', data))
@@ -85,23 +85,6 @@ function getCookie(name) {
    NOTIFICATION FUNCTIONS
 ═════════════════════════════════════════ */
 
-// Add a new notification to the list
-function addNotification(notification) {
-  // Add to beginning of array
-  notifications.unshift(notification);
-  
-  // Keep only last 50 notifications to prevent memory issues
-  if (notifications.length > 50) {
-    notifications = notifications.slice(0, 50);
-  }
-  
-  renderNotifPanel();
-  updateNotifBadge();
-  
-  // Also show a toast for immediate feedback
-  showToast(notification.desc, notification.notification_type);
-}
-
 // Enhanced toast function with types
 function showToast(message, type = 'info', duration = 4000) {
   const toast = document.getElementById('toast');
@@ -173,7 +156,7 @@ function toast(msg) {
 }
 
 function updateNotifBadge() {
-  const unread = notifications.filter((n) => !n.read).length;
+  const unread = Math.max(unreadCount, notifications.filter((n) => !n.read).length);
   const pip = document.getElementById("notifPip");
   if (unread > 0) {
     pip.classList.add("active");
@@ -235,6 +218,7 @@ async function markNotificationRead(id) {
 
     if (response.ok) {
       const notif = notifications.find(n => n.id === id);
+      if (notif && !notif.read) unreadCount = Math.max(0, unreadCount - 1);
       if (notif) notif.read = true;
       renderNotifPanel();
       updateNotifBadge();
@@ -257,6 +241,7 @@ async function markAllNotificationsRead() {
 
     if (response.ok) {
       notifications.forEach((n) => (n.read = true));
+      unreadCount = 0;
       renderNotifPanel();
       updateNotifBadge();
       showToast("All notifications marked as read", 'info');
@@ -279,6 +264,7 @@ async function clearAllNotifications() {
 
     if (response.ok) {
       notifications = [];
+      unreadCount = 0;
       renderNotifPanel();
       updateNotifBadge();
       showToast("All notifications cleared", 'info');
@@ -291,16 +277,27 @@ async function clearAllNotifications() {
 // Fetch notifications from API
 async function fetchNotifications() {
   try {
-    const response = await fetch('/tasko/api/notifications/', {
-      method: 'GET',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      credentials: 'same-origin',
-    });
-
+    const [response, countResponse] = await Promise.all([
+      fetch('/tasko/api/notifications/', {
+        method: 'GET',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        credentials: 'same-origin',
+      }),
+      fetch('/tasko/api/notifications/unread_count/', {
+        method: 'GET',
+        credentials: 'same-origin',
+      }),
+    ]);
+
+    if (countResponse.ok) {
+      const countData = await countResponse.json();
+      unreadCount = countData.unread;
+    }
     if (response.ok) {
-      notifications = await response.json();
+      const data = await response.json();
+      notifications = data.results;
       renderNotifPanel();
       updateNotifBadge();
     }
@@ -321,10 +318,16 @@ function setLoading(isLoading) {
   }
 }
 
-// Fetch ALL tasks for stats
-async function fetchAllTasks() {
-  try {
-    const response = await fetch('/tasko/api/tasks/', {
+// Largest page the task API serves; used when walking every page
+const TASK_PAGE_SIZE = 200;
+
+// Follow `next` cursors until every page of a list endpoint is loaded
+async function fetchAllPages(url) {
+  const results = [];
+  let next = url;
+
+  while (next) {
+    const response = await fetch(next, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
@@ -332,12 +335,27 @@ async function fetchAllTasks() {
       credentials: 'same-origin',
     });
 
-    if (response.ok) {
-      const data = await response.json();
-      allTasks = data;
-      updateAllCounters(); // Update counters with full data
-      return data;
+    if (!response.ok) {
+      const error = new Error(`Request failed with status ${response.status}`);
+      error.status = response.status;
+      throw error;
     }
+
+    const data = await response.json();
+    results.push(...data.results);
+    next = data.next;
+  }
+
+  return results;
+}
+
+// Fetch ALL tasks for stats
+async function fetchAllTasks() {
+  try {
+    const data = await fetchAllPages(`/tasko/api/tasks/?page_size=${TASK_PAGE_SIZE}`);
+    allTasks = data;
+    updateAllCounters(); // Update counters with full data
+    return data;
   } catch (error) {
     console.error('Failed to fetch all tasks:', error);
   }
@@ -355,25 +373,17 @@ async function fetchFilteredTasks() {
     if (fPri !== 'all') params.append('priority', fPri);
     if (fProject) params.append('project', fProject);
     if (query) params.append('search', query);
+    params.append('page_size', TASK_PAGE_SIZE);
     
     const url = `/tasko/api/tasks/?${params.toString()}`;
     
-    const response = await fetch(url, {
-      method: 'GET',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      credentials: 'same-origin',
-    });
-
-    if (response.ok) {
-      const data = await response.json();
-      filteredTasks = data;
-      render(); // Render only the filtered tasks
-    } else if (response.status === 401) {
+    filteredTasks = await fetchAllPages(url);
+    render(); // Render only the filtered tasks
+  } catch (error) {
+    if (error.status === 401) {
       window.location.href = '/useraccounts/user/login/';
+      return;
     }
-  } catch (error) {
     console.error('Failed to fetch filtered tasks:', error);
     showToast('Failed to load tasks', 'error');
   } finally {
@@ -424,42 +434,12 @@ async function saveTask(taskData, isEdit = false) {
     if (response.ok) {
       const savedTask = await response.json();
       
-      // Create a client-side notification
-      const projectDisplay = taskData.project ? 
-        taskData.project.charAt(0).toUpperCase() + taskData.project.slice(1) : 'No project';
-      
-      if (isEdit) {
-        // Check what changed (simplified - in real app you'd get this from API)
-        const notification = {
-          id: Date.now() + Math.random(),
-          title: 'Task Updated',
-          desc: `You updated task "${taskData.title}"`,
-          notification_type: 'task_updated',
-          icon: '📝',
-          read: false,
-          time: 'Just now',
-          created_at: new Date().toISOString()
-        };
-        addNotification(notification);
-      } else {
-        const notification = {
-          id: Date.now() + Math.random(),
-          title: 'Task Created',
-          desc: `You created task "${taskData.title}" in ${projectDisplay}`,
-          notification_type: 'task_created',
-          icon: '✅',
-          read: false,
-          time: 'Just now',
-          created_at: new Date().toISOString()
-        };
-        addNotification(notification);
-      }
-      
-      // Refresh all data
+      // Refresh all data; the server wrote the notifications for this change
       await Promise.all([
         fetchAllTasks(),
         fetchFilteredTasks(),
-        fetchStats()
+        fetchStats(),
+        fetchNotifications()
       ]);
       
       return savedTask;
@@ -480,9 +460,6 @@ async function saveTask(taskData, isEdit = false) {
 // Delete task
 async function deleteTaskFromAPI(id) {
   try {
-    // Find task before deleting for notification
-    const task = allTasks.find(t => t.id === id);
-    
     const response = await fetch(`/tasko/api/tasks/${id}/`, {
       method: 'DELETE',
       headers: {
@@ -492,25 +469,14 @@ async function deleteTaskFromAPI(id) {
     });
 
     if (response.ok) {
-      if (task) {
-        const notification = {
-          id: Date.now() + Math.random(),
-          title: 'Task Deleted',
-          desc: `You deleted task "${task.title}"`,
-          notification_type: 'task_deleted',
-          icon: '🗑️',
-          read: false,
-          time: 'Just now',
-          created_at: new Date().toISOString()
-        };
-        addNotification(notification);
-      }
+      showToast('Task deleted', 'task_deleted');
       
-      // Refresh all data
+      // Refresh all data; the server wrote the notifications for this change
       await Promise.all([
         fetchAllTasks(),
         fetchFilteredTasks(),
-        fetchStats()
+        fetchStats(),
+        fetchNotifications()
       ]);
       return true;
     } else if (response.status === 401) {
@@ -533,18 +499,8 @@ async function toggleDone(id) {
   
   const saved = await saveTask(t, true);
   if (saved) {
-    // Add notification for toggle
-    const notification = {
-      id: Date.now() + Math.random(),
-      title: wasDone ? 'Task Reopened' : 'Task Completed',
-      desc: wasDone ? `You reopened task "${t.title}"` : `You completed task "${t.title}"`,
-      notification_type: wasDone ? 'task_uncompleted' : 'task_completed',
-      icon: wasDone ? '🔄' : '✅',
-      read: false,
-      time: 'Just now',
-      created_at: new Date().toISOString()
-    };
-    addNotification(notification);
+    showToast(wasDone ? `You reopened task "${t.title}"` : `You completed task "${t.title}"`,
+              wasDone ? 'task_uncompleted' : 'task_completed');
     
     // Update allTasks
     const index = allTasks.findIndex(x => x.id === id);
@@ -563,7 +519,7 @@ async function toggleDone(id) {
 async function deleteTask(id) {
   const success = await deleteTaskFromAPI(id);
   if (success) {
-    // Task already deleted and notification added
+    // Task already deleted and notifications refetched
   }
 }
 
@@ -594,6 +550,7 @@ let editId = null;
 let query = "";
 
 let notifications = [];
+let unreadCount = 0;      // server-side unread total (the panel holds one page)
 
 /* ═════════════════════════════════════════
    HELPERS
@@ -1084,6 +1041,37 @@ function initializeDashboard() {
   }).finally(() => {
     setLoading(false);
   });
+
+  connectEventStream();
+}
+
+/* ═════════════════════════════════════════
+   LIVE UPDATES (SERVER-SENT EVENTS)
+═════════════════════════════════════════ */
+
+// Coalesce bursts of change events into one refresh per collection
+const pendingRefresh = {};
+
+function scheduleRefresh(collection, refresh) {
+  clearTimeout(pendingRefresh[collection]);
+  pendingRefresh[collection] = setTimeout(refresh, 300);
+}
+
+// Refetch whatever another tab, device or server job changed. Unchanged
+// lists come back as 304s, so echoes of our own writes are cheap.
+function connectEventStream() {
+  if (!window.EventSource) return;
+
+  const source = new EventSource('/tasko/api/events/');
+  source.addEventListener('changed', (e) => {
+    const { collections } = JSON.parse(e.data);
+    if (collections.includes('tasks')) {
+      scheduleRefresh('tasks', () => Promise.all([fetchAllTasks(), fetchFilteredTasks(), fetchStats()]));
+    }
+    if (collections.includes('notifications')) {
+      scheduleRefresh('notifications', fetchNotifications);
+    }
+  });
 }
 
 /* ═════════════════════════════════════════
@@ -0,0 +1,163 @@
+"""
+Aggregate task statistics shared by the stats endpoints.
+
+Every counter is computed with conditional aggregation so a dashboard load
+costs a single query no matter how many tasks the user owns. Results are
+cached per user under the user's tasks version (see ``versioning``), so
+any task write invalidates them.
+"""
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Task
+from .versioning import TASKS, aget_version, get_version
+
+# Tasks due within this many days (inclusive) count as "due soon"
+DUE_SOON_DAYS = 3
+
+# Longest ?days= window the dashboard stats accept
+MAX_STATS_DAYS = 365
+
+
+def parse_days(value, default=7):
+    """The ``?days=`` query param: a whole number of days, 1 to MAX_STATS_DAYS"""
+    if value is None:
+        return default
+    field = serializers.IntegerField(min_value=1, max_value=MAX_STATS_DAYS)
+    try:
+        return field.run_validation(value)
+    except serializers.ValidationError as exc:
+        raise serializers.ValidationError({'days': exc.detail})
+
+
+def _aggregates(days, today):
+    week_start = today - timedelta(days=days)
+    pending = Q(done=False)
+    weekly = Q(created_at__date__gte=week_start)
+
+    aggregates = {
+        'total': Count('id'),
+        'completed': Count('id', filter=Q(done=True)),
+        'pending': Count('id', filter=pending),
+        'overdue': Count('id', filter=pending & Q(date__lt=today)),
+        'important': Count('id', filter=Q(important=True)),
+        'due_soon': Count('id', filter=pending & Q(
+            date__gte=today,
+            date__lte=today + timedelta(days=DUE_SOON_DAYS),
+        )),
+        'weekly_total': Count('id', filter=weekly),
+        'weekly_completed': Count('id', filter=weekly & Q(done=True)),
+    }
+    for value, _ in Task.PRIORITY_CHOICES:
+        aggregates[f'priority_{value}'] = Count('id', filter=Q(priority=value))
+    for value, _ in Task.PROJECT_CHOICES:
+        aggregates[f'project_{value}'] = Count('id', filter=Q(project=value))
+    return aggregates
+
+
+def _stats_from_row(row):
+    return {
+        'total': row['total'],
+        'completed': row['completed'],
+        'pending': row['pending'],
+        'overdue': row['overdue'],
+        'important': row['important'],
+        'due_soon': row['due_soon'],
+        'weekly_total': row['weekly_total'],
+        'weekly_completed': row['weekly_completed'],
+        'priority_stats': {
+            value: row[f'priority_{value}'] for value, _ in Task.PRIORITY_CHOICES
+        },
+        # Only projects that actually have tasks, like the old per-row loop
+        'project_stats': {
+            value: row[f'project_{value}']
+            for value, _ in Task.PROJECT_CHOICES
+            if row[f'project_{value}']
+        },
+    }
+
+
+def compute_task_stats(user, days=7, today=None):
+    """Return every task counter for ``user`` in one aggregate query"""
+    today = today or timezone.now().date()
+    return _stats_from_row(Task.objects.filter(user=user).aggregate(**_aggregates(days, today)))
+
+
+async def acompute_task_stats(user, days=7, today=None):
+    """``compute_task_stats`` for async views"""
+    today = today or timezone.now().date()
+    return _stats_from_row(await Task.objects.filter(user=user).aaggregate(**_aggregates(days, today)))
+
+
+def completion_rate(completed, total):
+    """Percentage of completed tasks rounded to one decimal place"""
+    return round((completed / total * 100) if total > 0 else 0, 1)
+
+
+def task_stats_data(stats):
+    """The stats endpoint's response body"""
+    return {
+        'total_tasks': stats['total'],
+        'completed_tasks': stats['completed'],
+        'pending_tasks': stats['pending'],
+        'overdue_tasks': stats['overdue'],
+        'important_tasks': stats['important'],
+        'completion_rate': completion_rate(stats['completed'], stats['total']),
+        'project_stats': stats['project_stats']
+    }
+
+
+def dashboard_stats_data(stats):
+    """The dashboard stats endpoint's response body"""
+    return {
+        'weekly': {
+            'total': stats['weekly_total'],
+            'completed': stats['weekly_completed'],
+            'completion_rate': completion_rate(stats['weekly_completed'], stats['weekly_total'])
+        },
+        'priority_stats': stats['priority_stats'],
+        'project_stats': stats['project_stats'],
+        'due_soon': stats['due_soon'],
+        'total_overdue': stats['overdue'],
+    }
+
+
+# =============================================================================
+# PER-USER CACHE
+# =============================================================================
+
+def _seconds_until_midnight(today):
+    """Seconds left before ``today`` (a UTC date, like ``timezone.now().date()``) ends"""
+    midnight = datetime.combine(today + timedelta(days=1), dt_time.min, tzinfo=dt_timezone.utc)
+    return max(1, int((midnight - timezone.now()).total_seconds()))
+
+
+def _stats_key(user, version, days, today):
+    return f'task_stats:{user.pk}:{version}:{today.isoformat()}:{days}'
+
+
+def get_task_stats(user, days=7):
+    """Cached ``compute_task_stats`` for the current day"""
+    today = timezone.now().date()
+    key = _stats_key(user, get_version(user.pk, TASKS), days, today)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_task_stats(user, days=days, today=today)
+        # Overdue and due soon depend on the date, so never outlive it
+        cache.set(key, stats, timeout=_seconds_until_midnight(today))
+    return stats
+
+
+async def aget_task_stats(user, days=7):
+    """``get_task_stats`` for async views"""
+    today = timezone.now().date()
+    key = _stats_key(user, await aget_version(user.pk, TASKS), days, today)
+    stats = cache.get(key)
+    if stats is None:
+        stats = await acompute_task_stats(user, days=days, today=today)
+        cache.set(key, stats, timeout=_seconds_until_midnight(today))
+    return stats
@@ -1,3 +1,904 @@
-from django.test import TestCase
+import csv
+import json
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import serializers
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser as DRFJSONParser
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
+
+from todo_web_application.parsers import JSONParser
+from todo_web_application.renderers import JSONRenderer
+from useraccount.models import AppUser
+
+from . import events, reminders
+from .counters import get_unread_count
+from .events import Subscription
+from .models import Notification, NotificationCounter, Task
+from .notifications import _write, build_notification
+from .reminders import scan_due_tasks
+from .retention import prune_notifications
+from .serializers import TaskRowSerializer, TaskSerializer
+from .stats import compute_task_stats, get_task_stats
+from .sync import delete_tasks
+from .versioning import NOTIFICATIONS, TASKS, get_versions
+from .views import _event_stream
+
+READ_PATHS = [
+    '/tasko/api/tasks/',
+    '/tasko/api/tasks/?page_size=5&ordering=title',
+    '/tasko/api/tasks/?search=task&done=false',
+    '/tasko/api/notifications/',
+    '/tasko/api/notifications/unread_count/',
+    '/tasko/api/stats/',
+    '/tasko/api/dashboard-stats/?days=3',
+    '/tasko/api/dashboard-stats/?days=abc',
+    '/tasko/api/dashboard-stats/?days=0',
+    '/tasko/api/dashboard-stats/?days=100000',
+]
+
+
+class LoggedInTestCase(TestCase):
+    """A user with a logged in ``self.client``"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = AppUser(email='a@example.com', first_name='A', last_name='B')
+        self.user.set_password('pw12345678')
+        self.user.save()
+        self.client.post('/useraccounts/api/user/login/',
+                         {'email': 'a@example.com', 'password': 'pw12345678'},
+                         content_type='application/json')
+        # Same session for both clients
+        self.async_client.cookies = self.client.cookies
+
+    def post(self, path, data):
+        return self.client.post(path, data, content_type='application/json')
+
+
+class TaskStatsTests(LoggedInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.now().date()
+        day = timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(user=self.user, title='Overdue', priority='high', project='work',
+                                date=self.today - day)
+            Task.objects.create(user=self.user, title='Due soon', priority='high', important=True,
+                                date=self.today + 2 * day)
+            Task.objects.create(user=self.user, title='Later', priority='low', project='work',
+                                date=self.today + 10 * day)
+            Task.objects.create(user=self.user, title='Done', priority='medium', project='health',
+                                done=True, date=self.today - day)
+            Task.objects.create(user=self.user, title='Old', priority='low', done=True,
+                                created_at=timezone.now() - 30 * day)
+            other = AppUser.objects.create(email='b@example.com', first_name='B', last_name='C')
+            Task.objects.create(user=other, title='Not mine', priority='high', date=self.today - day)
+
+    def test_task_stats(self):
+        self.assertEqual(self.client.get('/tasko/api/stats/').json(), {
+            'total_tasks': 5,
+            'completed_tasks': 2,
+            'pending_tasks': 3,
+            'overdue_tasks': 1,
+            'important_tasks': 1,
+            'completion_rate': 40.0,
+            'project_stats': {'work': 2, 'health': 1},
+        })
+
+    def test_dashboard_stats(self):
+        self.assertEqual(self.client.get('/tasko/api/dashboard-stats/').json(), {
+            'weekly': {'total': 4, 'completed': 1, 'completion_rate': 25.0},
+            'priority_stats': {'high': 2, 'medium': 1, 'low': 2},
+            'project_stats': {'work': 2, 'health': 1},
+            'due_soon': 1,
+            'total_overdue': 1,
+        })
+        response = self.client.get('/tasko/api/dashboard-stats/', {'days': 60})
+        self.assertEqual(response.json()['weekly'], {'total': 5, 'completed': 2, 'completion_rate': 40.0})
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            compute_task_stats(self.user, today=self.today)
+
+    def test_cached_until_a_task_changes(self):
+        self.assertEqual(get_task_stats(self.user)['completed'], 2)
+        # Only the version lookup
+        with self.assertNumQueries(1):
+            get_task_stats(self.user)
+        task = Task.objects.get(title='Due soon')
+        writes = [
+            lambda: self.post('/tasko/api/tasks/bulk_update/', {'task_ids': [task.pk], 'action': 'mark_done'}),
+            lambda: self.post('/tasko/api/bulk-operations/', {'operation': 'delete_completed'}),
+            lambda: self.client.delete(f'/tasko/api/tasks/{Task.objects.get(title="Later").pk}/'),
+            lambda: self.post('/tasko/api/tasks/', {'title': 'New', 'priority': 'low', 'done': True}),
+        ]
+        for write, counts in zip(writes, [(3, 5), (0, 2), (0, 1), (1, 2)]):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertLess(write().status_code, 300)
+            stats = get_task_stats(self.user)
+            self.assertEqual((stats['completed'], stats['total']), counts)
+
+
+class CursorPaginationTests(LoggedInTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        dates = [None, 3, 1, None, 2, 1, 5]
+        for i, days in enumerate(dates):
+            # Pairs created in the same instant, to exercise the id tie-break
+            Task.objects.create(user=self.user, title=f'Task {i}', priority='low',
+                                created_at=now - timedelta(minutes=i // 2),
+                                date=None if days is None else now.date() + timedelta(days=days))
+
+    def walk(self, path, params):
+        ids = []
+        response = self.client.get(path, params)
+        while True:
+            body = response.json()
+            ids += [row['id'] for row in body['results']]
+            if not body['next']:
+                return ids
+            response = self.client.get(body['next'])
+
+    def test_pages_cover_every_task_newest_first(self):
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk('/tasko/api/tasks/', {'page_size': 2}), expected)
+
+    def test_ordering_by_a_nullable_date(self):
+        expected = [task.id for task in sorted(
+            Task.objects.all(), key=lambda task: (task.date is None, task.date or 0, -task.id))]
+        self.assertEqual(self.walk('/tasko/api/tasks/', {'page_size': 2, 'ordering': 'date'}), expected)
+
+    def test_new_rows_do_not_shift_later_pages(self):
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        response = self.client.get('/tasko/api/tasks/', {'page_size': 3})
+        ids = [row['id'] for row in response.json()['results']]
+        Task.objects.create(user=self.user, title='New', priority='low')
+        response = self.client.get(response.json()['next'])
+        ids += [row['id'] for row in response.json()['results']]
+        self.assertEqual(ids, expected[:6])
+
+    def test_notifications_are_paged(self):
+        for i in range(3):
+            Notification.objects.create(user=self.user, title=f'N{i}', desc='', notification_type='due_soon')
+        expected = list(Notification.objects.filter(user=self.user)
+                        .order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk('/tasko/api/notifications/', {'page_size': 2}), expected)
+
+
+class TaskIndexTests(TestCase):
+    def test_stock_queries_use_an_index(self):
+        AppUser.objects.create(email='a@example.com', first_name='A', last_name='B')
+        out = StringIO()
+        call_command('explain_task_queries', stdout=out)
+        self.assertNotIn('no index', out.getvalue())
+
+
+class EventStreamTests(LoggedInTestCase):
+    def test_needs_asgi(self):
+        self.assertEqual(self.client.get('/tasko/api/events/').status_code, 501)
+
+    async def test_needs_authentication(self):
+        self.async_client.cookies.clear()
+        self.assertEqual((await self.async_client.get('/tasko/api/events/')).status_code, 401)
+
+    @override_settings(EVENT_STREAM_KEEPALIVE=0.01, EVENT_STREAM_MAX_SECONDS=0.05)
+    async def test_stream_ends_after_its_lifetime(self):
+        response = await self.async_client.get('/tasko/api/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = [chunk async for chunk in response]
+        self.assertEqual(frames[0], b'retry: 3000\n\n')
+        self.assertIn(b': keepalive\n\n', frames)
+
+    async def test_changes_reach_the_owners_streams(self):
+        other = await AppUser.objects.acreate(email='b@example.com', first_name='B', last_name='C')
+        mine = _event_stream(self.user.pk)
+        theirs = _event_stream(other.pk)
+        self.assertEqual(await anext(mine), 'retry: 3000\n\n')
+        await anext(theirs)
+        await sync_to_async(self.create_task)()
+        frames = [await anext(mine) for _ in range(3)]
+        self.assertEqual(frames[0], 'event: changed\ndata: {"collections":["tasks"]}\n\n')
+        self.assertTrue(frames[1].startswith('event: notification\ndata: '))
+        self.assertIn('"notification_type":"task_created"', frames[1])
+        self.assertEqual(frames[2], 'event: changed\ndata: {"collections":["notifications"]}\n\n')
+        await mine.aclose()
+        with override_settings(EVENT_STREAM_KEEPALIVE=0.01):
+            self.assertEqual(await anext(theirs), ': keepalive\n\n')
+        await theirs.aclose()
+        self.assertFalse(events.get_broadcast().has_subscribers(self.user.pk))
+
+    def create_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(user=self.user, title='New', priority='low')
+
+    def test_full_queues_drop_the_oldest_event(self):
+        subscription = Subscription(events.get_broadcast(), self.user.pk, maxsize=2)
+        for i in range(3):
+            subscription.put(i)
+        self.assertEqual([subscription.queue.get_nowait() for _ in range(2)], [1, 2])
+
+
+class DueTaskScanTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.users = [
+            AppUser.objects.create(email=f'{name}@example.com', first_name=name, last_name='B')
+            for name in ('a', 'b')
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in self.users:
+                for title, days, done in [('Overdue', -1, False), ('Due soon', 2, False), ('Later', 10, False),
+                                          ('Done', -1, True), ('Forgotten', -30, False)]:
+                    Task.objects.create(user=user, title=title, priority='low', done=done,
+                                        date=self.today + timedelta(days=days))
+
+    def scan(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return scan_due_tasks(today=self.today, **kwargs)
+
+    def reminders(self):
+        return sorted(Notification.objects.filter(notification_type__in=['overdue', 'due_soon'])
+                      .values_list('user__email', 'notification_type', 'task__title'))
+
+    def test_each_due_date_is_reminded_once(self):
+        self.assertEqual(self.scan()['notifications'], 4)
+        self.assertEqual(self.reminders(), [
+            ('a@example.com', 'due_soon', 'Due soon'), ('a@example.com', 'overdue', 'Overdue'),
+            ('b@example.com', 'due_soon', 'Due soon'), ('b@example.com', 'overdue', 'Overdue'),
+        ])
+        self.assertEqual(self.scan()['notifications'], 0)
+        self.assertEqual(self.scan(restart=True)['notifications'], 0)
+        # Moving the due date earns a new reminder
+        Task.objects.filter(title='Later').update(date=self.today + timedelta(days=1))
+        self.assertEqual(self.scan(restart=True)['notifications'], 2)
+
+    def test_interrupted_scan_resumes(self):
+        process_batch = reminders._process_batch
+        calls = []
+
+        def fail_second_chunk(rows, today):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError('killed')
+            return process_batch(rows, today)
+
+        with mock.patch.object(reminders, '_process_batch', fail_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.scan(chunk_size=1)
+        self.assertEqual(len(self.reminders()), 2)
+        result = self.scan(chunk_size=1)
+        self.assertTrue(result['resumed'])
+        self.assertEqual((result['users'], result['notifications']), (1, 2))
+        self.assertEqual(len(self.reminders()), 4)
+
+
+class UnreadCounterTests(LoggedInTestCase):
+    def unread(self):
+        return self.client.get('/tasko/api/notifications/unread_count/').json()['unread']
+
+    def notify(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [Notification.objects.create(user=self.user, title='Hi', desc='There',
+                                                notification_type='due_soon') for _ in range(count)]
+
+    def test_counter_follows_every_write_path(self):
+        notifications = self.notify(3)
+        self.assertEqual(self.unread(), 3)
+        steps = [
+            (lambda: self.client.patch(f'/tasko/api/notifications/{notifications[0].pk}/', {'read': True},
+                                       content_type='application/json'), 2),
+            (lambda: self.client.delete(f'/tasko/api/notifications/{notifications[1].pk}/'), 1),
+            # Written in bulk after the task commits
+            (lambda: self.post('/tasko/api/tasks/', {'title': 'New', 'priority': 'low'}), 2),
+            (lambda: self.post('/tasko/api/notifications/mark_all_read/', {}), 0),
+            (lambda: self.notify(2), 2),
+            (lambda: self.client.delete('/tasko/api/notifications/clear_all/'), 0),
+        ]
+        for write, unread in steps:
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            self.assertEqual(self.unread(), unread)
+
+    def test_count_is_a_single_lookup(self):
+        self.notify(2)
+        get_unread_count(self.user.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_count(self.user.id), 2)
+
+    def test_missing_counter_is_rebuilt(self):
+        self.notify(2)
+        NotificationCounter.objects.filter(user=self.user).delete()
+        self.assertEqual(get_unread_count(self.user.id), 2)
+
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        self.user = AppUser.objects.create(email='a@example.com', first_name='A', last_name='B')
+        self.now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            for title, days, read in [('new', 0, False), ('new read', 0, True), ('month', 40, False),
+                                      ('month read', 40, True), ('ancient', 100, False)]:
+                notification = Notification.objects.create(user=self.user, title=title, desc='',
+                                                           notification_type='due_soon', read=read)
+                Notification.objects.filter(pk=notification.pk).update(
+                    created_at=self.now - timedelta(days=days))
+
+    def titles(self):
+        return sorted(Notification.objects.values_list('title', flat=True))
+
+    def test_expired_notifications_are_removed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = prune_notifications(now=self.now)
+        self.assertEqual(result['expired'], 2)
+        self.assertEqual(self.titles(), ['month', 'new', 'new read'])
+        self.assertEqual(get_unread_count(self.user.id), 2)
+
+    @override_settings(NOTIFICATION_MAX_PER_USER=2)
+    def test_over_the_limit_read_ones_go_first(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = prune_notifications(now=self.now)
+        self.assertEqual(result['over_limit'], 1)
+        self.assertEqual(self.titles(), ['month', 'new'])
+
+    def test_drifted_counters_are_fixed(self):
+        get_unread_count(self.user.id)
+        NotificationCounter.objects.filter(user=self.user).update(unread=42)
+        with self.captureOnCommitCallbacks(execute=True):
+            result = prune_notifications(now=self.now)
+        self.assertEqual(result['counters_fixed'], 1)
+        self.assertEqual(get_unread_count(self.user.id), 2)
+
+
+class TaskSearchTests(LoggedInTestCase):
+    def setUp(self):
+        super().setUp()
+        self.mum = Task.objects.create(user=self.user, title='Call mum', desc='About the milk', priority='low')
+        self.milk = Task.objects.create(user=self.user, title='Buy milk', desc='From the shop', priority='low')
+        Task.objects.create(user=self.user, title='Write report', priority='low')
+        other = AppUser.objects.create(email='b@example.com', first_name='B', last_name='C')
+        Task.objects.create(user=other, title='Milk', priority='low')
+
+    def search(self, text, **params):
+        response = self.client.get('/tasko/api/tasks/', {'search': text, **params})
+        return [task['title'] for task in response.json()['results']]
+
+    def test_every_word_matches_as_a_prefix(self):
+        self.assertEqual(self.search('mil'), ['Buy milk', 'Call mum'])
+        self.assertEqual(self.search('MILK sho'), ['Buy milk'])
+        self.assertEqual(self.search('milk report'), [])
+
+    def test_title_matches_rank_first_unless_ordering_is_given(self):
+        self.assertEqual(self.search('milk', ordering='-title'), ['Call mum', 'Buy milk'])
+
+    @override_settings(SEARCH_RANK_MAX_MATCHES=1)
+    def test_broad_queries_are_not_ranked(self):
+        # Newest first
+        self.assertEqual(self.search('milk'), ['Buy milk', 'Call mum'])
+        Task.objects.filter(pk=self.milk.pk).update(created_at=self.mum.created_at - timedelta(days=1))
+        self.assertEqual(self.search('milk'), ['Call mum', 'Buy milk'])
+
+    def test_search_syntax_is_ignored(self):
+        self.assertEqual(self.search('"mum* (-:'), ['Call mum'])
+        self.assertEqual(len(self.search('*')), 3)
+
+    def test_index_follows_bulk_writes(self):
+        Task.objects.filter(pk=self.mum.pk).update(title='Call dad', desc='')
+        Task.objects.bulk_create([Task(user=self.user, title='Milk the cow', priority='low')])
+        self.assertEqual(sorted(self.search('milk')), ['Buy milk', 'Milk the cow'])
+        self.assertEqual(self.search('dad'), ['Call dad'])
+        Task.objects.filter(pk=self.milk.pk).delete()
+        self.assertEqual(self.search('milk'), ['Milk the cow'])
+
+
+class JSONRenderingTests(SimpleTestCase):
+    values = [
+        timezone.now(),
+        datetime(2026, 1, 1, 12, 0, 0, 123456, tzinfo=ZoneInfo('Europe/Paris')),
+        datetime(2026, 1, 1, 12, 0),
+        date(2026, 1, 1),
+        time(1, 2, 3, 456789),
+        Decimal('1.10'),
+        uuid.UUID(int=1),
+        'Tâche "📝"\n\u2028\u2029',
+        gettext_lazy('Task'),
+        2 ** 70,
+        40.0,
+        timedelta(seconds=5),
+        {'nested': [1, None, True, 1.5]},
+    ]
+
+    def test_output_matches_drf(self):
+        for value in self.values:
+            with self.subTest(value=value):
+                data = {'value': value}
+                self.assertEqual(JSONRenderer().render(data), DRFJSONRenderer().render(data))
+
+    def test_indented_output_falls_back_to_drf(self):
+        data = {'value': [1, 2]}
+        context = {'indent': 2}
+        self.assertEqual(JSONRenderer().render(data, renderer_context=context),
+                         DRFJSONRenderer().render(data, renderer_context=context))
+
+    def test_parser_matches_drf(self):
+        body = '{"title": "Tâche \\u2028", "ids": [1, 2.5, null], "big": 1180591620717411303424}'.encode()
+        self.assertEqual(JSONParser().parse(BytesIO(body)), DRFJSONParser().parse(BytesIO(body)))
+        for body in [b'{"a": NaN}', b'{"a": ', b'\xff']:
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                JSONParser().parse(BytesIO(body))
+
+    def test_api_uses_the_orjson_renderer(self):
+        self.assertIn('todo_web_application.renderers.JSONRenderer',
+                      settings.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'])
+
+
+class AsyncReadEndpointTests(TestCase):
+    """The async views served under ASGI answer exactly as the DRF views under WSGI"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = AppUser(email='a@example.com', first_name='A', last_name='B')
+        self.user.set_password('pw12345678')
+        self.user.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(12):
+                Task.objects.create(user=self.user, title=f'Task {i}', priority='high',
+                                    done=i % 3 == 0, project='work' if i % 2 else None)
+            Notification.objects.create(user=self.user, title='Hello', desc='World')
+        self.client.post('/useraccounts/api/user/login/',
+                         {'email': 'a@example.com', 'password': 'pw12345678'},
+                         content_type='application/json')
+        # Same session for both clients
+        self.async_client.cookies = self.client.cookies
+
+    def test_responses_match_wsgi(self):
+        task = Task.objects.filter(user=self.user).first()
+        for path in READ_PATHS + [f'/tasko/api/tasks/{task.pk}/', '/tasko/api/tasks/999999/']:
+            with self.subTest(path=path):
+                wsgi = self.client.get(path)
+                asgi = async_to_sync(self.async_client.get)(path)
+                self.assertTrue(iscoroutinefunction(asgi.asgi_request.resolver_match.func))
+                self.assertEqual(asgi.status_code, wsgi.status_code)
+                self.assertEqual(asgi.content, wsgi.content)
+                self.assertEqual(asgi.get('ETag'), wsgi.get('ETag'))
+
+    def test_bad_days_answer_400(self):
+        for days in ['abc', '0', '100000']:
+            with self.subTest(days=days):
+                response = self.client.get('/tasko/api/dashboard-stats/', {'days': days})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('days', response.json())
+
+    async def test_unchanged_collection_answers_304(self):
+        response = await self.async_client.get('/tasko/api/tasks/')
+        response = await self.async_client.get('/tasko/api/tasks/',
+                                               headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_browsable_api_falls_back_to_the_viewset(self):
+        response = await self.async_client.get('/tasko/api/tasks/', headers={'Accept': 'text/html'})
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+
+    async def test_writes_fall_back_to_the_viewset(self):
+        response = await self.async_client.post('/tasko/api/tasks/', {'title': 'New', 'priority': 'low'},
+                                                content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        response = await self.async_client.get(f"/tasko/api/tasks/{response.json()['id']}/")
+        self.assertEqual(response.json()['title'], 'New')
+
+    async def test_authentication_is_required(self):
+        self.async_client.cookies.clear()
+        response = await self.async_client.get('/tasko/api/stats/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+        response = await self.async_client.get('/tasko/api/stats/', headers={'Authorization': 'Bearer junk'})
+        self.assertEqual(response.json(), {'detail': 'Invalid token'})
+
+
+class CollectionVersionTests(LoggedInTestCase):
+    polled = [
+        '/tasko/api/tasks/',
+        '/tasko/api/notifications/',
+        '/tasko/api/notifications/unread_count/',
+        '/tasko/api/stats/',
+        '/tasko/api/dashboard-stats/',
+    ]
+
+    def test_unchanged_polls_answer_304(self):
+        for path in self.polled:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response['Cache-Control'], 'private, no-cache')
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+                response = self.client.get(path, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_etags_depend_on_the_user_and_url(self):
+        etag = self.client.get('/tasko/api/tasks/')['ETag']
+        self.assertNotEqual(self.client.get('/tasko/api/tasks/?done=true')['ETag'], etag)
+        other = AppUser(email='b@example.com', first_name='B', last_name='C')
+        other.set_password('pw12345678')
+        other.save()
+        self.post('/useraccounts/api/user/login/', {'email': 'b@example.com', 'password': 'pw12345678'})
+        response = self.client.get('/tasko/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_reading_notifications_changes_the_unread_count(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title='Hi', desc='There', notification_type='due_soon')
+        etag = self.client.get('/tasko/api/notifications/unread_count/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post('/tasko/api/notifications/mark_all_read/', {})
+        response = self.client.get('/tasko/api/notifications/unread_count/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'unread': 0})
+
+    def test_versions_are_shared_between_workers(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(user=self.user, title='Old', priority='low')
+        etag = self.client.get('/tasko/api/tasks/')['ETag']
+        # Another worker, with nothing in its own cache
+        cache.clear()
+        response = self.client.get('/tasko/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(user=self.user, title='New', priority='low')
+        cache.clear()
+        response = async_to_sync(self.async_client.get)('/tasko/api/tasks/',
+                                                        headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_a_write_only_changes_its_own_collection(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(user=self.user, title='Old', priority='low')
+        before = get_versions(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title='Hi', desc='There', notification_type='due_soon')
+        after = get_versions(self.user.id)
+        self.assertEqual(after[TASKS], before[TASKS])
+        self.assertNotEqual(after[NOTIFICATIONS], before[NOTIFICATIONS])
+
+
+class TaskExportTests(LoggedInTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            Task.objects.create(user=self.user, title=f'Task {i}', priority='high', done=i % 2 == 0)
+        other = AppUser.objects.create(email='b@example.com', first_name='B', last_name='C')
+        Task.objects.create(user=other, title='Not mine', priority='low')
+
+    def test_ndjson_matches_the_list_endpoint(self):
+        response = self.client.get('/tasko/api/tasks/export/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        listed = self.client.get('/tasko/api/tasks/', {'page_size': 100}).json()['results']
+        self.assertEqual(sorted(json.loads(line)['id'] for line in lines),
+                         sorted(task['id'] for task in listed))
+        self.assertEqual(len(lines), 5)
+
+    def test_csv_has_a_header_and_one_row_per_task(self):
+        response = self.client.get('/tasko/api/tasks/export/', {'as': 'csv', 'done': 'true'})
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], list(TaskSerializer.Meta.fields))
+        self.assertEqual(len(rows), 1 + 3)
+
+    def test_chunks_do_not_change_the_output(self):
+        whole = b''.join(self.client.get('/tasko/api/tasks/export/').streaming_content)
+        with override_settings(EXPORT_CHUNK_SIZE=2):
+            response = self.client.get('/tasko/api/tasks/export/')
+            chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b''.join(chunks), whole)
+
+    def test_unknown_format_answers_400(self):
+        response = self.client.get('/tasko/api/tasks/export/', {'as': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_streams_under_asgi(self):
+        wsgi = self.client.get('/tasko/api/tasks/export/?as=csv')
+        asgi = async_to_sync(self.async_client.get)('/tasko/api/tasks/export/?as=csv')
+        self.assertTrue(asgi.is_async)
+
+        async def read(response):
+            return b''.join([chunk async for chunk in response])
+        self.assertEqual(async_to_sync(read)(asgi), b''.join(wsgi.streaming_content))
+
+
+class TaskRowSerializerTests(TestCase):
+    def setUp(self):
+        self.user = AppUser.objects.create(email='a@example.com', first_name='A', last_name='B')
+        Task.objects.create(user=self.user, title='Task', priority='high')
+
+    def test_output_is_byte_identical(self):
+        today = timezone.now().date()
+        for project in [None, 'work', 'personal', 'health']:
+            for days in [None, -1, 0, 3]:
+                Task.objects.create(user=self.user, title='Tâche "ünïcode" 📝', desc='a\nb', priority='low',
+                                    project=project, done=days == -1, important=days == 0,
+                                    date=None if days is None else today + timedelta(days=days))
+        # A timestamp with no microseconds, which isoformat() leaves out
+        Task.objects.filter(title='Task').update(created_at=timezone.now().replace(microsecond=0))
+        renderer = DRFJSONRenderer()
+        for zone in ['UTC', 'Europe/Paris']:
+            with self.subTest(zone=zone), timezone.override(zone):
+                queryset = Task.objects.order_by('id')
+                expected = renderer.render(TaskSerializer(queryset, many=True).data)
+                serializer = TaskRowSerializer()
+                rows = [serializer.to_representation(row) for row in TaskRowSerializer.values(queryset)]
+                self.assertEqual(renderer.render(rows), expected)
+
+    def test_values_skips_aliases(self):
+        queryset = (
+            Task.objects.alias(search_match=Value(True)).filter(search_match=True)
+            .annotate(search_rank=F('id'))
+        )
+        rows = list(TaskRowSerializer.values(queryset))
+        self.assertEqual(len(rows), 1)
+        self.assertIn('search_rank', rows[0])
+        self.assertNotIn('search_match', rows[0])
+
+
+class TaskNotificationTests(LoggedInTestCase):
+    def notification_types(self):
+        return list(Notification.objects.filter(user=self.user).order_by('id')
+                    .values_list('notification_type', flat=True))
+
+    def test_each_change_is_notified(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task_id = self.post('/tasko/api/tasks/', {'title': 'Task', 'priority': 'low'}).json()['id']
+        changes = [
+            ({'done': True, 'important': True}, ['task_completed', 'task_important']),
+            ({'project': 'work'}, ['project_assigned']),
+            ({'project': 'health', 'title': 'Renamed'}, ['project_changed', 'task_updated']),
+            ({'title': 'Renamed'}, []),
+        ]
+        expected = ['task_created']
+        for data, types in changes:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(f'/tasko/api/tasks/{task_id}/', data, content_type='application/json')
+            expected += types
+            self.assertEqual(self.notification_types(), expected)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/tasko/api/tasks/{task_id}/')
+        self.assertEqual(self.notification_types()[-1], 'task_deleted')
+
+    def test_bulk_actions_insert_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = [Task.objects.create(user=self.user, title=f'Task {i}', priority='low').id for i in range(20)]
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            self.post('/tasko/api/tasks/bulk_update/', {'task_ids': ids, 'action': 'mark_done'})
+        inserts = [q for q in queries.captured_queries
+                   if q['sql'].startswith(f'INSERT INTO "{Notification._meta.db_table}"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.notification_types().count('task_completed'), 20)
+
+    def test_rolled_back_writes_notify_nobody(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Task.objects.create(user=self.user, title='Task', priority='low')
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(self.notification_types(), [])
+
+
+class NotificationWriteTests(TestCase):
+    def test_links_to_deleted_tasks_are_dropped(self):
+        user = AppUser.objects.create(email='a@example.com', first_name='A', last_name='B')
+        task = Task.objects.create(user=user, title='Kept', priority='high')
+        Notification.objects.all().delete()
+        _write([
+            build_notification(user.id, 'task_updated', 'Gone', task_id=task.id + 1000),
+            build_notification(user.id, 'task_updated', 'Kept', task_id=task.id),
+        ])
+        # TestCase checks deferred foreign keys before rolling back
+        self.assertCountEqual(Notification.objects.values_list('task_id', flat=True), [None, task.id])
+
+    def test_loaddata_saves_notify_nobody(self):
+        user = AppUser.objects.create(email='a@example.com', first_name='A', last_name='B')
+        task = Task.objects.create(user=user, title='Loaded', priority='high')
+        fixture = serializers.serialize('json', [task])
+        Task.objects.all().delete()
+        Notification.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            for obj in serializers.deserialize('json', fixture):
+                obj.save()
+        self.assertTrue(Task.objects.filter(title='Loaded').exists())
+        self.assertFalse(Notification.objects.exists())
+
+
+class TaskDeleteTests(TestCase):
+    def setUp(self):
+        self.user = AppUser.objects.create(email='a@example.com', first_name='A', last_name='B')
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Task.objects.create(user=self.user, title=f'Task {i}', priority='high')
+
+    def test_deletes_are_fast(self):
+        self.assertTrue(Notification.objects.filter(task__isnull=False).exists())
+        # The tasks are read once; they, their notifications and their
+        # alerts go in one DELETE each, with no rows loaded for signals
+        with self.assertNumQueries(4):
+            Task.objects.filter(user=self.user).delete()
+
+    def test_delete_marks_collections_changed_once(self):
+        before = get_versions(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertEqual(delete_tasks(self.user, Task.objects.all()), 3)
+        after = get_versions(self.user.id)
+        self.assertNotEqual(after[TASKS], before[TASKS])
+        self.assertNotEqual(after[NOTIFICATIONS], before[NOTIFICATIONS])
+        # The version bump and the notification write
+        self.assertEqual(len(callbacks), 2)
+
+
+class TaskBatchTests(LoggedInTestCase):
+    url = '/tasko/api/tasks/batch/'
+
+    def setUp(self):
+        super().setUp()
+        self.kept = Task.objects.create(user=self.user, title='Kept', priority='high')
+        self.gone = Task.objects.create(user=self.user, title='Gone', priority='high')
+
+    def test_applies_every_operation(self):
+        response = self.post(self.url, {'operations': [
+            {'op': 'create', 'data': {'title': 'New', 'priority': 'low'}},
+            {'op': 'update', 'id': self.kept.id, 'data': {'done': True}},
+            {'op': 'delete', 'id': self.gone.id},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'updated', 'deleted'])
+        self.assertEqual(results[0]['task']['title'], 'New')
+        self.assertTrue(results[1]['task']['done'])
+        self.kept.refresh_from_db()
+        self.assertTrue(self.kept.done)
+        self.assertFalse(Task.objects.filter(id=self.gone.id).exists())
+        self.assertTrue(Task.objects.filter(user=self.user, title='New').exists())
+
+    def test_duplicate_ids_are_rejected(self):
+        response = self.post(self.url, [
+            {'op': 'update', 'id': self.kept.id, 'data': {'done': True}},
+            {'op': 'delete', 'id': self.kept.id},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], {'1': {'id': ['Task appears more than once in this batch']}})
+
+    def test_missing_and_foreign_tasks_are_not_found(self):
+        other = AppUser.objects.create(email='b@example.com', first_name='B', last_name='C')
+        theirs = Task.objects.create(user=other, title='Theirs', priority='high')
+        response = self.post(self.url, [
+            {'op': 'delete', 'id': theirs.id},
+            {'op': 'update', 'id': 999999, 'data': {'priority': 'urgent'}},
+        ])
+        errors = response.json()['errors']
+        self.assertEqual(errors['0'], {'id': ['Task not found']})
+        # Both problems with the second operation are reported
+        self.assertEqual(errors['1']['id'], ['Task not found'])
+        self.assertIn('priority', errors['1']['data'])
+        self.assertTrue(Task.objects.filter(id=theirs.id).exists())
+
+    def test_one_invalid_operation_writes_nothing(self):
+        response = self.post(self.url, [
+            {'op': 'create', 'data': {'title': 'New', 'priority': 'low'}},
+            {'op': 'delete', 'id': self.gone.id},
+            {'op': 'create', 'data': {'priority': 'low'}},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['errors']), ['2'])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+
+    @override_settings(TASK_BATCH_MAX_OPERATIONS=2)
+    def test_operation_limit(self):
+        response = self.post(self.url, [{'op': 'delete', 'id': self.gone.id}] * 3)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], {'non_field_errors': ['At most 2 operations per batch']})
+        self.assertTrue(Task.objects.filter(id=self.gone.id).exists())
+
+
+class SyncTests(LoggedInTestCase):
+    url = '/tasko/api/sync/'
+
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.create(user=self.user, title='Old', priority='high')
+        self.doomed = Task.objects.create(user=self.user, title='Doomed', priority='high')
+        self.watermark = self.client.get(self.url).json()['watermark']
+        # Past the watermark overlap
+        later = timezone.now() + timedelta(seconds=settings.SYNC_WATERMARK_OVERLAP + 1)
+        self.patcher = mock.patch('django.utils.timezone.now', return_value=later)
+        self.patcher.start()
+        self.addCleanup(self.patcher.stop)
+
+    def test_without_since_returns_everything(self):
+        body = self.client.get(self.url).json()
+        self.assertTrue(body['full'])
+        self.assertEqual({t['title'] for t in body['tasks']}, {'Old', 'Doomed'})
+
+    def test_returns_changed_rows_and_tombstones(self):
+        self.task.title = 'Changed'
+        self.task.save()
+        self.post('/tasko/api/tasks/bulk_update/', {'task_ids': [self.doomed.id], 'action': 'delete'})
+        body = self.client.get(self.url, {'since': self.watermark}).json()
+        self.assertFalse(body['full'])
+        self.assertEqual([t['title'] for t in body['tasks']], ['Changed'])
+        self.assertEqual(body['deleted']['tasks'], [self.doomed.id])
+        self.assertNotEqual(body['watermark'], self.watermark)
+
+    def test_watermark_past_the_retention_window_returns_everything(self):
+        since = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+        body = self.client.get(self.url, {'since': since.isoformat()}).json()
+        self.assertTrue(body['full'])
+        self.assertEqual(len(body['tasks']), 2)
+
+    def test_bad_watermarks_are_rejected(self):
+        for since in ['yesterday', '2026-01-01T00:00:00', '2026-13-45T00:00:00Z']:
+            with self.subTest(since=since):
+                response = self.client.get(self.url, {'since': since})
+                self.assertEqual(response.status_code, 400)
+
+
+class TaskImportTests(LoggedInTestCase):
+    url = '/tasko/api/tasks/import/'
+
+    def upload(self, body, content_type, query=''):
+        return self.client.post(self.url + query, body, content_type=content_type)
+
+    def test_ndjson_body(self):
+        body = '{"title": "One", "priority": "high"}\n\n{"title": "Two", "priority": "low", "done": true}\n'
+        response = self.upload(body, 'application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertTrue(Task.objects.get(user=self.user, title='Two').done)
+
+    def test_csv_file(self):
+        csv_file = SimpleUploadedFile(
+            'tasks.csv', b'title,priority,date,project\nOne,high,2026-01-02,work\nTwo,low,,\n',
+        )
+        response = self.client.post(self.url, {'file': csv_file})
+        self.assertEqual(response.json()['created'], 2)
+        two = Task.objects.get(user=self.user, title='Two')
+        self.assertIsNone(two.date)
+        self.assertIsNone(two.project)
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        body = '{"title": "Good", "priority": "high"}\nnot json\n{"title": "Bad", "priority": "urgent"}\n[1]\n'
+        report = self.upload(body, 'application/x-ndjson').json()
+        self.assertEqual((report['created'], report['failed']), (1, 3))
+        self.assertEqual([error['line'] for error in report['errors']], [2, 3, 4])
+        self.assertIn('priority', report['errors'][1]['errors'])
+        self.assertEqual(list(Task.objects.filter(user=self.user).values_list('title', flat=True)), ['Good'])
+
+    def test_unreadable_upload(self):
+        response = self.upload(b'title,priority\n\xff\xfe,high\n', 'text/csv')
+        self.assertEqual(response.status_code, 400)
+
+    def test_multipart_without_a_file(self):
+        response = self.client.post(self.url, {'other': 'field'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'No file uploaded'})
+
+    def test_unknown_format(self):
+        response = self.upload('', 'application/x-ndjson', '?as=xml')
+        self.assertEqual(response.status_code, 400)
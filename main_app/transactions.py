@@ -0,0 +1,30 @@
+from django.db import transaction
+
+
+def defer_until_commit(key, items, flush):
+    """
+    Buffer ``items`` and hand everything buffered under ``key`` to
+    ``flush`` once, after the current transaction commits.
+
+    Outside a transaction ``flush`` runs immediately. If the transaction
+    (or the savepoint the buffer was opened in) rolls back, Django drops
+    the callback and the buffer with it.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        flush(list(items))
+        return
+
+    buffers = connection.__dict__.setdefault('_commit_buffers', {})
+    entry = buffers.get(key)
+    if entry is None or not any(func is entry[0] for _, func, _ in connection.run_on_commit):
+        collected = []
+
+        def callback():
+            if buffers.get(key) is entry:
+                del buffers[key]
+            flush(collected)
+
+        entry = buffers[key] = (callback, collected)
+        transaction.on_commit(callback)
+    entry[1].extend(items)
@@ -17,4 +17,6 @@ urlpatterns = [
     path('api/stats/', views.task_stats, name='task_stats'),
     path('api/dashboard-stats/', views.get_dashboard_stats, name='dashboard_stats'),
     path('api/bulk-operations/', views.bulk_task_operations, name='bulk_operations'),
+    path('api/sync/', views.sync_changes, name='sync'),
+    path('api/events/', views.event_stream, name='event_stream'),
 ]
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Per-user collection versions and conditional GET support.
+
+Each user has a version for their tasks and one for their notifications:
+the time of the last write, kept in one ``CollectionVersion`` row so every
+worker agrees on it. Writes bump it after their transaction commits.
+Cached stats are keyed by the tasks version, and list/stats endpoints
+derive ETag and Last-Modified from the versions alone, so an unchanged
+poll is answered with 304 after a primary key lookup, before any task row
+is read or serialized.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from . import events
+from .models import CollectionVersion
+from .transactions import defer_until_commit
+
+TASKS = 'tasks'
+NOTIFICATIONS = 'notifications'
+COLLECTIONS = (TASKS, NOTIFICATIONS)
+
+
+def _row_versions(row):
+    return {collection: getattr(row, collection) for collection in COLLECTIONS}
+
+
+def get_versions(user_id):
+    """Nanosecond timestamps of the user's last write to each collection"""
+    versions = CollectionVersion.objects.filter(user_id=user_id).values(*COLLECTIONS).first()
+    if versions is None:
+        # Never written: start from now, which can only make clients
+        # refetch, never serve stale data
+        versions = _row_versions(CollectionVersion.objects.get_or_create(user_id=user_id)[0])
+    return versions
+
+
+async def aget_versions(user_id):
+    """``get_versions`` for async views"""
+    versions = await CollectionVersion.objects.filter(user_id=user_id).values(*COLLECTIONS).afirst()
+    if versions is None:
+        versions = _row_versions((await CollectionVersion.objects.aget_or_create(user_id=user_id))[0])
+    return versions
+
+
+def get_version(user_id, collection):
+    return get_versions(user_id)[collection]
+
+
+async def aget_version(user_id, collection):
+    return (await aget_versions(user_id))[collection]
+
+
+def bump_versions(user_ids, collections):
+    """Set ``collections`` of every user in ``user_ids`` to now, in one upsert"""
+    now = time.time_ns()
+    CollectionVersion.objects.bulk_create(
+        [CollectionVersion(user_id=user_id, **{c: now for c in collections}) for user_id in user_ids],
+        update_conflicts=True, unique_fields=['user'], update_fields=list(collections),
+    )
+
+
+def _publish_changes(changes):
+    """Bump versions and tell connected clients which collections changed"""
+    by_user = {}
+    for user_id, collection in set(changes):
+        by_user.setdefault(user_id, []).append(collection)
+    # One upsert per combination of collections, so none is bumped needlessly
+    by_collections = {}
+    for user_id, collections in by_user.items():
+        by_collections.setdefault(tuple(sorted(collections)), []).append(user_id)
+    for collections, user_ids in by_collections.items():
+        bump_versions(user_ids, collections)
+    for user_id, collections in by_user.items():
+        events.publish(user_id, 'changed', {'collections': sorted(collections)})
+
+
+def mark_changed(user_id, *collections):
+    """
+    Bump the versions once the current transaction commits, so readers
+    never cache data computed before the write was visible.
+
+    Calls inside one transaction are coalesced, so deleting 500 tasks
+    bumps each version and publishes one event once rather than 500 times.
+    """
+    changes = [(user_id, collection) for collection in collections]
+    defer_until_commit('collection_changes', changes, _publish_changes)
+
+
+def _version_time(version):
+    return datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
+
+
+def conditional_collection(*collections, per_minute=False):
+    """
+    Decorate a GET view whose output depends only on the request URL, the
+    current user's ``collections`` and the date, with ETag/Last-Modified
+    handling. ``per_minute`` is for output with relative times ("5 minutes
+    ago") that change as the clock moves.
+    """
+    def floor_time():
+        now = timezone.now()
+        if per_minute:
+            return now.replace(second=0, microsecond=0)
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def versions(request):
+        # Read once per request, for both validators
+        if getattr(request, '_collection_versions', None) is None:
+            request._collection_versions = get_versions(request.user.pk)
+        return request._collection_versions
+
+    def etag_func(request, *args, **kwargs):
+        parts = [str(request.user.pk), request.get_full_path(), floor_time().isoformat()]
+        parts += [str(versions(request)[collection]) for collection in collections]
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    def last_modified_func(request, *args, **kwargs):
+        changed = max(_version_time(versions(request)[c]) for c in collections)
+        return max(changed, floor_time())
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            return _async_conditional(view_func, etag_func, last_modified_func)
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Let browsers store the response but always revalidate it
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return inner
+    return decorator
+
+
+def _async_conditional(view_func, etag_func, last_modified_func):
+    """What ``condition`` does, for a coroutine view (Django 4.2's only wraps sync ones)"""
+    @wraps(view_func)
+    async def inner(request, *args, **kwargs):
+        request._collection_versions = await aget_versions(request.user.pk)
+        etag = quote_etag(etag_func(request))
+        last_modified = int(last_modified_func(request).timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await view_func(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            if not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(last_modified)
+            response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return inner
@@ -1,15 +1,37 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.utils import timezone
-from datetime import timedelta
-from django.db.models import Q, Count
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from useraccount.authentication import AppUserSessionAuthentication, AppUserTokenAuthentication
+from . import events
 from .models import Task, Notification  # Remove Project from imports
 from .serializers import (
-    TaskSerializer, NotificationSerializer  # Remove ProjectSerializer
+    TaskSerializer, TaskRowSerializer, NotificationSerializer  # Remove ProjectSerializer
 )
+from .batch import apply_task_batch
+from .export import EXPORT_FORMATS, EXPORTERS, aiter_chunks
+from .importer import IMPORT_FORMATS, InvalidUpload, import_tasks
+from .pagination import CreatedAtCursorPagination
+from .search import TaskSearchFilter
+from .stats import dashboard_stats_data, get_task_stats, parse_days, task_stats_data
+from .counters import get_unread_count, reset_unread
+from .notifications import update_tasks
+from .sync import delete_notifications, delete_tasks, get_changes
+from .versioning import NOTIFICATIONS, TASKS, conditional_collection, mark_changed
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,7 +58,8 @@ class TaskViewSet(viewsets.ModelViewSet):
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [TaskSearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'desc']
     ordering_fields = ['date', 'priority', 'title', 'created_at']
     
@@ -63,13 +86,26 @@ class TaskViewSet(viewsets.ModelViewSet):
         if important is not None:
             queryset = queryset.filter(important=important.lower() == 'true')
         
-        logger.info(f"Found {queryset.count()} tasks")
         return queryset
     
+    @method_decorator(conditional_collection(TASKS))
+    def list(self, request, *args, **kwargs):
+        """List tasks through the values() fast path; same output as TaskSerializer"""
+        rows = TaskRowSerializer.values(self.filter_queryset(self.get_queryset()))
+        serializer = TaskRowSerializer()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+    
     def perform_create(self, serializer):
         """Set the user when creating a task"""
         serializer.save(user=self.request.user)
     
+    def perform_destroy(self, instance):
+        """Delete through the sync helper so a tombstone is recorded"""
+        delete_tasks(self.request.user, Task.objects.filter(pk=instance.pk))
+    
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
         """Bulk update tasks"""
@@ -82,22 +118,94 @@ class TaskViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         tasks = Task.objects.filter(id__in=task_ids, user=request.user)
+        # QuerySet.update() does not apply auto_now
+        now = timezone.now()
         
         if action_type == 'mark_done':
-            tasks.update(done=True)
+            update_tasks(tasks, done=True, updated_at=now)
         elif action_type == 'mark_undone':
-            tasks.update(done=False)
+            update_tasks(tasks, done=False, updated_at=now)
         elif action_type == 'mark_important':
-            tasks.update(important=True)
+            update_tasks(tasks, important=True, updated_at=now)
         elif action_type == 'mark_unimportant':
-            tasks.update(important=False)
+            update_tasks(tasks, important=False, updated_at=now)
         elif action_type == 'delete':
-            tasks.delete()
+            delete_tasks(request.user, tasks)
             return Response({'message': f'{len(task_ids)} tasks deleted'})
         else:
             return Response({'error': 'Invalid action'}, status=status.HTTP_400_BAD_REQUEST)
         
+        # QuerySet.update() skips the post_save signal
+        mark_changed(request.user.id, TASKS)
         return Response({'message': f'{len(task_ids)} tasks updated'})
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Create, update and delete many tasks in one transaction"""
+        payload = request.data
+        if isinstance(payload, dict):
+            payload = payload.get('operations')
+        
+        results, errors = apply_task_batch(request.user, payload)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Serialize every written task in one pass
+        written = [result['task'] for result in results if 'task' in result]
+        serialized = iter(TaskSerializer(written, many=True).data)
+        for result in results:
+            if 'task' in result:
+                result['task'] = next(serialized)
+        return Response({'results': results})
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream all matching tasks as NDJSON (default) or CSV: ?as=ndjson|csv"""
+        # ?format= is taken by DRF's content negotiation
+        export_format = request.query_params.get('as', 'ndjson')
+        if export_format not in EXPORTERS:
+            return Response({'error': f"as must be one of: {', '.join(EXPORTERS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        chunks = EXPORTERS[export_format](queryset)
+        if isinstance(request._request, ASGIRequest):
+            # Streamed as it is read; a sync iterator would be buffered whole
+            chunks = aiter_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[export_format])
+        filename = f"tasks-{timezone.now():%Y%m%d}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_file(self, request):
+        """
+        Import tasks from an NDJSON or CSV upload, sent as the raw request
+        body or as a multipart ``file`` field. ?as=ndjson|csv, defaulting to
+        the upload's content type or file extension.
+        """
+        multipart = request.content_type.startswith('multipart/')
+        upload = request.FILES.get('file') if multipart else None
+        if multipart and upload is None:
+            # Parsing the form consumed request.stream, so there is no body to fall back to
+            return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        source = upload.name if upload else request.content_type
+        import_format = request.query_params.get('as') or ('csv' if 'csv' in source else 'ndjson')
+        if import_format not in IMPORT_FORMATS:
+            return Response({'error': f"as must be one of: {', '.join(IMPORT_FORMATS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        # request.stream reads the body as it arrives instead of loading it
+        lines = upload if upload else request.stream
+        if lines is None:
+            return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            report = import_tasks(request.user, lines, import_format)
+        except InvalidUpload as exc:
+            return Response({'error': f'Could not read upload: {exc}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
 
 # =============================================================================
 # NOTIFICATION VIEWSET
@@ -107,23 +215,43 @@ class NotificationViewSet(viewsets.ModelViewSet):
     """ViewSet for Notification CRUD operations"""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
     
+    # Relative "time" strings change by the minute
+    @method_decorator(conditional_collection(NOTIFICATIONS, per_minute=True))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    def perform_destroy(self, instance):
+        delete_notifications(self.request.user, Notification.objects.filter(pk=instance.pk))
+    
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         """Mark all notifications as read"""
-        count = Notification.objects.filter(user=request.user, read=False).update(read=True)
+        with transaction.atomic():
+            count = Notification.objects.filter(user=request.user, read=False).update(
+                read=True, updated_at=timezone.now()
+            )
+            reset_unread(request.user.id)
+        mark_changed(request.user.id, NOTIFICATIONS)
         return Response({'message': f'{count} notifications marked as read'})
     
+    @method_decorator(conditional_collection(NOTIFICATIONS))
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """Unread notification count for the badge"""
+        return Response({'unread': get_unread_count(request.user.id)})
+    
     @action(detail=False, methods=['delete'])
     def clear_all(self, request):
         """Clear all notifications"""
-        count = Notification.objects.filter(user=request.user).delete()[0]
+        count = delete_notifications(request.user, Notification.objects.all())
         return Response({'message': f'{count} notifications cleared'})
 
 # =============================================================================
@@ -132,52 +260,14 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_collection(TASKS)
 def get_dashboard_stats(request):
     """Get comprehensive dashboard statistics"""
-    user = request.user
-    
     # Get date range from query params (default: last 7 days)
-    days = int(request.query_params.get('days', 7))
-    start_date = timezone.now().date() - timedelta(days=days)
-    
-    tasks = Task.objects.filter(user=user)
-    
-    # Weekly progress
-    weekly_tasks = tasks.filter(created_at__date__gte=start_date)
-    weekly_completed = weekly_tasks.filter(done=True).count()
-    weekly_total = weekly_tasks.count()
-    
-    # Stats by priority
-    priority_stats = {
-        'high': tasks.filter(priority='high').count(),
-        'medium': tasks.filter(priority='medium').count(),
-        'low': tasks.filter(priority='low').count(),
-    }
-    
-    # Project stats - group by project string
-    project_stats = {}
-    for task in tasks:
-        if task.project:
-            project_stats[task.project] = project_stats.get(task.project, 0) + 1
-    
-    # Tasks due soon (next 3 days)
-    due_soon = tasks.filter(
-        done=False,
-        date__gte=timezone.now().date(),
-        date__lte=timezone.now().date() + timedelta(days=3)
-    ).count()
+    days = parse_days(request.query_params.get('days'))
+    stats = get_task_stats(request.user, days=days)
     
-    return Response({
-        'weekly': {
-            'total': weekly_total,
-            'completed': weekly_completed,
-            'completion_rate': round((weekly_completed / weekly_total * 100) if weekly_total > 0 else 0, 1)
-        },
-        'priority_stats': priority_stats,
-        'project_stats': project_stats,
-        'due_soon': due_soon,
-        'total_overdue': tasks.filter(done=False, date__lt=timezone.now().date()).count(),
-    })
+    return Response(dashboard_stats_data(stats))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -187,19 +277,47 @@ def bulk_task_operations(request):
     user = request.user
     
     if operation == 'delete_completed':
-        count = Task.objects.filter(user=user, done=True).delete()[0]
+        count = delete_tasks(user, Task.objects.filter(done=True))
         return Response({'message': f'{count} completed tasks deleted'})
     
     elif operation == 'clear_all':
-        count = Task.objects.filter(user=user).delete()[0]
+        count = delete_tasks(user, Task.objects.all())
         return Response({'message': f'{count} tasks deleted'})
     
     elif operation == 'mark_all_done':
-        count = Task.objects.filter(user=user, done=False).update(done=True)
+        count = update_tasks(Task.objects.filter(user=user), done=True, updated_at=timezone.now())
+        # QuerySet.update() skips the post_save signal
+        mark_changed(user.id, TASKS)
         return Response({'message': f'{count} tasks marked as done'})
     
     return Response({'error': 'Invalid operation'}, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_changes(request):
+    """Tasks and notifications changed or deleted since ?since=<watermark>"""
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            # Well formed but out of range, like month 13
+            since = None
+        if since is None or timezone.is_naive(since):
+            return Response({
+                'error': 'since must be a watermark returned by a previous sync'
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+    changes = get_changes(request.user, since or None)
+    return Response({
+        # 'Z' rather than '+00:00' so the watermark is safe in a query string
+        'watermark': changes['watermark'].isoformat().replace('+00:00', 'Z'),
+        'full': changes['full'],
+        'tasks': TaskSerializer(changes['tasks'], many=True).data,
+        'notifications': NotificationSerializer(changes['notifications'], many=True).data,
+        'deleted': changes['deleted'],
+    })
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def test_auth(request):
@@ -214,31 +332,60 @@ def test_auth(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_collection(TASKS)
 def task_stats(request):
     """Get task statistics for the current user"""
-    tasks = Task.objects.filter(user=request.user)
-    
-    total = tasks.count()
-    completed = tasks.filter(done=True).count()
-    pending = tasks.filter(done=False).count()
-    overdue = tasks.filter(
-        done=False, 
-        date__lt=timezone.now().date()
-    ).count()
-    important = tasks.filter(important=True).count()
-    
-    # Project wise stats - group by project string
-    project_stats = {}
-    for task in tasks:
-        if task.project:
-            project_stats[task.project] = project_stats.get(task.project, 0) + 1
+    stats = get_task_stats(request.user)
     
-    return Response({
-        'total_tasks': total,
-        'completed_tasks': completed,
-        'pending_tasks': pending,
-        'overdue_tasks': overdue,
-        'important_tasks': important,
-        'completion_rate': round((completed / total * 100) if total > 0 else 0, 1),
-        'project_stats': project_stats
-    })
\ No newline at end of file
+    return Response(task_stats_data(stats))
+
+# =============================================================================
+# SERVER-SENT EVENTS
+# =============================================================================
+
+def _authenticate_stream(request):
+    """Run the API authentication classes against a plain Django request"""
+    for auth_class in (AppUserTokenAuthentication, AppUserSessionAuthentication):
+        try:
+            result = auth_class().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+async def _event_stream(user_id):
+    """Yield SSE frames for the user until the stream's lifetime runs out"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.EVENT_STREAM_MAX_SECONDS
+    async with events.get_broadcast().subscribe(user_id) as subscription:
+        # Ask EventSource to reconnect quickly once we close the stream
+        yield 'retry: 3000\n\n'
+        while loop.time() < deadline:
+            event = await subscription.get(timeout=settings.EVENT_STREAM_KEEPALIVE)
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            data = json.dumps(event['data'], cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'))
+            yield f"event: {event['type']}\ndata: {data}\n\n"
+
+async def event_stream(request):
+    """
+    Stream task and notification change events as Server-Sent Events.
+    
+    Only served under ASGI, where an idle connection costs a coroutine
+    rather than a worker thread. Streams end after EVENT_STREAM_MAX_SECONDS
+    and the browser reconnects, which also reclaims streams whose client
+    went away without the server noticing.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Event streams require the ASGI server'}, status=501)
+    
+    user = await sync_to_async(_authenticate_stream)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    
+    response = StreamingHttpResponse(_event_stream(user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
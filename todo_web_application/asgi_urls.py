@@ -0,0 +1,15 @@
+"""
+URL configuration for requests served through the ASGI entry point.
+
+``ASGIURLConfMiddleware`` points ASGI requests here. Async variants of
+views are listed first; every other URL falls through to ``urls``.
+"""
+
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("useraccounts/", include("useraccount.async_urls")),
+    path("tasko/", include("main_app.async_urls")),
+] + sync_urlpatterns
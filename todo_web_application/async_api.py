@@ -0,0 +1,132 @@
+"""
+Plumbing for the async API views served under ASGI.
+
+``async_api_view`` gives an async view what DRF's ``api_view`` gives a
+sync one: a parsed ``Request``, authentication, throttles and APIException
+handling, with responses rendered by the same JSON renderer. Authentication
+awaits each DEFAULT_AUTHENTICATION_CLASSES entry's ``aauthenticate``.
+Requests the async view does not serve (other methods, or a client asking
+for the browsable API) can be handed to a sync ``fallback`` view, so one
+URL can mix async reads with the DRF viewset's writes.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import resolve
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException, AuthenticationFailed, MethodNotAllowed, NotAcceptable, NotAuthenticated,
+    Throttled,
+)
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .renderers import JSONRenderer
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    return HttpResponse(JSONRenderer().render(data), status=status,
+                        content_type='application/json', headers=headers)
+
+
+def error_response(exc):
+    """What DRF's exception handler answers for ``exc``"""
+    headers = {}
+    if getattr(exc, 'auth_header', None):
+        headers['WWW-Authenticate'] = exc.auth_header
+    if getattr(exc, 'wait', None):
+        headers['Retry-After'] = '%d' % exc.wait
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, exc.status_code, headers)
+
+
+async def authenticate(request):
+    """As Request._authenticate, awaiting each authenticator's ``aauthenticate``"""
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    header = authenticators[0].authenticate_header(request) if authenticators else None
+    for authenticator in authenticators:
+        try:
+            result = await authenticator.aauthenticate(request)
+        except AuthenticationFailed as exc:
+            exc.auth_header = header
+            raise
+        if result is not None:
+            return result[0]
+    exc = NotAuthenticated()
+    exc.auth_header = header
+    raise exc
+
+
+def root_urlconf_view(request, **kwargs):
+    """Serve ``request`` with the view ROOT_URLCONF has for its path, as under WSGI"""
+    match = resolve(request.path_info, urlconf=settings.ROOT_URLCONF)
+    return match.func(request, *match.args, **match.kwargs)
+
+
+def _negotiates_json(request):
+    """Whether DRF's content negotiation would pick the JSON renderer"""
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    negotiator = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS()
+    try:
+        renderer, _ = negotiator.select_renderer(request, renderers)
+    except NotAcceptable:
+        return False
+    return renderer.format == 'json'
+
+
+def _check_throttles(request, throttle_classes):
+    """As APIView.check_throttles"""
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            waits.append(throttle.wait())
+    if waits:
+        raise Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+
+def async_api_view(methods=('POST',), authenticated=False, throttle_classes=(), fallback=None):
+    """
+    An async view taking the Django request, a DRF ``Request`` for its
+    parsed body and query params, and the URL kwargs. ``authenticated``
+    requires a user, like IsAuthenticated. Requests for other methods, or
+    negotiating a renderer other than JSON, go to the sync ``fallback``
+    view if there is one; otherwise other methods get 405. Like DRF's
+    api_view it is CSRF exempt and answers APIExceptions with their usual
+    JSON response.
+    """
+    allowed = {method.upper() for method in methods}
+    if 'GET' in allowed:
+        allowed.add('HEAD')
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, **kwargs):
+            api_request = Request(
+                request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+            )
+            if fallback is not None and (request.method not in allowed
+                                         or not _negotiates_json(api_request)):
+                return await sync_to_async(fallback)(request, **kwargs)
+            try:
+                if request.method not in allowed:
+                    raise MethodNotAllowed(request.method)
+                if authenticated:
+                    # Also sets request.user on the Django request
+                    api_request.user = await authenticate(request)
+                if throttle_classes:
+                    await sync_to_async(_check_throttles)(api_request, throttle_classes)
+                response = await view(request, api_request, **kwargs)
+            except APIException as exc:
+                response = error_response(exc)
+            # As DRF's responses, which are negotiated on Accept
+            patch_vary_headers(response, ('Accept',))
+            return response
+
+        # Set directly: csrf_exempt() only passes coroutines through from Django 5.0
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
@@ -0,0 +1,117 @@
+"""
+Helpers shared by the ``bench_*`` management commands.
+
+Benchmarks seed throwaway data inside a transaction that is always rolled
+back, so they can be pointed at a development database without leaving
+anything behind. Those serving requests from several threads commit their
+data instead and delete it when they finish.
+"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is rolled back on exit"""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def count_queries(func, *args, **kwargs):
+    """Call ``func`` once and return (result, number of queries issued)"""
+    with CaptureQueriesContext(connection) as ctx:
+        result = func(*args, **kwargs)
+    return result, len(ctx.captured_queries)
+
+
+def time_calls(func, repeat=5, *args, **kwargs):
+    """Call ``func`` ``repeat`` times and return the timings in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    """Format a list of millisecond timings as a short summary string"""
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"median {statistics.median(ordered):.2f} ms, "
+        f"min {ordered[0]:.2f} ms, p99 {p99:.2f} ms"
+    )
+
+
+def create_bench_user(email='bench@tasko.local'):
+    """Create a throwaway AppUser for a benchmark run"""
+    from useraccount.models import AppUser
+
+    user = AppUser(email=email, first_name='Bench', last_name='User')
+    user.set_password('bench-password')
+    user.save()
+    return user
+
+
+@contextmanager
+def committed_bench_user(email='bench-committed@tasko.local'):
+    """
+    A throwaway AppUser committed to the database, for benchmarks whose
+    requests run on other threads and so other connections. The user and
+    everything it owns are deleted on exit, and on entry if a killed run
+    left them behind.
+    """
+    from useraccount.models import AppUser
+
+    AppUser.objects.filter(email=email).delete()
+    user = create_bench_user(email)
+    try:
+        yield user
+    finally:
+        user.delete()
+
+
+def seed_tasks(user, count, batch_size=5000, seed=0):
+    """Bulk insert ``count`` tasks with a realistic spread of field values"""
+    from main_app.models import Task
+
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    now = timezone.now()
+    priorities = [value for value, _ in Task.PRIORITY_CHOICES]
+    projects = [value for value, _ in Task.PROJECT_CHOICES] + [None]
+
+    batch = []
+    for i in range(count):
+        batch.append(Task(
+            user=user,
+            title=f'Benchmark task {i}',
+            desc=f'Generated description for task number {i}',
+            date=today + timedelta(days=rng.randint(-30, 30)) if rng.random() < 0.8 else None,
+            priority=rng.choice(priorities),
+            done=rng.random() < 0.4,
+            important=rng.random() < 0.2,
+            project=rng.choice(projects),
+            created_at=now - timedelta(minutes=i),
+        ))
+        if len(batch) >= batch_size:
+            Task.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Task.objects.bulk_create(batch)
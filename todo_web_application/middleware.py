@@ -0,0 +1,20 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+
+@sync_and_async_middleware
+def ASGIURLConfMiddleware(get_response):
+    """
+    Resolve ASGI requests against ASGI_URLCONF, which serves async variants
+    of some views. Under WSGI the middleware chain is sync and requests go
+    through untouched.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            request.urlconf = settings.ASGI_URLCONF
+            return await get_response(request)
+    else:
+        def middleware(request):
+            return get_response(request)
+    return middleware
@@ -0,0 +1,30 @@
+"""
+JSON request parsing on orjson, falling back to DRF's stdlib parser when
+orjson is not installed. See ``renderers`` for the matching renderer.
+"""
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from .renderers import JSONRenderer, orjson
+
+
+class JSONParser(parsers.JSONParser):
+    """Drop-in replacement for DRF's JSONParser that decodes with orjson"""
+
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        # orjson always rejects NaN and Infinity, as strict JSON does
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
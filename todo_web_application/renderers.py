@@ -0,0 +1,46 @@
+"""
+JSON rendering on orjson.
+
+orjson encodes the plain dicts, lists, strings and numbers that serializers
+produce several times faster than the stdlib ``json`` module DRF uses, and
+handles date, datetime, time and UUID values itself. It is optional: when
+it is not installed, or a response asks for something it cannot produce
+(indented output, ASCII-only output, integers wider than 64 bits), the
+stock DRF renderer is used and the output is the same. Floats are the one
+difference: orjson spells exponents ``1e300`` where ``json`` writes
+``1e+300``, and renders NaN and infinity as ``null`` where DRF's strict
+mode raises.
+"""
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# DRF's encoder writes UTC datetimes with a 'Z' suffix
+ORJSON_OPTIONS = orjson.OPT_UTC_Z if orjson else 0
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """Drop-in replacement for DRF's JSONRenderer that encodes with orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Anything orjson does not know (Decimal, timedelta, lazy
+            # strings, querysets) goes through DRF's encoder
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like DRF does, so the output stays a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "todo_web_application.middleware.ASGIURLConfMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,6 +54,8 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = "todo_web_application.urls"
+# Requests arriving through asgi.py resolve here, picking up async views
+ASGI_URLCONF = "todo_web_application.asgi_urls"
 
 TEMPLATES = [
     {
@@ -124,15 +127,110 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cache
+# Per-user stats and other derived data live here. Local memory is per
+# process; point this at a shared backend such as
+# django.core.cache.backends.redis.RedisCache when running several workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tasko-default",
+    }
+}
+
+# Largest number of operations accepted by POST /tasko/api/tasks/batch/
+TASK_BATCH_MAX_OPERATIONS = 1000
+
+# ?search= queries matching more tasks than this are returned newest first
+# instead of ranked
+SEARCH_RANK_MAX_MATCHES = 10000
+
+# Rows fetched and serialized per chunk by GET /tasko/api/tasks/export/
+EXPORT_CHUNK_SIZE = 2000
+
+# POST /tasko/api/tasks/import/ and python manage.py import_tasks
+TASK_IMPORT_BATCH_SIZE = 1000  # rows per bulk_create
+TASK_IMPORT_MAX_ERRORS = 100  # row errors included in the report
+
+# Delta sync (GET /tasko/api/sync/)
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+SYNC_WATERMARK_OVERLAP = 5  # seconds
+
+# Overdue / due soon reminders (python manage.py scan_due_tasks)
+DUE_SCAN_USER_CHUNK = 500  # users committed per checkpoint
+DUE_SCAN_LOOKBACK_DAYS = 7  # tasks overdue for longer are not reminded about
+
+# Notification retention (python manage.py prune_notifications)
+NOTIFICATION_RETENTION_DAYS = 90
+NOTIFICATION_READ_RETENTION_DAYS = 30  # read notifications go sooner
+NOTIFICATION_MAX_PER_USER = 500  # oldest beyond this are removed, read first
+
+# Signup and password reset codes, kept in the database (purge them with
+# purge_otps). useraccount.otp.CacheOTPStore keeps them in the cache instead,
+# which must then be shared by every worker.
+OTP_STORE = 'useraccount.otp.DBOTPStore'
+OTP_LIFETIME = 600  # seconds
+OTP_MAX_ATTEMPTS = 5
+
+# Server-Sent Events (GET /tasko/api/events/, ASGI only)
+# Swap the backend for one on a shared pub/sub channel when running
+# more than one ASGI process.
+EVENT_BROADCAST_BACKEND = 'main_app.events.InProcessBroadcast'
+EVENT_STREAM_QUEUE_SIZE = 100  # undelivered events kept per connection
+EVENT_STREAM_KEEPALIVE = 15  # seconds
+EVENT_STREAM_MAX_SECONDS = 300
+
 # Session management 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'useraccount.authentication.AppUserTokenAuthentication',  # Bearer access tokens
         'useraccount.authentication.AppUserSessionAuthentication',  # Your custom auth class
     ],
+    # orjson-backed JSON, falling back to the stdlib when orjson is missing
+    'DEFAULT_RENDERER_CLASSES': [
+        'todo_web_application.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'todo_web_application.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token buckets for useraccount.throttling: "<burst>/<refill period>"
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/m',
+        'login_email': '10/m',
+        'otp_ip': '20/h',
+        'otp_email': '5/h',
+    },
 }
 
+# Password hashes allowed in flight at once (about the number of CPU
+# cores); further login or signup requests get 429 with Retry-After instead
+# of queueing. Like the throttle buckets, this counts in the default cache:
+# across all workers with a shared cache, per process with local memory
+# (check --deploy reports useraccount.E003).
+AUTH_HASHING_MAX_CONCURRENCY = 4
+# Threads per process hashing for the async auth views (ASGI)
+AUTH_HASHING_THREADS = 4
+THROTTLE_BUSY_RETRY_AFTER = 1  # seconds
+
+# In-process cache of AppUser identity fields used by session auth
+IDENTITY_CACHE_SIZE = 10000
+IDENTITY_CACHE_TTL = 300  # seconds
+
+# Signed token authentication (seconds)
+ACCESS_TOKEN_LIFETIME = 300
+REFRESH_TOKEN_LIFETIME = 1209600
+
 # Keep your session settings
+# With a shared cache (Redis, Memcached), 'useraccount.sessions' serves
+# sessions from the cache and only rewrites their django_session row when
+# the data changes or the sliding expiry has moved by more than
+# SESSION_SAVE_GRANULARITY seconds. It fails the useraccount.E002 check on
+# a per-process cache, where a logout would not reach the other workers.
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_SAVE_GRANULARITY = 3600
 SESSION_COOKIE_AGE = 1209600
 SESSION_COOKIE_NAME = 'sessionid'
 SESSION_COOKIE_SECURE = False
@@ -149,4 +247,12 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = 'gouravnav45@gmail.com'
 EMAIL_HOST_PASSWORD = 'zrgy waru klvx sntx'
 DEFAULT_FROM_EMAIL = 'Tasko <noreply@tasko.app>'
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'  # Used by the file backend
+
+# Outgoing mail is queued and delivered by `manage.py send_queued_email`
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30  # seconds, doubled after each failure
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 3600
+EMAIL_OUTBOX_LEASE = 300  # seconds a worker has to send a claimed batch
 BASE_URL = 'http://localhost:8000'
\ No newline at end of file
@@ -2,4 +2,5 @@ from django.contrib import admin
 from .models import *
 
 admin.site.register(AppUser)
-admin.site.register(PendingUser)
\ No newline at end of file
+admin.site.register(PendingUser)
+admin.site.register(OutboundEmail)
\ No newline at end of file
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import async_views
+
+# Served ahead of urls.py under ASGI; see todo_web_application.asgi_urls
+urlpatterns = [
+    path('api/auth/complete-signup/', async_views.api_complete_signup, name='api_complete_signup'),
+    path('api/user/login/', async_views.api_login, name='api_login'),
+    path('api/user/signup/', async_views.api_signup, name='api_signup'),
+    path('api/auth/reset-password/', async_views.api_reset_password, name='api_reset_password'),
+]
@@ -0,0 +1,172 @@
+"""
+Async variants of the auth views that hash passwords, served under ASGI.
+
+``todo_web_application.asgi_urls`` routes login, signup, complete-signup
+and reset-password here when the app runs under ASGI; WSGI keeps the DRF
+views in ``views``. Requests, responses, throttles and the hashing cap are
+the same as there. Only the password hash moves, onto the pool in
+``hashing``, so these views hold neither the event loop nor the sync
+thread while it runs; the hashing cap is counted through the async cache
+API. Session and OTP store access stays sync and runs
+through ``sync_to_async``.
+"""
+from asgiref.sync import sync_to_async
+from rest_framework import status
+
+from todo_web_application.async_api import async_api_view, json_response
+
+from .hashing import amake_password, averify_password
+from .models import AppUser
+from .otp import RESET, SIGNUP, get_otp_store
+from .serializers import (
+    AppUserSignupSerializer, CompleteSignupSerializer, LoginCredentialsSerializer,
+    ResetPasswordSerializer,
+)
+from .throttling import LoginEmailThrottle, LoginIPThrottle, ahashing_slot
+from .tokens import issue_tokens
+from .utils.email_utils import send_password_reset_success, send_welcome_complete_email
+
+
+def _user_data(user):
+    return {
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'full_name': f"{user.first_name} {user.last_name}".strip(),
+        'initials': f"{user.first_name[0] if user.first_name else ''}{user.last_name[0] if user.last_name else ''}"
+    }
+
+
+def _start_session(request, user, expiry=None):
+    request.session['app_user_id'] = user.id
+    request.session['app_user_email'] = user.email
+    request.session['app_user_first_name'] = user.first_name
+    request.session['app_user_last_name'] = user.last_name
+    if expiry is not None:
+        request.session.set_expiry(expiry)
+
+
+@async_api_view(throttle_classes=[LoginIPThrottle, LoginEmailThrottle])
+async def api_login(request, api_request):
+    """REST API endpoint for user login"""
+    serializer = LoginCredentialsSerializer(data=api_request.data)
+    if not serializer.is_valid():
+        return json_response({'success': False, 'errors': serializer.errors}, status.HTTP_400_BAD_REQUEST)
+
+    email = serializer.validated_data['email']
+    user = await AppUser.objects.filter(email=email).afirst()
+    async with ahashing_slot():
+        # Unknown emails still cost one hash, so timing does not reveal accounts
+        valid = await averify_password(serializer.validated_data['password'],
+                                       user.password if user else None)
+    if not valid or not user.is_active:
+        error = 'Invalid credentials' if not valid else 'Account disabled'
+        return json_response({'success': False, 'errors': {'non_field_errors': [error]}},
+                             status.HTTP_400_BAD_REQUEST)
+
+    # Set session expiry to 2 weeks; SessionMiddleware saves it once
+    await sync_to_async(_start_session)(request, user, 1209600)
+    return json_response({
+        'success': True,
+        'message': 'Logged in successfully',
+        'user': _user_data(user),
+        'tokens': issue_tokens(user)
+    })
+
+
+@async_api_view()
+async def api_signup(request, api_request):
+    """REST API endpoint for user registration (direct signup)"""
+    serializer = AppUserSignupSerializer(data=api_request.data)
+    # Validation checks the email is not taken
+    if not await sync_to_async(serializer.is_valid)():
+        return json_response({'success': False, 'errors': serializer.errors}, status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    user = AppUser(email=data['email'], first_name=data['first_name'], last_name=data['last_name'])
+    async with ahashing_slot():
+        user.password = await amake_password(data['password'])
+    await user.asave()
+
+    await sync_to_async(_start_session)(request, user)
+    return json_response({
+        'success': True,
+        'message': 'Account created successfully',
+        'user': {
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name
+        }
+    }, status.HTTP_201_CREATED)
+
+
+@async_api_view()
+async def api_complete_signup(request, api_request):
+    """Step 3: Complete signup with user details and create actual user"""
+    serializer = CompleteSignupSerializer(data=api_request.data)
+    if not serializer.is_valid():
+        return json_response({'success': False, 'errors': serializer.errors}, status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    email = data['email']
+    # Taken before the code is used up, so a busy server does not cost it
+    async with ahashing_slot():
+        # Check the email was verified; this uses up the code
+        if await sync_to_async(get_otp_store().consume)(SIGNUP, email) is None:
+            return json_response({
+                'success': False,
+                'error': 'No pending registration found. Please start over.'
+            }, status.HTTP_400_BAD_REQUEST)
+
+        if await AppUser.objects.filter(email=email).aexists():
+            return json_response({
+                'success': False,
+                'error': 'Email already registered'
+            }, status.HTTP_400_BAD_REQUEST)
+
+        user = AppUser(email=email, first_name=data['first_name'], last_name=data['last_name'])
+        user.password = await amake_password(data['password'])
+    await user.asave()
+
+    await sync_to_async(send_welcome_complete_email)(user)
+    await sync_to_async(_start_session)(request, user)
+    return json_response({
+        'success': True,
+        'message': 'Account created successfully',
+        'user': _user_data(user),
+        'tokens': issue_tokens(user)
+    })
+
+
+@async_api_view()
+async def api_reset_password(request, api_request):
+    """Reset password after OTP verification"""
+    serializer = ResetPasswordSerializer(data=api_request.data)
+    if not serializer.is_valid():
+        return json_response({'success': False, 'errors': serializer.errors}, status.HTTP_400_BAD_REQUEST)
+
+    email = serializer.validated_data['email']
+    # Taken before the code is used up, so a busy server does not cost it
+    async with ahashing_slot():
+        # Only a verified reset code allows setting a new password; this uses it up
+        if await sync_to_async(get_otp_store().consume)(RESET, email) is None:
+            return json_response({
+                'success': False,
+                'error': 'Please verify your reset code first.'
+            }, status.HTTP_400_BAD_REQUEST)
+
+        user = await AppUser.objects.filter(email=email).afirst()
+        if user is None:
+            return json_response({
+                'success': False,
+                'error': 'Account not found'
+            }, status.HTTP_400_BAD_REQUEST)
+
+        user.password = await amake_password(serializer.validated_data['password'])
+    await user.asave()
+
+    await sync_to_async(send_password_reset_success)(email, user.first_name)
+    return json_response({
+        'success': True,
+        'message': 'Password reset successfully'
+    })
@@ -1,6 +1,8 @@
-from rest_framework.authentication import BaseAuthentication
+from asgiref.sync import sync_to_async
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
-from .models import AppUser
+from .identity import aget_identity_user, get_identity_user
+from .tokens import InvalidToken, load_access_token, user_from_payload
 
 class AppUserSessionAuthentication(BaseAuthentication):
     """
@@ -14,14 +16,64 @@ class AppUserSessionAuthentication(BaseAuthentication):
             # No user ID in session - not authenticated
             return None
         
-        try:
-            # Fetch the user from your custom model
-            user = AppUser.objects.get(id=user_id)
-            return (user, None)
-        except AppUser.DoesNotExist:
-            # User doesn't exist - clear invalid session
+        # Identity fields come from the in-process cache; the rest of the
+        # row is only loaded if a view reads it
+        user = get_identity_user(user_id)
+        if user is None or not user.is_active:
+            # User doesn't exist or was deactivated - clear invalid session
             request.session.flush()
             return None
+        return (user, None)
+    
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views, on a Django request"""
+        # SessionBase.aget only exists from Django 5.0
+        session = request.session
+        if hasattr(session, 'aget'):
+            user_id = await session.aget('app_user_id')
+        else:
+            user_id = await sync_to_async(session.get)('app_user_id')
+        if not user_id:
+            return None
+        
+        user = await aget_identity_user(user_id)
+        if user is None or not user.is_active:
+            await sync_to_async(request.session.flush)()
+            return None
+        return (user, None)
     
     def authenticate_header(self, request):
-        return 'Session'
\ No newline at end of file
+        return 'Session'
+
+class AppUserTokenAuthentication(BaseAuthentication):
+    """
+    Stateless authentication with signed access tokens.
+
+    Clients send ``Authorization: Bearer <access token>``. The user is
+    rebuilt from the token itself, so no session or user query is made.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed('Invalid token header')
+
+        try:
+            payload = load_access_token(auth[1].decode())
+        except (InvalidToken, UnicodeError) as e:
+            raise AuthenticationFailed(str(e))
+
+        user = user_from_payload(payload)
+        if not user.is_active:
+            raise AuthenticationFailed('Account disabled')
+        return (user, payload)
+
+    async def aauthenticate(self, request):
+        # A signature check and a cache read; the database is not touched
+        return self.authenticate(request)
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,69 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.checks import Error, register
+from django.utils.module_loading import import_string
+
+# Cache backends whose entries only the process that wrote them can see
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _per_process_backend(alias):
+    """The backend of cache ``alias`` if it is per process, else None"""
+    backend = settings.CACHES[alias]['BACKEND']
+    return backend if backend in PER_PROCESS_CACHES else None
+
+
+@register()
+def check_otp_store(app_configs, **kwargs):
+    """A code sent by one worker must be verifiable on any other"""
+    from .otp import CacheOTPStore
+
+    if not issubclass(import_string(settings.OTP_STORE), CacheOTPStore):
+        return []
+    backend = _per_process_backend('default')
+    if backend is None:
+        return []
+    return [Error(
+        f"OTP_STORE keeps codes in the default cache, but {backend} is not shared "
+        "between worker processes.",
+        hint="Use useraccount.otp.DBOTPStore, or a shared cache such as Redis or Memcached.",
+        id='useraccount.E001',
+    )]
+
+
+@register()
+def check_session_engine(app_configs, **kwargs):
+    """A logout on one worker must end the session on every other"""
+    from .sessions import SessionStore
+
+    engine = import_module(settings.SESSION_ENGINE)
+    if not issubclass(engine.SessionStore, SessionStore):
+        return []
+    backend = _per_process_backend(settings.SESSION_CACHE_ALIAS)
+    if backend is None:
+        return []
+    return [Error(
+        f"SESSION_ENGINE serves sessions from the {settings.SESSION_CACHE_ALIAS!r} cache, "
+        f"but {backend} is not shared between worker processes.",
+        hint="Use django.contrib.sessions.backends.db, or a shared cache such as Redis or Memcached.",
+        id='useraccount.E002',
+    )]
+
+
+@register(deploy=True)
+def check_throttle_cache(app_configs, **kwargs):
+    """Throttle buckets and the hashing cap only hold across workers in a shared cache"""
+    backend = _per_process_backend('default')
+    if backend is None:
+        return []
+    return [Error(
+        f"Throttle buckets and AUTH_HASHING_MAX_CONCURRENCY are counted in the default "
+        f"cache, but {backend} is not shared between worker processes, so each worker "
+        "applies the limits on its own.",
+        hint="Use a shared cache such as Redis or Memcached.",
+        id='useraccount.E003',
+    )]
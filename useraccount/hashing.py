@@ -0,0 +1,62 @@
+"""
+Password hashing for the auth views.
+
+A PBKDF2 check costs hundreds of milliseconds of CPU. Under ASGI every
+sync view runs on one shared thread, so a login hashing there holds up all
+the task API requests queued behind it. The async auth views hash on a
+small pool of AUTH_HASHING_THREADS threads instead (hashlib releases the
+GIL while it works), leaving the event loop and the sync thread free.
+
+Unknown emails are checked against a dummy hash, so a failed login costs
+the same whether or not the account exists.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.utils.crypto import get_random_string
+
+
+@lru_cache(maxsize=None)
+def dummy_password_hash():
+    """A hash of a random password, made once per process with the current hasher"""
+    return make_password(get_random_string(32))
+
+
+def verify_password(raw_password, encoded):
+    """``check_password``, still spending one hash when ``encoded`` is None"""
+    if encoded is None:
+        check_password(raw_password, dummy_password_hash())
+        return False
+    return check_password(raw_password, encoded)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The process-wide hashing pool"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.AUTH_HASHING_THREADS, thread_name_prefix='hashing',
+                )
+    return _executor
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), func, *args)
+
+
+async def averify_password(raw_password, encoded):
+    return await _run(verify_password, raw_password, encoded)
+
+
+async def amake_password(raw_password):
+    return await _run(make_password, raw_password)
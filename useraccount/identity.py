@@ -0,0 +1,88 @@
+"""
+In-process cache of AppUser identity fields.
+
+Authenticated requests mostly read ``id``, ``email``, names and
+``is_active``. Those are kept in a bounded LRU cache with a TTL, and the
+request user is built from them with every other field deferred, so the
+full row is only fetched if a view touches something like ``password``.
+Entries are dropped when the AppUser is saved or deleted in this process;
+the TTL bounds staleness for changes made by other processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import AppUser
+
+# Fields kept per user, in AppUser field order
+IDENTITY_FIELDS = ('id', 'email', 'first_name', 'last_name', 'is_active')
+
+
+class IdentityCache:
+    """Thread-safe LRU mapping of user id to identity values, with expiry"""
+
+    def __init__(self, maxsize, ttl, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= self.timer():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return values
+
+    def set(self, user_id, values):
+        with self._lock:
+            self._entries[user_id] = (self.timer() + self.ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache(settings.IDENTITY_CACHE_SIZE, settings.IDENTITY_CACHE_TTL)
+
+
+def user_from_identity(values):
+    """Build an AppUser from identity values with the other fields deferred"""
+    return AppUser.from_db('default', IDENTITY_FIELDS, values)
+
+
+def get_identity_user(user_id):
+    """Return the AppUser for ``user_id``, or None if it no longer exists"""
+    values = identity_cache.get(user_id)
+    if values is None:
+        values = AppUser.objects.filter(id=user_id).values_list(*IDENTITY_FIELDS).first()
+        if values is None:
+            return None
+        identity_cache.set(user_id, values)
+    return user_from_identity(values)
+
+
+async def aget_identity_user(user_id):
+    """``get_identity_user`` for async views"""
+    values = identity_cache.get(user_id)
+    if values is None:
+        values = await AppUser.objects.filter(id=user_id).values_list(*IDENTITY_FIELDS).afirst()
+        if values is None:
+            return None
+        identity_cache.set(user_id, values)
+    return user_from_identity(values)
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from todo_web_application.bench import (
+    count_queries, create_bench_user, rolled_back, summarize, time_calls,
+)
+
+PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = "Compare per-request queries and latency of session and token authentication"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Authenticated requests to time per mode')
+        parser.add_argument('--path', default='/useraccounts/api/user/me/',
+                            help='Authenticated endpoint to request')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        with rolled_back():
+            user = create_bench_user()
+            client = Client(HTTP_HOST='localhost')
+            response = client.post(
+                '/useraccounts/api/user/login/',
+                {'email': user.email, 'password': PASSWORD},
+                content_type='application/json',
+            )
+            access = response.json()['tokens']['access']
+            # No cookies, so only the Authorization header identifies the user
+            token_client = Client(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+            modes = {
+                'session': lambda: client.get(path),
+                'token': lambda: token_client.get(path),
+            }
+            for label, request in modes.items():
+                request()  # warm per-process caches
+                response, queries = count_queries(request)
+                assert response.status_code == 200, response.content
+                timings = time_calls(request, options['requests'])
+                self.stdout.write(f"{label:<8} {queries} queries/request, {summarize(timings)}")
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from useraccount.utils.email_templates import render_email
+
+# Representative contexts for each email the app sends
+EMAILS = {
+    'otp_send': {
+        'email': 'jane@example.com', 'first_name': 'Jane',
+        'otp': list('482913'), 'year': 2026,
+    },
+    'otp_confirmed': {
+        'email': 'jane@example.com', 'first_name': 'Jane',
+        'verified_date': 'February 24, 2026', 'year': 2026,
+    },
+    'welcome_complete': {
+        'email': 'jane@example.com', 'first_name': 'Jane', 'full_name': 'Jane Doe',
+        'initials': 'JD', 'join_date': 'February 24, 2026',
+        'dashboard_url': '/tasko/main_app/dashboard/', 'year': 2026,
+    },
+    'password_reset_otp': {
+        'email': 'jane@example.com', 'first_name': 'Jane',
+        'otp': list('105726'), 'year': 2026,
+    },
+    'password_reset_success': {
+        'email': 'jane@example.com', 'first_name': 'Jane',
+        'login_url': 'http://localhost:8000/useraccounts/user/login/', 'year': 2026,
+    },
+}
+
+
+def renders_per_second(render, template_name, context, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        render(template_name, context)
+        count += 1
+    return count / seconds
+
+
+class Command(BaseCommand):
+    help = "Compare render throughput of render_to_string and pre-rendered email skeletons"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=1.0,
+                            help='Time spent rendering each email with each method')
+
+    def handle(self, *args, **options):
+        for name, context in EMAILS.items():
+            template_name = f'useraccount/emails/{name}.html'
+            if render_email(template_name, context) != render_to_string(template_name, context):
+                raise CommandError(f"Skeleton output differs from render_to_string for {name}")
+
+            before = renders_per_second(render_to_string, template_name, context, options['seconds'])
+            after = renders_per_second(render_email, template_name, context, options['seconds'])
+            self.stdout.write(
+                f"{name:<24} {before:>9.0f}/s -> {after:>9.0f}/s  ({after / before:.1f}x)"
+            )
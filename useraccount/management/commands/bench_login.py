@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+
+from todo_web_application.bench import create_bench_user, rolled_back, seed_tasks, summarize
+
+PASSWORD = 'bench-password'
+LOGIN_PATH = '/useraccounts/api/user/login/'
+TASKS_PATH = '/tasko/api/tasks/'
+
+# The same ASGI stack, resolving login to the sync DRF view or the async one
+URLCONFS = [
+    ('sync', settings.ROOT_URLCONF),
+    ('async', settings.ASGI_URLCONF),
+]
+
+# No throttling or load shedding, so every login is served
+UNTHROTTLED = {
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {
+        scope: '1000000/s' for scope in settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    },
+}
+
+
+class Command(BaseCommand):
+    help = "Compare sync and async login views under ASGI: logins/s and task list latency alongside"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=32,
+                            help='Logins per concurrency level')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+        parser.add_argument('--tasks', type=int, default=200)
+
+    def handle(self, *args, **options):
+        # AsyncClient always sends Host: testserver
+        with rolled_back(), override_settings(REST_FRAMEWORK=UNTHROTTLED, ALLOWED_HOSTS=['testserver'],
+                                              AUTH_HASHING_MAX_CONCURRENCY=1000):
+            user = create_bench_user()
+            seed_tasks(user, options['tasks'])
+            for label, urlconf in URLCONFS:
+                with override_settings(ASGI_URLCONF=urlconf):
+                    for concurrency in options['concurrency']:
+                        logins, reads, elapsed = async_to_sync(self.run)(
+                            user, options['logins'], concurrency,
+                        )
+                        self.stdout.write(
+                            f"{label:<5} c={concurrency:<3} {len(logins) / elapsed:>6.1f} logins/s, "
+                            f"login {summarize(logins)}"
+                        )
+                        self.stdout.write(
+                            f"{'':<11} task list during logins: {summarize(reads)}"
+                        )
+
+    async def run(self, user, total, concurrency):
+        """
+        Post ``total`` logins ``concurrency`` at a time while one client reads
+        the task list in a loop. Returns (login timings, read timings, seconds).
+        """
+        reader = AsyncClient()
+        await reader.post(LOGIN_PATH, {'email': user.email, 'password': PASSWORD},
+                          content_type='application/json')
+        logins, reads = [], []
+        queue = iter(range(total))
+        done = asyncio.Event()
+
+        async def login_worker():
+            client = AsyncClient()
+            for _ in queue:
+                start = time.perf_counter()
+                response = await client.post(LOGIN_PATH, {'email': user.email, 'password': PASSWORD},
+                                             content_type='application/json')
+                logins.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.status_code
+
+        async def read_worker():
+            while not done.is_set():
+                start = time.perf_counter()
+                response = await reader.get(TASKS_PATH)
+                reads.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.status_code
+
+        start = time.perf_counter()
+        reading = asyncio.ensure_future(read_worker())
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await reading
+        return logins, reads, elapsed
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from todo_web_application.bench import create_bench_user, rolled_back
+
+PASSWORD = 'bench-password'
+
+ENGINES = [
+    ('db', 'django.contrib.sessions.backends.db'),
+    ('cached_db', 'django.contrib.sessions.backends.cached_db'),
+    ('coalescing', 'useraccount.sessions'),
+]
+
+# What the dashboard polls
+PATHS = [
+    '/useraccounts/api/user/me/',
+    '/tasko/api/tasks/',
+    '/tasko/api/stats/',
+    '/tasko/api/notifications/unread_count/',
+]
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = "Count session writes per 1,000 authenticated requests for each session engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--hours', type=float, default=8,
+                            help='Simulated time the requests are spread over')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        step = timedelta(hours=options['hours']) / count
+        with rolled_back():
+            user = create_bench_user()
+            for label, engine in ENGINES:
+                # SessionMiddleware picks the engine up when a client first loads it
+                with override_settings(SESSION_ENGINE=engine):
+                    client = Client(HTTP_HOST='localhost')
+                    client.post('/useraccounts/api/user/login/',
+                                {'email': user.email, 'password': PASSWORD},
+                                content_type='application/json')
+                    start = timezone.now()
+                    with CaptureQueriesContext(connection) as ctx:
+                        for i in range(count):
+                            # Sliding expiry only moves as fast as the clock
+                            with mock.patch('django.utils.timezone.now', return_value=start + step * i):
+                                response = client.get(PATHS[i % len(PATHS)])
+                            assert response.status_code == 200, response.status_code
+
+                statements = [query['sql'] for query in ctx.captured_queries]
+                session_writes = sum(
+                    1 for sql in statements if sql.startswith(WRITES) and 'django_session' in sql
+                )
+                writes = sum(1 for sql in statements if sql.startswith(WRITES))
+                self.stdout.write(
+                    f"{label:<11} {session_writes * 1000 / count:>7.1f} session writes and "
+                    f"{writes * 1000 / count:>7.1f} writes in total per 1,000 requests"
+                )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from useraccount.sessions import SessionStore
+
+
+class Command(BaseCommand):
+    help = "Delete expired rows from django_session in small chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Sessions deleted per statement')
+
+    def handle(self, *args, **options):
+        deleted = SessionStore.clear_expired(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions"))
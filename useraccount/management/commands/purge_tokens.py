@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from useraccount.tokens import purge_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired revoked refresh tokens from the database in small chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Rows deleted per statement')
+
+    def handle(self, *args, **options):
+        deleted = purge_revoked_tokens(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired revoked tokens"))
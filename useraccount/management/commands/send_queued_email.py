@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from useraccount.utils.outbox import send_pending_batch
+
+# Shorthands for Django's bundled email backends
+BACKENDS = {
+    'smtp': 'django.core.mail.backends.smtp.EmailBackend',
+    'console': 'django.core.mail.backends.console.EmailBackend',
+    'file': 'django.core.mail.backends.filebased.EmailBackend',
+    'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+}
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound email in batches over one connection per batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            help='Emails per batch (default: EMAIL_OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--backend',
+                            help='Email backend path, or one of: ' + ', '.join(BACKENDS) +
+                                 ' (default: EMAIL_BACKEND)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for new email instead of exiting when the queue is empty')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to wait between polls in --loop mode')
+
+    def handle(self, *args, **options):
+        backend = BACKENDS.get(options['backend'], options['backend'])
+        total_sent = total_failed = 0
+
+        while True:
+            try:
+                sent, failed = send_pending_batch(options['batch_size'], backend)
+            except Exception as e:
+                # Connection-level failure: nothing was marked, try again later
+                self.stderr.write(f"Could not deliver batch: {e}")
+                if not options['loop']:
+                    raise
+                time.sleep(options['interval'])
+                continue
+
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+            elif options['loop']:
+                time.sleep(options['interval'])
+            else:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total_sent} sent, {total_failed} failed"))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("useraccount", "0004_outboundemail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="passwordreset",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="passwordreset",
+            name="verified",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="pendinguser",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="pendinguser",
+            name="verified",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="passwordreset",
+            index=models.Index(
+                fields=["created_at"], name="useraccount_created_1db166_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pendinguser",
+            index=models.Index(
+                fields=["created_at"], name="useraccount_created_f6fb76_idx"
+            ),
+        ),
+    ]
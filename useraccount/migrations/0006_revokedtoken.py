@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("useraccount", "0005_otp_store"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("jti", models.CharField(max_length=32, unique=True)),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
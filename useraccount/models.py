@@ -36,15 +36,24 @@ class PendingUser(models.Model):
     password = models.CharField(max_length=255)  # Hashed password
     otp = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)  # OTP guesses so far
+    verified = models.BooleanField(default=False)
     
     def __str__(self):
         return f"{self.email} - Pending"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at']),  # purge_otps
+        ]
     
 class PasswordReset(models.Model):
     email = models.EmailField()
     otp = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
     is_used = models.BooleanField(default=False)
+    attempts = models.PositiveSmallIntegerField(default=0)  # OTP guesses so far
+    verified = models.BooleanField(default=False)
     
     def __str__(self):
         return f"{self.email} - {self.otp} - {'Used' if self.is_used else 'Active'}"
@@ -52,4 +61,46 @@ class PasswordReset(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=['email', 'otp', 'is_used']),
-        ]
\ No newline at end of file
+            models.Index(fields=['created_at']),  # purge_otps
+        ]
+
+
+class RevokedToken(models.Model):
+    """A refresh token that was used or logged out, kept until it would have expired"""
+    jti = models.CharField(max_length=32, unique=True)
+    expires_at = models.DateTimeField(db_index=True)  # purge_tokens
+
+    def __str__(self):
+        return self.jti
+
+
+class OutboundEmail(models.Model):
+    """Queued outgoing email, delivered by the send_queued_email command"""
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    body = models.TextField(blank=True)  # Plain text version
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.to} - {self.subject} - {self.status}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
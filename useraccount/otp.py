@@ -0,0 +1,201 @@
+"""
+One-time codes for signup and password reset.
+
+Views go through ``get_otp_store()``, which returns the backend named by
+OTP_STORE:
+
+- ``DBOTPStore`` (the default) keeps them in the PendingUser and
+  PasswordReset tables, looked up by email; ``purge_otps`` deletes the
+  expired rows.
+- ``CacheOTPStore`` keeps each code in the cache with an OTP_LIFETIME
+  timeout, so abandoned codes expire on their own. Several workers need a
+  shared cache, so a per-process one fails the ``useraccount.E001`` check.
+
+A code allows OTP_MAX_ATTEMPTS guesses, counted in the same store, after
+which it is discarded. Verifying a code opens a fresh OTP_LIFETIME window
+for the step it unlocks (completing signup or setting the new password),
+which consumes it.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+
+from .models import PasswordReset, PendingUser
+from .utils.email_utils import generate_otp
+
+SIGNUP = 'signup'
+RESET = 'reset'
+
+
+class OTPError(Exception):
+    pass
+
+
+class ExpiredOTP(OTPError):
+    """No live code for this email: never issued, expired or already used"""
+
+
+class InvalidOTP(OTPError):
+    pass
+
+
+class TooManyAttempts(OTPError):
+    """The code was guessed at too often and has been discarded"""
+
+
+class CacheOTPStore:
+    def _keys(self, purpose, email):
+        key = f'otp:{purpose}:{email}'
+        return key, f'{key}:attempts'
+
+    def issue(self, purpose, email, data=None):
+        """Replace any code for ``email`` with a new one and return it"""
+        otp = generate_otp()
+        key, attempts_key = self._keys(purpose, email)
+        cache.set_many(
+            {key: {'otp': otp, 'data': data or {}, 'verified': False}, attempts_key: 0},
+            settings.OTP_LIFETIME,
+        )
+        return otp
+
+    def peek(self, purpose, email):
+        """The data stored with a live code, or None"""
+        entry = cache.get(self._keys(purpose, email)[0])
+        return entry['data'] if entry else None
+
+    def verify(self, purpose, email, otp):
+        """Check ``otp`` and return its data; raises an ``OTPError`` otherwise"""
+        key, attempts_key = self._keys(purpose, email)
+        entry = cache.get(key)
+        if entry is None:
+            raise ExpiredOTP
+        try:
+            # incr is atomic, so concurrent guesses are all counted
+            attempts = cache.incr(attempts_key)
+        except ValueError:
+            raise ExpiredOTP from None
+        if attempts > settings.OTP_MAX_ATTEMPTS:
+            cache.delete_many([key, attempts_key])
+            raise TooManyAttempts
+        if not constant_time_compare(entry['otp'], otp):
+            raise InvalidOTP
+
+        entry['verified'] = True
+        cache.set(key, entry, settings.OTP_LIFETIME)
+        cache.touch(attempts_key, settings.OTP_LIFETIME)
+        return entry['data']
+
+    def consume(self, purpose, email):
+        """Remove a verified code and return its data, or None if there is none"""
+        key, attempts_key = self._keys(purpose, email)
+        entry = cache.get(key)
+        if not entry or not entry['verified']:
+            return None
+        cache.delete_many([key, attempts_key])
+        return entry['data']
+
+    def discard(self, purpose, email):
+        cache.delete_many(self._keys(purpose, email))
+
+
+class DBOTPStore:
+    # Model, live rows and the fields kept as the code's data, per purpose
+    PURPOSES = {
+        SIGNUP: (PendingUser, {}, ('first_name', 'last_name')),
+        RESET: (PasswordReset, {'is_used': False}, ()),
+    }
+
+    def _rows(self, purpose, email):
+        model, live, _ = self.PURPOSES[purpose]
+        return model.objects.filter(email=email, **live)
+
+    def _live(self, purpose, email):
+        cutoff = timezone.now() - timedelta(seconds=settings.OTP_LIFETIME)
+        return self._rows(purpose, email).filter(created_at__gt=cutoff).order_by('-created_at').first()
+
+    def _data(self, purpose, row):
+        return {field: getattr(row, field) for field in self.PURPOSES[purpose][2]}
+
+    def issue(self, purpose, email, data=None):
+        model = self.PURPOSES[purpose][0]
+        otp = generate_otp()
+        fields = {'password': ''} if model is PendingUser else {}
+        fields.update(data or {})
+        with transaction.atomic():
+            self._rows(purpose, email).delete()
+            model.objects.create(email=email, otp=otp, **fields)
+        return otp
+
+    def peek(self, purpose, email):
+        row = self._live(purpose, email)
+        return self._data(purpose, row) if row else None
+
+    def verify(self, purpose, email, otp):
+        row = self._live(purpose, email)
+        if row is None:
+            raise ExpiredOTP
+        model = type(row)
+        counted = model.objects.filter(
+            pk=row.pk, attempts__lt=settings.OTP_MAX_ATTEMPTS,
+        ).update(attempts=F('attempts') + 1)
+        if not counted:
+            row.delete()
+            raise TooManyAttempts
+        if not constant_time_compare(row.otp, otp):
+            raise InvalidOTP
+
+        row.verified = True
+        row.created_at = timezone.now()
+        row.save(update_fields=['verified', 'created_at'])
+        return self._data(purpose, row)
+
+    def consume(self, purpose, email):
+        row = self._live(purpose, email)
+        if row is None or not row.verified:
+            return None
+        data = self._data(purpose, row)
+        self._rows(purpose, email).delete()
+        return data
+
+    def discard(self, purpose, email):
+        self._rows(purpose, email).delete()
+
+    @classmethod
+    def purge(cls, chunk_size=1000, now=None):
+        """
+        Delete expired codes (and used password resets) ``chunk_size`` rows
+        at a time. Returns the number of rows deleted.
+        """
+        cutoff = (now or timezone.now()) - timedelta(seconds=settings.OTP_LIFETIME)
+        deleted = 0
+        for model in (PendingUser, PasswordReset):
+            stale = model.objects.filter(created_at__lte=cutoff)
+            if model is PasswordReset:
+                stale = stale | model.objects.filter(is_used=True)
+            while True:
+                ids = list(stale.values_list('id', flat=True)[:chunk_size])
+                if not ids:
+                    break
+                deleted += model.objects.filter(id__in=ids).delete()[0]
+        return deleted
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_otp_store():
+    """The process-wide OTP store configured in settings"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.OTP_STORE)()
+    return _store
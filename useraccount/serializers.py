@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .hashing import verify_password
 from .models import AppUser, PendingUser
 
 class AppUserSignupSerializer(serializers.ModelSerializer):
@@ -31,17 +32,17 @@ class AppUserSignupSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class AppUserLoginSerializer(serializers.Serializer):
+class LoginCredentialsSerializer(serializers.Serializer):
+    """Field checks only; the async login view verifies the password itself"""
     email = serializers.EmailField()
     password = serializers.CharField()
 
+class AppUserLoginSerializer(LoginCredentialsSerializer):
     def validate(self, data):
-        try:
-            user = AppUser.objects.get(email=data['email'])
-        except AppUser.DoesNotExist:
-            raise serializers.ValidationError("Invalid credentials")
+        user = AppUser.objects.filter(email=data['email']).first()
 
-        if not user.check_password(data['password']):
+        # Unknown emails still cost one hash, so timing does not reveal accounts
+        if not verify_password(data['password'], user.password if user else None):
             raise serializers.ValidationError("Invalid credentials")
 
         if not user.is_active:
@@ -0,0 +1,107 @@
+"""
+Write-coalescing session engine (``SESSION_ENGINE = 'useraccount.sessions'``).
+
+Sessions are read from the cache and kept durable in ``django_session``,
+like Django's ``cached_db`` engine. With SESSION_SAVE_EVERY_REQUEST the
+stock engines rewrite the session row on every request just to slide its
+expiry forward, and on SQLite those UPDATEs serialize every request behind
+one writer. This engine only writes when the session data changed, or when
+the sliding expiry has moved more than SESSION_SAVE_GRANULARITY seconds
+past the one last stored. The cookie still slides on every response, so a
+session idle for SESSION_COOKIE_AGE minus at most the granularity ends.
+Every worker must share the session cache, or a logout on one leaves the
+session cached on the others (the ``useraccount.E002`` check).
+"""
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.utils import timezone
+
+# Cached entries are (data, stored expiry), not the bare dict cached_db keeps
+KEY_PREFIX = 'useraccount.sessions'
+
+
+class SessionStore(cached_db.SessionStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # expire_date of the stored row, once loaded or written
+        self._stored_expiry = None
+
+    def load(self):
+        try:
+            cached = self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends raise on invalid cache keys; treat it as a miss
+            cached = None
+        if cached is not None:
+            data, self._stored_expiry = cached
+            return data
+
+        s = self._get_session_from_db()
+        if not s:
+            return {}
+        data = self.decode(s.session_data)
+        self._stored_expiry = s.expire_date
+        self._cache.set(self.cache_key, (data, s.expire_date), self.get_expiry_age(expiry=s.expire_date))
+        return data
+
+    def _expiry_is_current(self):
+        if self._stored_expiry is None:
+            return False
+        granularity = timedelta(seconds=settings.SESSION_SAVE_GRANULARITY)
+        return self.get_expiry_date() - self._stored_expiry < granularity
+
+    def save(self, must_create=False):
+        if not must_create and not self.modified and self._expiry_is_current():
+            return
+        if self.session_key is None:
+            return self.create()
+        # cached_db.save would cache the bare dict; write the row, then the tuple
+        DBStore.save(self, must_create)
+        expiry = self.get_expiry_date()
+        self._stored_expiry = expiry
+        self._cache.set(self.cache_key, (self._session, expiry), self.get_expiry_age(expiry=expiry))
+
+    @classmethod
+    def clear_expired(cls, chunk_size=1000):
+        """
+        Delete expired rows ``chunk_size`` at a time, each chunk in its own
+        short transaction so other writers are not locked out for the whole
+        purge. Returns the number of rows deleted; also used by clearsessions.
+        """
+        now = timezone.now()
+        expired = cls.get_model_class().objects.filter(expire_date__lt=now)
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:chunk_size])
+            if not keys:
+                return deleted
+            deleted += cls.get_model_class().objects.filter(session_key__in=keys).delete()[0]
+
+    # cached_db's async methods read and write the bare dict format, so
+    # route them through the methods above
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+    # As SessionBase._aget_session and aget from Django 5.1
+    async def _aget_session(self, no_load=False):
+        self.accessed = True
+        try:
+            return self._session_cache
+        except AttributeError:
+            if self.session_key is None or no_load:
+                self._session_cache = {}
+            else:
+                self._session_cache = await self.aload()
+        return self._session_cache
+
+    async def aget(self, key, default=None):
+        return (await self._aget_session()).get(key, default)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .identity import identity_cache
+from .models import AppUser
+
+
+@receiver(post_save, sender=AppUser)
+@receiver(post_delete, sender=AppUser)
+def app_user_changed(sender, instance, **kwargs):
+    """Profile edits, password resets and deactivation drop the cached identity"""
+    identity_cache.invalidate(instance.pk)
@@ -1,3 +1,735 @@
-from django.test import TestCase
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import Throttled
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .checks import check_otp_store, check_session_engine, check_throttle_cache
+from .identity import IdentityCache, get_identity_user, identity_cache
+from .models import AppUser, OutboundEmail
+from .otp import (
+    RESET, SIGNUP, CacheOTPStore, DBOTPStore, ExpiredOTP, InvalidOTP, TooManyAttempts,
+)
+from .sessions import SessionStore
+from .throttling import (
+    LoginEmailThrottle, LoginIPThrottle, TokenBucketThrottle, aconcurrency_slot, concurrency_slot,
+    parse_rate,
+)
+from .tokens import InvalidToken, issue_tokens, refresh_tokens
+from .utils.email_templates import clear_skeletons, render_email
+from .utils.outbox import enqueue_email, send_pending_batch
+
+RATES = {
+    'login_ip': '100/m',
+    'login_email': '3/m',
+    'otp_ip': '100/h',
+    'otp_email': '2/h',
+}
+THROTTLED = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES}
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class ThrottleTestMixin:
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.clock = FakeClock()
+        patcher = mock.patch.object(TokenBucketThrottle, 'timer', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(cache.clear)
+
+
+@override_settings(REST_FRAMEWORK=THROTTLED)
+class TokenBucketThrottleTests(ThrottleTestMixin, SimpleTestCase):
+    def request(self, email='a@example.com', ip='10.0.0.1'):
+        factory = APIRequestFactory()
+        request = factory.post('/', {'email': email}, format='json', REMOTE_ADDR=ip)
+        # Throttles read request.data, which needs a DRF request
+        return Request(request, parsers=[JSONParser()])
+
+    def allowed(self, throttle_class, request):
+        throttle = throttle_class()
+        return throttle.allow_request(request, None), throttle.wait()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/m'), (5, 60))
+        self.assertEqual(parse_rate('5/10m'), (5, 600))
+        self.assertEqual(parse_rate('20/hour'), (20, 3600))
+        with self.assertRaises(ValueError):
+            parse_rate('5 per minute')
+
+    def test_burst_then_refill(self):
+        request = self.request()
+        for _ in range(3):
+            self.assertTrue(self.allowed(LoginEmailThrottle, request)[0])
+        allowed, wait = self.allowed(LoginEmailThrottle, request)
+        self.assertFalse(allowed)
+        # One token comes back every 20 seconds at 3/m
+        self.assertAlmostEqual(wait, 20)
+
+        self.clock.advance(19)
+        self.assertFalse(self.allowed(LoginEmailThrottle, request)[0])
+        self.clock.advance(1)
+        self.assertTrue(self.allowed(LoginEmailThrottle, request)[0])
+        self.assertFalse(self.allowed(LoginEmailThrottle, request)[0])
+
+    def test_bucket_never_exceeds_capacity(self):
+        request = self.request()
+        self.assertTrue(self.allowed(LoginEmailThrottle, request)[0])
+        self.clock.advance(3600)
+        for _ in range(3):
+            self.assertTrue(self.allowed(LoginEmailThrottle, request)[0])
+        self.assertFalse(self.allowed(LoginEmailThrottle, request)[0])
+
+    def test_buckets_are_per_email(self):
+        for _ in range(3):
+            self.allowed(LoginEmailThrottle, self.request('a@example.com'))
+        self.assertFalse(self.allowed(LoginEmailThrottle, self.request('a@example.com'))[0])
+        # Same address in another case and with padding shares the bucket
+        self.assertFalse(self.allowed(LoginEmailThrottle, self.request(' A@Example.com '))[0])
+        self.assertTrue(self.allowed(LoginEmailThrottle, self.request('b@example.com'))[0])
+
+    def test_missing_email_is_not_throttled_by_email(self):
+        request = self.request(email='')
+        for _ in range(10):
+            self.assertTrue(self.allowed(LoginEmailThrottle, request)[0])
+
+    def test_concurrent_requests_share_the_bucket(self):
+        request = self.request()
+        results = []
+        barrier = threading.Barrier(10)
+
+        def attempt():
+            barrier.wait()
+            results.append(self.allowed(LoginEmailThrottle, request)[0])
+
+        threads = [threading.Thread(target=attempt) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 3)
+
+    def test_held_bucket_lock_refuses(self):
+        request = self.request()
+        throttle = LoginEmailThrottle()
+        key = f"throttle:login_email:{throttle.get_ident_key(request, None)}"
+        cache.add(f'{key}:lock', 1)
+        self.assertFalse(throttle.allow_request(request, None))
+        cache.delete(f'{key}:lock')
+        # No token was spent while locked out
+        for _ in range(3):
+            self.assertTrue(self.allowed(LoginEmailThrottle, request)[0])
+
+    def test_buckets_are_per_ip(self):
+        rates = {**RATES, 'login_ip': '2/m'}
+        with override_settings(REST_FRAMEWORK={**THROTTLED, 'DEFAULT_THROTTLE_RATES': rates}):
+            for _ in range(2):
+                self.assertTrue(self.allowed(LoginIPThrottle, self.request(ip='10.0.0.1'))[0])
+            self.assertFalse(self.allowed(LoginIPThrottle, self.request(ip='10.0.0.1'))[0])
+            self.assertTrue(self.allowed(LoginIPThrottle, self.request(ip='10.0.0.2'))[0])
+
+
+class ConcurrencySlotTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_cap_raises_throttled_with_retry_after(self):
+        with concurrency_slot('test', 2, 3):
+            with concurrency_slot('test', 2, 3):
+                with self.assertRaises(Throttled) as ctx:
+                    with concurrency_slot('test', 2, 3):
+                        pass
+                self.assertEqual(ctx.exception.wait, 3)
+
+    def test_slots_are_released(self):
+        for _ in range(5):
+            with concurrency_slot('test', 1, 1):
+                pass
+        with self.assertRaises(RuntimeError):
+            with concurrency_slot('test', 1, 1):
+                raise RuntimeError
+        with concurrency_slot('test', 1, 1):
+            pass
+
+
+@override_settings(REST_FRAMEWORK=THROTTLED)
+class AuthEndpointThrottleTests(ThrottleTestMixin, TestCase):
+    login_url = '/useraccounts/api/user/login/'
+    send_otp_url = '/useraccounts/api/auth/send-otp/'
+
+    def setUp(self):
+        super().setUp()
+        user = AppUser(email='a@example.com', first_name='A', last_name='B')
+        user.set_password('pw12345678')
+        user.save()
+
+    def login(self, password='wrong-password'):
+        return self.client.post(self.login_url, {'email': 'a@example.com', 'password': password},
+                                content_type='application/json')
+
+    def test_login_answers_429_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 400)
+        response = self.login('pw12345678')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+
+        self.clock.advance(20)
+        self.assertEqual(self.login('pw12345678').status_code, 200)
+
+    def test_otp_send_is_throttled_per_email(self):
+        for _ in range(2):
+            response = self.client.post(self.send_otp_url, {'email': 'new@example.com'},
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+        response = self.client.post(self.send_otp_url, {'email': 'new@example.com'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1800')
+
+        response = self.client.post(self.send_otp_url, {'email': 'other@example.com'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(AUTH_HASHING_MAX_CONCURRENCY=1, THROTTLE_BUSY_RETRY_AFTER=2)
+    def test_login_is_shed_when_hashing_slots_are_taken(self):
+        with concurrency_slot('hashing', 1, 2):
+            response = self.login('pw12345678')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertEqual(self.login('pw12345678').status_code, 200)
+
+
+class RefreshTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = AppUser(email='a@example.com', first_name='A', last_name='B')
+        self.user.set_password('pw12345678')
+        self.user.save()
+
+    def test_refresh_tokens_are_single_use_across_workers(self):
+        refresh = issue_tokens(self.user)['refresh']
+        refresh_tokens(refresh)
+        # Another worker with its own cache still sees the revocation
+        cache.clear()
+        with self.assertRaises(InvalidToken):
+            refresh_tokens(refresh)
+
+    def test_password_change_ends_refresh_tokens(self):
+        refresh = issue_tokens(self.user)['refresh']
+        self.user.set_password('new-password')
+        self.user.save()
+        with self.assertRaises(InvalidToken):
+            refresh_tokens(refresh)
+        refresh_tokens(issue_tokens(self.user)['refresh'])
+
+
+class EmailTemplateTests(SimpleTestCase):
+    contexts = {
+        'otp_send.html': {'email': 'a@example.com', 'first_name': 'A <b>', 'otp': list('123456'), 'year': 2026},
+        'password_reset_otp.html': {'email': 'a&b@example.com', 'first_name': 'there',
+                                    'otp': list('654321'), 'year': 2026},
+        'otp_confirmed.html': {'email': 'a@example.com', 'first_name': '"A"', 'year': 2026},
+        'password_reset_success.html': {'email': 'a@example.com', 'first_name': "O'Neil",
+                                        'login_url': 'http://localhost/login/?a=1&b=2', 'year': 2026},
+        'welcome_complete.html': {'email': 'a@example.com', 'first_name': 'A', 'full_name': 'A B',
+                                  'initials': 'AB', 'join_date': 'October 18, 2026',
+                                  'dashboard_url': '/tasko/main_app/dashboard/', 'year': 2026},
+    }
+
+    def setUp(self):
+        clear_skeletons()
+        self.addCleanup(clear_skeletons)
+
+    def test_output_matches_render_to_string(self):
+        for name, context in self.contexts.items():
+            template_name = f'useraccount/emails/{name}'
+            with self.subTest(template=name):
+                expected = render_to_string(template_name, context)
+                self.assertEqual(render_email(template_name, context), expected)
+                # Served from the skeleton the second time
+                self.assertEqual(render_email(template_name, context), expected)
+
+    def test_template_is_rendered_once_per_shape(self):
+        context = self.contexts['otp_send.html']
+        with mock.patch('useraccount.utils.email_templates.render_to_string',
+                        wraps=render_to_string) as render:
+            for first_name in ['A', 'B', 'C']:
+                render_email('useraccount/emails/otp_send.html', {**context, 'first_name': first_name})
+            # Empty values may hit |default, so they are rendered normally
+            render_email('useraccount/emails/otp_send.html', {**context, 'first_name': ''})
+        self.assertEqual(render.call_count, 2)
+
+
+class IdentityCacheTests(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        identities = IdentityCache(maxsize=2, ttl=60)
+        identities.set(1, 'one')
+        identities.set(2, 'two')
+        identities.get(1)
+        identities.set(3, 'three')
+        self.assertEqual([identities.get(i) for i in (1, 2, 3)], ['one', None, 'three'])
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        identities = IdentityCache(maxsize=2, ttl=60, timer=clock)
+        identities.set(1, 'one')
+        clock.advance(59)
+        self.assertEqual(identities.get(1), 'one')
+        clock.advance(1)
+        self.assertIsNone(identities.get(1))
+
+
+class IdentityUserTests(TestCase):
+    def setUp(self):
+        identity_cache.clear()
+        self.addCleanup(identity_cache.clear)
+        self.user = AppUser.objects.create(email='a@example.com', first_name='A', last_name='B')
+
+    def test_identity_is_cached_and_the_rest_deferred(self):
+        get_identity_user(self.user.id)
+        with self.assertNumQueries(0):
+            user = get_identity_user(self.user.id)
+            self.assertEqual(user.email, 'a@example.com')
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_joined, self.user.date_joined)
+
+    def test_saves_and_deletes_drop_the_entry(self):
+        get_identity_user(self.user.id)
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(get_identity_user(self.user.id).is_active)
+        self.user.delete()
+        self.assertIsNone(get_identity_user(self.user.id))
+
+
+class AccessTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = AppUser(email='a@example.com', first_name='A', last_name='B')
+        self.user.set_password('pw12345678')
+        self.user.save()
+        self.tokens = self.client.post('/useraccounts/api/user/login/',
+                                       {'email': 'a@example.com', 'password': 'pw12345678'},
+                                       content_type='application/json').json()['tokens']
+        self.client.cookies.clear()
+
+    def bearer(self, token):
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def test_access_token_needs_no_session_or_user_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/useraccounts/api/auth/check-session/',
+                                       **self.bearer(self.tokens['access']))
+        self.assertEqual(response.json()['user'], {'id': self.user.id, 'email': 'a@example.com'})
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_bad_tokens_are_rejected(self):
+        for token in [self.tokens['access'] + 'x', self.tokens['refresh']]:
+            with self.subTest(token=token):
+                response = self.client.get('/useraccounts/api/auth/check-session/', **self.bearer(token))
+                self.assertEqual(response.status_code, 401)
+        with override_settings(ACCESS_TOKEN_LIFETIME=-1):
+            response = self.client.get('/useraccounts/api/auth/check-session/',
+                                       **self.bearer(self.tokens['access']))
+        self.assertEqual(response.json()['detail'], 'Token has expired')
+
+    def test_logout_revokes_both_tokens(self):
+        response = self.client.post('/useraccounts/api/user/logout/', {'refresh': self.tokens['refresh']},
+                                    content_type='application/json', **self.bearer(self.tokens['access']))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/useraccounts/api/auth/check-session/',
+                                   **self.bearer(self.tokens['access']))
+        self.assertEqual(response.json()['detail'], 'Token has been revoked')
+        response = self.client.post('/useraccounts/api/auth/token/refresh/',
+                                    {'refresh': self.tokens['refresh']}, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_issues_a_working_pair(self):
+        response = self.client.post('/useraccounts/api/auth/token/refresh/',
+                                    {'refresh': self.tokens['refresh']}, content_type='application/json')
+        tokens = response.json()['tokens']
+        response = self.client.get('/useraccounts/api/auth/check-session/', **self.bearer(tokens['access']))
+        self.assertEqual(response.status_code, 200)
+
+
+class OTPStoreCheckTests(SimpleTestCase):
+    @override_settings(OTP_STORE='useraccount.otp.CacheOTPStore')
+    def test_cache_store_needs_a_shared_cache(self):
+        self.assertEqual([e.id for e in check_otp_store(None)], ['useraccount.E001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_otp_store(None), [])
+
+    @override_settings(OTP_STORE='useraccount.otp.DBOTPStore')
+    def test_db_store_passes(self):
+        self.assertEqual(check_otp_store(None), [])
+
+
+class ThrottleCacheCheckTests(SimpleTestCase):
+    def test_limits_need_a_shared_cache(self):
+        self.assertEqual([e.id for e in check_throttle_cache(None)], ['useraccount.E003'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_throttle_cache(None), [])
+
+
+class SessionEngineCheckTests(SimpleTestCase):
+    @override_settings(SESSION_ENGINE='useraccount.sessions')
+    def test_cached_engine_needs_a_shared_cache(self):
+        self.assertEqual([e.id for e in check_session_engine(None)], ['useraccount.E002'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_session_engine(None), [])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_db_engine_passes(self):
+        self.assertEqual(check_session_engine(None), [])
+
+
+class PollingBackend(LocmemBackend):
+    """Has another worker poll the outbox while each message is sent"""
+    polls = []
+
+    def send_messages(self, messages):
+        self.polls.append(send_pending_batch(backend='django.core.mail.backends.locmem.EmailBackend'))
+        return super().send_messages(messages)
+
+
+class UnreachableBackend(LocmemBackend):
+    def open(self):
+        raise ConnectionRefusedError('Connection refused')
+
+
+class RejectingBackend(LocmemBackend):
+    def send_messages(self, messages):
+        raise ConnectionResetError('Connection reset')
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        for i in range(2):
+            enqueue_email(f'{i}@example.com', 'Subject', message='Body')
+
+    def test_batch_is_leased_while_sending(self):
+        PollingBackend.polls = []
+        self.assertEqual(send_pending_batch(backend='useraccount.tests.PollingBackend'), (2, 0))
+        self.assertEqual(PollingBackend.polls, [(0, 0), (0, 0)])
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+
+    def test_connection_failure_releases_the_batch(self):
+        with self.assertRaises(ConnectionRefusedError):
+            send_pending_batch(backend='useraccount.tests.UnreachableBackend')
+        self.assertEqual(send_pending_batch(backend='django.core.mail.backends.locmem.EmailBackend'), (2, 0))
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_RETRY_DELAY=30)
+    def test_failures_back_off_then_give_up(self):
+        self.assertEqual(send_pending_batch(backend='useraccount.tests.RejectingBackend'), (0, 2))
+        # Not due again until the backoff has passed
+        self.assertEqual(send_pending_batch(backend='useraccount.tests.RejectingBackend'), (0, 0))
+        with later(30):
+            self.assertEqual(send_pending_batch(backend='useraccount.tests.RejectingBackend'), (0, 2))
+        with later(30 + 59):
+            self.assertEqual(send_pending_batch(backend='useraccount.tests.RejectingBackend'), (0, 0))
+        with later(30 + 60):
+            self.assertEqual(send_pending_batch(backend='useraccount.tests.RejectingBackend'), (0, 2))
+        email = OutboundEmail.objects.first()
+        self.assertEqual((email.status, email.attempts, email.last_error),
+                         (OutboundEmail.STATUS_FAILED, 3, 'Connection reset'))
+
+    @mock.patch('useraccount.otp.generate_otp', return_value='123456')
+    def test_otp_mail_is_queued_not_sent(self, _):
+        response = self.client.post('/useraccounts/api/auth/send-otp/', {'email': 'new@example.com'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get(to='new@example.com')
+        self.assertEqual(''.join(re.findall(r'"code-digit">(\d)<', email.html_body)), '123456')
+        send_pending_batch(backend='django.core.mail.backends.locmem.EmailBackend')
+        self.assertIn(['new@example.com'], [message.to for message in mail.outbox])
+
+
+@contextmanager
+def later(seconds):
+    """Move both clocks OTP stores read (the cache's and the database's) forward"""
+    now, wall = timezone.now(), time.time()
+    with mock.patch('django.utils.timezone.now', return_value=now + timedelta(seconds=seconds)), \
+            mock.patch('time.time', return_value=wall + seconds):
+        yield
+
+
+class OTPStoreTestMixin:
+    store_class = None
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.store = self.store_class()
+        self.otp = self.store.issue(SIGNUP, 'a@example.com', {'first_name': 'A', 'last_name': 'B'})
+
+    def wrong(self):
+        return '000000' if self.otp != '000000' else '111111'
+
+    def test_verify_then_consume_once(self):
+        self.assertEqual(self.store.peek(SIGNUP, 'a@example.com')['first_name'], 'A')
+        self.assertEqual(self.store.verify(SIGNUP, 'a@example.com', self.otp)['first_name'], 'A')
+        self.assertEqual(self.store.consume(SIGNUP, 'a@example.com')['last_name'], 'B')
+        self.assertIsNone(self.store.consume(SIGNUP, 'a@example.com'))
+
+    def test_unverified_code_cannot_be_consumed(self):
+        self.assertIsNone(self.store.consume(SIGNUP, 'a@example.com'))
+        # Nor can a code issued for the other purpose
+        self.store.verify(SIGNUP, 'a@example.com', self.otp)
+        self.assertIsNone(self.store.consume(RESET, 'a@example.com'))
+
+    def test_wrong_codes_run_out_of_attempts(self):
+        for _ in range(settings.OTP_MAX_ATTEMPTS):
+            with self.assertRaises(InvalidOTP):
+                self.store.verify(SIGNUP, 'a@example.com', self.wrong())
+        with self.assertRaises(TooManyAttempts):
+            self.store.verify(SIGNUP, 'a@example.com', self.otp)
+        # The code is gone; only a new one works
+        with self.assertRaises(ExpiredOTP):
+            self.store.verify(SIGNUP, 'a@example.com', self.otp)
+        otp = self.store.issue(SIGNUP, 'a@example.com')
+        self.store.verify(SIGNUP, 'a@example.com', otp)
+
+    def test_codes_expire(self):
+        with later(settings.OTP_LIFETIME + 1):
+            with self.assertRaises(ExpiredOTP):
+                self.store.verify(SIGNUP, 'a@example.com', self.otp)
+
+    def test_verified_code_expires_unused(self):
+        self.store.verify(SIGNUP, 'a@example.com', self.otp)
+        with later(settings.OTP_LIFETIME + 1):
+            self.assertIsNone(self.store.consume(SIGNUP, 'a@example.com'))
+
+    def test_issue_replaces_the_previous_code(self):
+        otp = self.store.issue(SIGNUP, 'a@example.com')
+        if otp != self.otp:
+            with self.assertRaises(InvalidOTP):
+                self.store.verify(SIGNUP, 'a@example.com', self.otp)
+        self.store.verify(SIGNUP, 'a@example.com', otp)
+
+
+class CacheOTPStoreTests(OTPStoreTestMixin, TestCase):
+    store_class = CacheOTPStore
+
+
+class DBOTPStoreTests(OTPStoreTestMixin, TestCase):
+    store_class = DBOTPStore
+
+
+@override_settings(SESSION_ENGINE='useraccount.sessions')
+class CoalescingSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        session = SessionStore()
+        session['app_user_id'] = 1
+        session.save()
+        self.key = session.session_key
+
+    def stored_expiry(self):
+        return Session.objects.get(session_key=self.key).expire_date
+
+    def test_unchanged_sessions_are_not_rewritten(self):
+        session = SessionStore(self.key)
+        self.assertEqual(session['app_user_id'], 1)
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_expiry_is_written_once_it_moves_past_the_granularity(self):
+        before = self.stored_expiry()
+        with later(settings.SESSION_SAVE_GRANULARITY - 1):
+            session = SessionStore(self.key)
+            session.load()
+            session.save()
+        self.assertEqual(self.stored_expiry(), before)
+        with later(settings.SESSION_SAVE_GRANULARITY):
+            session = SessionStore(self.key)
+            session.load()
+            session.save()
+        self.assertGreaterEqual(self.stored_expiry(), before + timedelta(seconds=settings.SESSION_SAVE_GRANULARITY))
+
+    def test_changes_are_written_and_survive_a_cache_loss(self):
+        session = SessionStore(self.key)
+        session['app_user_id'] = 2
+        session.save()
+        cache.clear()
+        self.assertEqual(SessionStore(self.key)['app_user_id'], 2)
+
+    def test_requests_do_not_write_the_session(self):
+        user = AppUser(email='a@example.com', first_name='A', last_name='B')
+        user.set_password('pw12345678')
+        user.save()
+        self.client.post('/useraccounts/api/user/login/',
+                         {'email': 'a@example.com', 'password': 'pw12345678'},
+                         content_type='application/json')
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                self.assertEqual(self.client.get('/useraccounts/api/auth/check-session/').status_code, 200)
+        table = Session._meta.db_table
+        self.assertEqual([q for q in queries.captured_queries if table in q['sql']], [])
+
+    def test_clear_expired_deletes_in_chunks(self):
+        for _ in range(3):
+            session = SessionStore()
+            session.set_expiry(-1)
+            session.save()
+        self.assertEqual(SessionStore.clear_expired(chunk_size=2), 3)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), [self.key])
+
+
+@mock.patch('useraccount.otp.generate_otp', return_value='123456')
+class OTPEndpointTests(TestCase):
+    password = {'password': 'new-password-1', 'confirm_password': 'new-password-1'}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def post(self, path, data):
+        return self.client.post(f'/useraccounts/api/{path}', data, content_type='application/json')
+
+    def test_signup_needs_a_verified_code(self, _):
+        signup = {'email': 'new@example.com', 'first_name': 'N', 'last_name': 'M', **self.password}
+        self.assertEqual(self.post('auth/complete-signup/', signup).status_code, 400)
+        self.assertEqual(self.post('auth/send-otp/', {'email': 'new@example.com'}).status_code, 200)
+        self.assertEqual(self.post('auth/complete-signup/', signup).status_code, 400)
+        response = self.post('auth/verify-otp/', {'email': 'new@example.com', 'otp': '654321'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post('auth/verify-otp/', {'email': 'new@example.com', 'otp': '123456'}).status_code, 200)
+        self.assertEqual(self.post('auth/complete-signup/', signup).status_code, 200)
+        self.assertTrue(AppUser.objects.filter(email='new@example.com').exists())
+        # The code was used up
+        AppUser.objects.filter(email='new@example.com').delete()
+        self.assertEqual(self.post('auth/complete-signup/', signup).status_code, 400)
+
+    def test_reset_needs_a_verified_code(self, _):
+        user = AppUser(email='a@example.com', first_name='A', last_name='B')
+        user.set_password('pw12345678')
+        user.save()
+        reset = {'email': 'a@example.com', **self.password}
+        self.assertEqual(self.post('auth/reset-password/', reset).status_code, 400)
+        self.post('auth/forgot-password/send-otp/', {'email': 'a@example.com'})
+        self.assertEqual(self.post('auth/reset-password/', reset).status_code, 400)
+        for _ in range(settings.OTP_MAX_ATTEMPTS):
+            self.post('auth/forgot-password/verify-otp/', {'email': 'a@example.com', 'otp': '654321'})
+        response = self.post('auth/forgot-password/verify-otp/', {'email': 'a@example.com', 'otp': '123456'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.post('auth/reset-password/', reset).status_code, 400)
+
+        self.post('auth/forgot-password/resend-otp/', {'email': 'a@example.com'})
+        self.post('auth/forgot-password/verify-otp/', {'email': 'a@example.com', 'otp': '123456'})
+        self.assertEqual(self.post('auth/reset-password/', reset).status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('new-password-1'))
+        self.assertEqual(self.post('auth/reset-password/', reset).status_code, 400)
+
+
+class AsyncAuthViewTests(TestCase):
+    """The async auth views served under ASGI"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = AppUser(email='a@example.com', first_name='A', last_name='B')
+        self.user.set_password('pw12345678')
+        self.user.save()
+
+    async def post(self, path, data):
+        return await self.async_client.post(f'/useraccounts/api/{path}', data,
+                                            content_type='application/json')
+
+    async def test_login(self):
+        response = await self.post('user/login/', {'email': 'a@example.com', 'password': 'pw12345678'})
+        self.assertTrue(iscoroutinefunction(response.asgi_request.resolver_match.func))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json()['tokens'])
+        response = await self.async_client.get('/useraccounts/api/user/me/')
+        self.assertEqual(response.status_code, 200)
+        # The hashing slot was given back
+        self.assertEqual(await cache.aget('throttle:slots:hashing'), 0)
+
+    async def test_wrong_password_and_unknown_email_look_the_same(self):
+        wrong = await self.post('user/login/', {'email': 'a@example.com', 'password': 'nope12345'})
+        unknown = await self.post('user/login/', {'email': 'z@example.com', 'password': 'nope12345'})
+        self.assertEqual(wrong.status_code, 400)
+        self.assertEqual(wrong.json(), unknown.json())
+
+    async def test_passwords_are_checked_on_the_hashing_pool(self):
+        threads = []
+
+        def check(raw_password, encoded):
+            threads.append(threading.current_thread().name)
+            return check_password(raw_password, encoded)
+
+        with mock.patch('useraccount.hashing.check_password', check):
+            await self.post('user/login/', {'email': 'a@example.com', 'password': 'pw12345678'})
+            # Unknown emails still spend one hash
+            await self.post('user/login/', {'email': 'z@example.com', 'password': 'pw12345678'})
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith('hashing') for name in threads), threads)
+
+    async def test_signup(self):
+        response = await self.post('user/signup/', {
+            'email': 'new@example.com', 'first_name': 'N', 'last_name': 'M',
+            'password': 'new-password-1', 'confirm_password': 'new-password-1',
+        })
+        self.assertEqual(response.status_code, 201)
+        user = await AppUser.objects.aget(email='new@example.com')
+        self.assertTrue(user.check_password('new-password-1'))
+
+    async def test_code_gated_views_need_a_verified_code(self):
+        password = {'password': 'new-password-1', 'confirm_password': 'new-password-1'}
+        response = await self.post('auth/complete-signup/', {
+            'email': 'new@example.com', 'first_name': 'N', 'last_name': 'M', **password,
+        })
+        self.assertEqual(response.status_code, 400)
+        response = await self.post('auth/reset-password/', {'email': 'a@example.com', **password})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(AUTH_HASHING_MAX_CONCURRENCY=1, THROTTLE_BUSY_RETRY_AFTER=2)
+    async def test_busy_hashing_answers_429(self):
+        async with aconcurrency_slot('hashing', 1, 2):
+            response = await self.post('user/login/', {'email': 'a@example.com', 'password': 'pw12345678'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '2')
+        response = await self.post('user/login/', {'email': 'a@example.com', 'password': 'pw12345678'})
+        self.assertEqual(response.status_code, 200)
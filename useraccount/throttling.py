@@ -0,0 +1,198 @@
+"""
+Throttling for the unauthenticated auth endpoints.
+
+Login and the OTP endpoints are open to anyone, and each request costs a
+password hash or an outgoing email. ``TokenBucketThrottle`` subclasses
+limit them per client IP and per email address: a bucket holds up to N
+tokens, refills at N per period, and each request takes one, so short
+bursts pass while sustained floods get 429 with Retry-After. Rates come
+from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] as ``"<tokens>/<period>"``,
+where the period is s, m, h or d, optionally with a count such as ``10m``.
+
+``hashing_slot()`` caps how many password hashes run at once across all
+workers. Past the cap a request is answered 429 at once instead of
+queueing behind the others for CPU.
+
+Bucket state and the slot counter live in the default cache. Each bucket
+is updated under a short lock taken with ``cache.add``, so concurrent
+requests cannot spend the same token twice. The limits are only global
+when that cache is shared between workers; with a per-process cache each
+worker enforces them on its own, and ``check --deploy`` reports
+``useraccount.E003``.
+"""
+import hashlib
+import re
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])\w*$')
+
+# Seconds a slot counter outlives its last use, so slots leaked by a
+# killed worker are eventually forgotten
+SLOT_TTL = 300
+
+# Seconds a bucket lock is held at most (a killed worker's lock expires),
+# and waited for before the request is refused
+BUCKET_LOCK_TTL = 2
+BUCKET_LOCK_WAIT = 0.2
+
+
+def parse_rate(rate):
+    """``"5/m"`` or ``"5/10m"`` -> (capacity, period in seconds)"""
+    match = RATE_RE.match(rate)
+    if not match:
+        raise ValueError(f'Invalid throttle rate: {rate!r}')
+    tokens, count, unit = match.groups()
+    return int(tokens), int(count or 1) * PERIODS[unit]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+    cache = default_cache
+    timer = time.time
+
+    def __init__(self):
+        # Read per instance so setting overrides apply without a restart
+        self.capacity, self.period = parse_rate(api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+        self.wait_seconds = None
+
+    def get_ident_key(self, request, view):
+        """The string to bucket this request by, or None to let it through"""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+        key = f'throttle:{self.scope}:{ident}'
+        if not self._lock(key):
+            # Contended beyond reason: refuse rather than skip the limit
+            self.wait_seconds = BUCKET_LOCK_WAIT
+            return False
+        try:
+            now = self.timer()
+            tokens, stamp = self.cache.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - stamp) * self.capacity / self.period)
+            if tokens < 1:
+                self.wait_seconds = (1 - tokens) * self.period / self.capacity
+                return False
+            # A bucket left alone for a period is full again, so it can expire
+            self.cache.set(key, (tokens - 1, now), self.period)
+            return True
+        finally:
+            self.cache.delete(f'{key}:lock')
+
+    def _lock(self, key):
+        """Take the bucket's lock, waiting up to BUCKET_LOCK_WAIT seconds"""
+        deadline = time.monotonic() + BUCKET_LOCK_WAIT
+        while not self.cache.add(f'{key}:lock', 1, BUCKET_LOCK_TTL):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EmailThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Hashed so arbitrary input makes a safe cache key
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailThrottle):
+    scope = 'login_email'
+
+
+class OTPIPThrottle(IPThrottle):
+    scope = 'otp_ip'
+
+
+class OTPEmailThrottle(EmailThrottle):
+    scope = 'otp_email'
+
+
+@contextmanager
+def concurrency_slot(name, limit, retry_after, cache=default_cache):
+    """
+    Hold one of ``limit`` slots named ``name`` for the block, or raise
+    Throttled (429 with Retry-After) if they are all taken.
+    """
+    key = f'throttle:slots:{name}'
+    cache.add(key, 0, SLOT_TTL)
+    try:
+        taken = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, SLOT_TTL)
+        taken = 1
+    try:
+        if taken > limit:
+            raise Throttled(wait=retry_after)
+        cache.touch(key, SLOT_TTL)
+        yield
+    finally:
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+
+
+@asynccontextmanager
+async def aconcurrency_slot(name, limit, retry_after, cache=default_cache):
+    """``concurrency_slot`` for async views, through the async cache API"""
+    key = f'throttle:slots:{name}'
+    await cache.aadd(key, 0, SLOT_TTL)
+    try:
+        taken = await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, SLOT_TTL)
+        taken = 1
+    try:
+        if taken > limit:
+            raise Throttled(wait=retry_after)
+        await cache.atouch(key, SLOT_TTL)
+        yield
+    finally:
+        try:
+            await cache.adecr(key)
+        except ValueError:
+            pass
+
+
+def hashing_slot():
+    """A slot for one password hash; see AUTH_HASHING_MAX_CONCURRENCY"""
+    return concurrency_slot(
+        'hashing',
+        settings.AUTH_HASHING_MAX_CONCURRENCY,
+        settings.THROTTLE_BUSY_RETRY_AFTER,
+    )
+
+
+def ahashing_slot():
+    """``hashing_slot`` for async views, which must not block the event loop on the cache"""
+    return aconcurrency_slot(
+        'hashing',
+        settings.AUTH_HASHING_MAX_CONCURRENCY,
+        settings.THROTTLE_BUSY_RETRY_AFTER,
+    )
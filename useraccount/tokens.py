@@ -0,0 +1,146 @@
+"""
+Signed access and refresh tokens for session-free API authentication.
+
+Tokens are ``django.core.signing`` payloads, so verifying one needs only the
+SECRET_KEY. Access tokens carry the identity fields the API reads, which
+lets a request authenticate without touching the database. Revoked access
+token ids are kept in the cache until the token would have expired anyway;
+without a shared cache a logout elsewhere only ends them at expiry, after
+ACCESS_TOKEN_LIFETIME.
+
+Refresh tokens are checked against the database, which every worker
+shares: revoked ones are kept in ``RevokedToken`` (``purge_tokens`` deletes
+them once expired), and each token carries a fingerprint of the user's
+password hash, so changing or resetting the password ends every refresh
+token issued before.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .identity import IDENTITY_FIELDS, user_from_identity
+from .models import AppUser, RevokedToken
+
+ACCESS_SALT = 'useraccount.tokens.access'
+REFRESH_SALT = 'useraccount.tokens.refresh'
+
+
+class InvalidToken(Exception):
+    """Raised when a token is malformed, expired, revoked or of the wrong kind"""
+
+
+def _revoked_key(jti):
+    return f'revoked_token:{jti}'
+
+
+def _password_fingerprint(user):
+    return salted_hmac(REFRESH_SALT, user.password).hexdigest()[:16]
+
+
+def issue_tokens(user):
+    """Return a fresh access/refresh token pair for ``user``"""
+    access = signing.dumps({
+        'jti': uuid.uuid4().hex,
+        'user': [getattr(user, field) for field in IDENTITY_FIELDS],
+    }, salt=ACCESS_SALT, compress=True)
+    refresh = signing.dumps({
+        'jti': uuid.uuid4().hex,
+        'uid': user.id,
+        'pwd': _password_fingerprint(user),
+    }, salt=REFRESH_SALT, compress=True)
+    return {
+        'access': access,
+        'refresh': refresh,
+        'token_type': 'Bearer',
+        'expires_in': settings.ACCESS_TOKEN_LIFETIME,
+    }
+
+
+def _load(token, salt, max_age):
+    try:
+        payload = signing.loads(token, salt=salt, max_age=max_age)
+    except signing.SignatureExpired:
+        raise InvalidToken('Token has expired')
+    except signing.BadSignature:
+        raise InvalidToken('Invalid token')
+    if cache.get(_revoked_key(payload['jti'])):
+        raise InvalidToken('Token has been revoked')
+    return payload
+
+
+def load_access_token(token):
+    """Validate an access token and return its payload"""
+    return _load(token, ACCESS_SALT, settings.ACCESS_TOKEN_LIFETIME)
+
+
+def load_refresh_token(token):
+    """Validate a refresh token and return its payload"""
+    payload = _load(token, REFRESH_SALT, settings.REFRESH_TOKEN_LIFETIME)
+    if RevokedToken.objects.filter(jti=payload['jti']).exists():
+        raise InvalidToken('Token has been revoked')
+    return payload
+
+
+def user_from_payload(payload):
+    """
+    Build an AppUser from an access token without querying the database.
+
+    Fields that are not in the token (password, date_joined) are deferred
+    and load on first access like any other deferred field.
+    """
+    return user_from_identity(payload['user'])
+
+
+def revoke_token(payload, lifetime):
+    """Reject the token with this payload for the rest of its lifetime"""
+    cache.set(_revoked_key(payload['jti']), True, timeout=lifetime)
+
+
+def revoke_access_token(payload):
+    revoke_token(payload, settings.ACCESS_TOKEN_LIFETIME)
+
+
+def revoke_refresh_token(payload):
+    """Revoke a refresh token for every worker; False if it already was"""
+    expires_at = timezone.now() + timedelta(seconds=settings.REFRESH_TOKEN_LIFETIME)
+    _, created = RevokedToken.objects.get_or_create(
+        jti=payload['jti'], defaults={'expires_at': expires_at},
+    )
+    return created
+
+
+def purge_revoked_tokens(chunk_size=1000):
+    """Delete revoked refresh tokens that have expired anyway, ``chunk_size`` at a time"""
+    expired = RevokedToken.objects.filter(expires_at__lte=timezone.now())
+    deleted = 0
+    while True:
+        ids = list(expired.values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        deleted += RevokedToken.objects.filter(id__in=ids).delete()[0]
+
+
+def refresh_tokens(refresh_token):
+    """
+    Exchange a refresh token for a new token pair.
+
+    The refresh token is rotated: the old one is revoked, and the user is
+    re-read so deactivated accounts and tokens issued before a password
+    change can no longer refresh.
+    """
+    payload = load_refresh_token(refresh_token)
+    try:
+        user = AppUser.objects.get(id=payload['uid'], is_active=True)
+    except AppUser.DoesNotExist:
+        raise InvalidToken('User not found or inactive')
+    if not constant_time_compare(payload.get('pwd', ''), _password_fingerprint(user)):
+        raise InvalidToken('Token has been revoked')
+    # Only one of several concurrent refreshes with the same token wins
+    if not revoke_refresh_token(payload):
+        raise InvalidToken('Token has been revoked')
+    return issue_tokens(user)
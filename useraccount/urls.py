@@ -23,6 +23,7 @@ urlpatterns = [
     path('api/user/me/', views.api_get_current_user, name='api_current_user'),
     path('api/auth/check-session/', views.api_check_session, name='api_check_session'),
     path('api/auth/csrf/', views.get_csrf_token, name='api_csrf'),
+    path('api/auth/token/refresh/', views.api_token_refresh, name='api_token_refresh'),
 
     path('forgot-password/', views.forgot_password_email_page, name='forgot_password_email'),
     path('forgot-password/otp/', views.forgot_password_otp_page, name='forgot_password_otp'),
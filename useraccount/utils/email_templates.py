@@ -0,0 +1,88 @@
+"""
+Pre-rendered email skeletons.
+
+Email templates only vary by a handful of plain values (name, email, OTP
+digits, dates). Each template is rendered once with placeholder markers,
+split into static chunks, and later renders just join the chunks with the
+escaped values. Output is identical to ``render_to_string``; contexts the
+skeleton cannot reproduce (empty values that would trigger ``|default``,
+non-string values) fall back to a normal render.
+"""
+import re
+import threading
+
+from django.template.loader import render_to_string
+from django.utils.html import escape
+
+# Control characters that survive HTML escaping and never occur in templates
+_SLOT = '\x1e{}\x1f'
+_SLOT_RE = re.compile('\x1e([^\x1f]*)\x1f')
+
+_skeletons = {}
+_lock = threading.Lock()
+
+
+class EmailSkeleton:
+    """A template rendered once, stored as static chunks and value slots"""
+
+    def __init__(self, template_name, shape):
+        placeholders = {}
+        for key, length in shape:
+            if length is None:
+                placeholders[key] = _SLOT.format(key)
+            else:
+                placeholders[key] = [_SLOT.format(f'{key}.{i}') for i in range(length)]
+        # Odd positions of the split are slot names, even ones static HTML
+        self.parts = _SLOT_RE.split(render_to_string(template_name, placeholders))
+
+    def render(self, context):
+        values = {}
+        for key, value in context.items():
+            if isinstance(value, list):
+                for i, item in enumerate(value):
+                    values[f'{key}.{i}'] = escape(item)
+            else:
+                values[key] = escape(value)
+        parts = self.parts[:]
+        parts[1::2] = [values[name] for name in parts[1::2]]
+        return ''.join(parts)
+
+
+def _context_shape(context):
+    """
+    Hashable description of which keys are scalars and how long the lists
+    are, or None if the context cannot be served from a skeleton.
+    """
+    shape = []
+    for key, value in context.items():
+        if isinstance(value, list):
+            if not all(isinstance(item, str) and item for item in value):
+                return None
+            shape.append((key, len(value)))
+        elif isinstance(value, (str, int)) and not isinstance(value, bool) and value:
+            shape.append((key, None))
+        else:
+            return None
+    return tuple(sorted(shape))
+
+
+def render_email(template_name, context):
+    """Render an email template, reusing its pre-rendered skeleton when possible"""
+    shape = _context_shape(context)
+    if shape is None:
+        return render_to_string(template_name, context)
+
+    key = (template_name, shape)
+    skeleton = _skeletons.get(key)
+    if skeleton is None:
+        with _lock:
+            skeleton = _skeletons.get(key)
+            if skeleton is None:
+                skeleton = _skeletons[key] = EmailSkeleton(template_name, shape)
+    return skeleton.render(context)
+
+
+def clear_skeletons():
+    """Forget every skeleton, e.g. after editing templates in development"""
+    with _lock:
+        _skeletons.clear()
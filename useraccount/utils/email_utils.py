@@ -1,13 +1,13 @@
 import random
 import string
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
-from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
 import logging
 
+from .email_templates import render_email
+from .outbox import enqueue_email
+
 logger = logging.getLogger(__name__)
 
 def generate_otp(length=6):
@@ -26,18 +26,15 @@ def send_otp_email(email, otp, first_name=None):
         
         logger.info(f"Rendering email template for {email}")
         # Fixed path: add 'useraccount/' prefix
-        html_message = render_to_string('useraccount/emails/otp_send.html', context)
+        html_message = render_email('useraccount/emails/otp_send.html', context)
         
-        logger.info(f"Sending email to {email}")
-        send_mail(
+        logger.info(f"Queueing email to {email}")
+        enqueue_email(
+            to=email,
             subject='Your Tasko Verification Code',
-            message='',  # Plain text version
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
             html_message=html_message,
-            fail_silently=False,
         )
-        logger.info(f"Email sent successfully to {email}")
+        logger.info(f"Email queued for {email}")
         return True
     except Exception as e:
         logger.error(f"Error in send_otp_email: {str(e)}", exc_info=True)
@@ -54,17 +51,14 @@ def send_otp_confirmed_email(email, first_name=None):
         }
         
         # Fixed path: add 'useraccount/' prefix
-        html_message = render_to_string('useraccount/emails/otp_confirmed.html', context)
+        html_message = render_email('useraccount/emails/otp_confirmed.html', context)
         
-        send_mail(
+        enqueue_email(
+            to=email,
             subject='Tasko: Email Verified Successfully',
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
             html_message=html_message,
-            fail_silently=False,
         )
-        logger.info(f"OTP confirmed email sent to {email}")
+        logger.info(f"OTP confirmed email queued for {email}")
     except Exception as e:
         logger.error(f"Error in send_otp_confirmed_email: {str(e)}", exc_info=True)
         raise
@@ -83,17 +77,14 @@ def send_welcome_complete_email(user):
         }
         
         # Fixed path: add 'useraccount/' prefix
-        html_message = render_to_string('useraccount/emails/welcome_complete.html', context)
+        html_message = render_email('useraccount/emails/welcome_complete.html', context)
         
-        send_mail(
+        enqueue_email(
+            to=user.email,
             subject='Welcome to Tasko! Your Account is Ready 🎉',
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
             html_message=html_message,
-            fail_silently=False,
         )
-        logger.info(f"Welcome email sent to {user.email}")
+        logger.info(f"Welcome email queued for {user.email}")
     except Exception as e:
         logger.error(f"Error in send_welcome_complete_email: {str(e)}", exc_info=True)
         raise
@@ -110,17 +101,14 @@ def send_password_reset_otp(email, otp, first_name=None):
             'year': timezone.now().year,
         }
         
-        html_message = render_to_string('useraccount/emails/password_reset_otp.html', context)
+        html_message = render_email('useraccount/emails/password_reset_otp.html', context)
         
-        send_mail(
+        enqueue_email(
+            to=email,
             subject='Reset Your Tasko Password',
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
             html_message=html_message,
-            fail_silently=False,
         )
-        logger.info(f"Password reset OTP sent to {email}")
+        logger.info(f"Password reset OTP queued for {email}")
         return True
     except Exception as e:
         logger.error(f"Error sending password reset OTP: {str(e)}", exc_info=True)
@@ -136,17 +124,14 @@ def send_password_reset_success(email, first_name=None):
             'year': timezone.now().year,
         }
         
-        html_message = render_to_string('useraccount/emails/password_reset_success.html', context)
+        html_message = render_email('useraccount/emails/password_reset_success.html', context)
         
-        send_mail(
+        enqueue_email(
+            to=email,
             subject='Your Tasko Password Has Been Changed',
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
             html_message=html_message,
-            fail_silently=False,
         )
-        logger.info(f"Password reset success email sent to {email}")
+        logger.info(f"Password reset success email queued for {email}")
         return True
     except Exception as e:
         logger.error(f"Error sending password reset success email: {str(e)}", exc_info=True)
@@ -0,0 +1,123 @@
+"""
+Durable outbox for outgoing email.
+
+Request handlers call ``enqueue_email`` and return immediately; the
+``send_queued_email`` management command delivers due messages in batches
+over a single reused connection and retries failures with exponential
+backoff. A batch is leased to its worker while it is sent, not locked.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+
+from ..models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(to, subject, html_message='', message='', from_email=None):
+    """Store an email for the outbox worker to send"""
+    return OutboundEmail.objects.create(
+        to=to,
+        subject=subject,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        body=message,
+        html_body=html_message,
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before the next try after ``attempts`` failed sends"""
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * (2 ** (attempts - 1))
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=[email.to],
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _claim(batch_size, now):
+    """
+    Lease up to ``batch_size`` due emails to this worker and return them.
+    A leased email is not due again until EMAIL_OUTBOX_LEASE has passed,
+    so one whose worker died is picked up by another.
+    """
+    lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+    due = OutboundEmail.objects.filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+    with transaction.atomic():
+        queryset = due.order_by('next_attempt_at', 'id')
+        if db_connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        ids = list(queryset.values_list('id', flat=True)[:batch_size])
+        # Filtered on due again for databases without row locks, where
+        # another worker may have claimed some of them since
+        due.filter(id__in=ids).update(next_attempt_at=lease_until)
+    return list(OutboundEmail.objects.filter(id__in=ids, next_attempt_at=lease_until)), lease_until
+
+
+def send_pending_batch(batch_size=None, backend=None):
+    """
+    Send one batch of due emails and return (sent, failed) counts.
+
+    The batch is claimed in one short transaction and the results recorded
+    in another, so no transaction or row lock is held while talking to the
+    mail server. All messages in the batch share one open connection.
+    Where the database supports it, rows are claimed with SKIP LOCKED so
+    several workers can drain the outbox at once.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    emails, lease_until = _claim(batch_size, now)
+    if not emails:
+        return 0, 0
+
+    connection = get_connection(backend, fail_silently=False)
+    try:
+        connection.open()
+    except Exception:
+        # Nothing was sent: release the batch so it is retried straight away
+        OutboundEmail.objects.filter(
+            id__in=[email.id for email in emails], next_attempt_at=lease_until,
+        ).update(next_attempt_at=now)
+        raise
+
+    sent = failed = 0
+    try:
+        for email in emails:
+            email.attempts += 1
+            try:
+                _build_message(email, connection).send()
+            except Exception as e:
+                failed += 1
+                email.last_error = str(e)
+                if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    email.status = OutboundEmail.STATUS_FAILED
+                    logger.error(f"Giving up on email {email.id} to {email.to}: {e}")
+                else:
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+                    logger.warning(f"Email {email.id} to {email.to} failed, will retry: {e}")
+            else:
+                sent += 1
+                email.status = OutboundEmail.STATUS_SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+    finally:
+        connection.close()
+
+    OutboundEmail.objects.bulk_update(
+        emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return sent, failed
@@ -1,16 +1,23 @@
-from rest_framework.decorators import api_view, permission_classes, renderer_classes
-from rest_framework.renderers import JSONRenderer, TemplateHTMLRenderer
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
+from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.middleware.csrf import get_token
 from django.shortcuts import render, redirect
-from django.utils import timezone
-from datetime import timedelta
+from todo_web_application.renderers import JSONRenderer
 from .models import *
 from .serializers import *
 from .utils.email_utils import *
+from .otp import RESET, SIGNUP, ExpiredOTP, InvalidOTP, TooManyAttempts, get_otp_store
+from .throttling import (
+    LoginEmailThrottle, LoginIPThrottle, OTPEmailThrottle, OTPIPThrottle, hashing_slot,
+)
+from .tokens import (
+    InvalidToken, issue_tokens, load_refresh_token, refresh_tokens,
+    revoke_access_token, revoke_refresh_token,
+)
 
 # ==================== PAGE RENDERING VIEWS ====================
 
@@ -45,9 +52,10 @@ logger = logging.getLogger(__name__)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @renderer_classes([JSONRenderer])
+@throttle_classes([OTPIPThrottle, OTPEmailThrottle])
 def api_send_otp(request):
     """
-    Step 1: Submit email, generate OTP, store in PendingUser
+    Step 1: Submit email, generate OTP, store it in the OTP store
     """
     try:
         logger.info(f"api_send_otp called with data: {request.data}")
@@ -64,26 +72,16 @@ def api_send_otp(request):
         email = serializer.validated_data['email']
         logger.info(f"Processing OTP request for email: {email}")
         
-        # Generate OTP
-        otp = generate_otp()
-        logger.info(f"Generated OTP for {email}: {otp}")
-        
-        # Store or update pending user
+        # Generate OTP, replacing any earlier one for this email
+        store = get_otp_store()
         try:
-            # Delete any existing pending user
-            PendingUser.objects.filter(email=email).delete()
-            
-            # Create new pending user
-            pending_user = PendingUser.objects.create(
-                email=email,
-                first_name=request.data.get('first_name', ''),
-                last_name=request.data.get('last_name', ''),
-                password='',  # Will be set in complete signup
-                otp=otp
-            )
-            logger.info(f"Created pending user: {pending_user.id} for {email}")
+            otp = store.issue(SIGNUP, email, {
+                'first_name': serializer.validated_data.get('first_name', ''),
+                'last_name': serializer.validated_data.get('last_name', ''),
+            })
+            logger.info(f"Generated OTP for {email}: {otp}")
         except Exception as db_error:
-            logger.error(f"Database error creating pending user: {str(db_error)}")
+            logger.error(f"Error storing OTP: {str(db_error)}")
             return Response({
                 'success': False,
                 'error': 'Failed to create pending user record.'
@@ -95,8 +93,8 @@ def api_send_otp(request):
             logger.info(f"OTP email sent to {email}")
         except Exception as e:
             logger.error(f"Email sending failed: {str(e)}")
-            # Delete pending user if email fails
-            pending_user.delete()
+            # Drop the code if email fails
+            store.discard(SIGNUP, email)
             return Response({
                 'success': False,
                 'error': 'Failed to send email. Please try again.'
@@ -134,26 +132,27 @@ def api_verify_otp(request):
     email = serializer.validated_data['email']
     otp = serializer.validated_data['otp']
     
-    # Check if OTP exists and is valid
+    # Check the OTP; codes expire after OTP_LIFETIME (10 minutes)
     try:
-        pending_user = PendingUser.objects.get(email=email, otp=otp)
-    except PendingUser.DoesNotExist:
+        pending = get_otp_store().verify(SIGNUP, email, otp)
+    except ExpiredOTP:
         return Response({
             'success': False,
-            'error': 'Invalid OTP'
+            'error': 'OTP expired. Please request a new one.'
         }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Check if OTP is expired (10 minutes)
-    time_diff = timezone.now() - pending_user.created_at
-    if time_diff > timedelta(minutes=10):
-        pending_user.delete()
+    except TooManyAttempts:
         return Response({
             'success': False,
-            'error': 'OTP expired. Please request a new one.'
+            'error': 'Too many attempts. Please request a new one.'
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    except InvalidOTP:
+        return Response({
+            'success': False,
+            'error': 'Invalid OTP'
         }, status=status.HTTP_400_BAD_REQUEST)
     
     # Send OTP confirmed email
-    send_otp_confirmed_email(email, pending_user.first_name)
+    send_otp_confirmed_email(email, pending.get('first_name', ''))
     
     return Response({
         'success': True,
@@ -165,6 +164,7 @@ def api_verify_otp(request):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @renderer_classes([JSONRenderer])
+@throttle_classes([OTPIPThrottle, OTPEmailThrottle])
 def api_resend_otp(request):
     """
     Resend OTP to email
@@ -177,22 +177,20 @@ def api_resend_otp(request):
             'error': 'Email is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    try:
-        pending_user = PendingUser.objects.get(email=email)
-    except PendingUser.DoesNotExist:
+    if AppUser.objects.filter(email=email).exists():
         return Response({
             'success': False,
-            'error': 'No pending registration found for this email'
+            'error': 'Email already registered'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Generate new OTP
-    new_otp = generate_otp()
-    pending_user.otp = new_otp
-    pending_user.created_at = timezone.now()  # Reset timer
-    pending_user.save()
+    # Generate new OTP, keeping the details sent with the first one. Expired
+    # codes are gone from the store, so start again without them.
+    store = get_otp_store()
+    pending = store.peek(SIGNUP, email) or {}
+    new_otp = store.issue(SIGNUP, email, pending)
     
     # Send new OTP
-    send_otp_email(email, new_otp, pending_user.first_name)
+    send_otp_email(email, new_otp, pending.get('first_name'))
     
     return Response({
         'success': True,
@@ -217,38 +215,34 @@ def api_complete_signup(request):
     
     email = serializer.validated_data['email']
     
-    # Check if pending user exists
-    try:
-        pending_user = PendingUser.objects.get(email=email)
-    except PendingUser.DoesNotExist:
-        return Response({
-            'success': False,
-            'error': 'No pending registration found. Please start over.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Check if user already exists
-    if AppUser.objects.filter(email=email).exists():
-        pending_user.delete()
-        return Response({
-            'success': False,
-            'error': 'Email already registered'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Create actual user
-    user = AppUser(
-        email=email,
-        first_name=serializer.validated_data['first_name'],
-        last_name=serializer.validated_data['last_name']
-    )
-    user.set_password(serializer.validated_data['password'])
+    # Taken before the code is used up, so a busy server does not cost it
+    with hashing_slot():
+        # Check the email was verified; this uses up the code
+        if get_otp_store().consume(SIGNUP, email) is None:
+            return Response({
+                'success': False,
+                'error': 'No pending registration found. Please start over.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Check if user already exists
+        if AppUser.objects.filter(email=email).exists():
+            return Response({
+                'success': False,
+                'error': 'Email already registered'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Create actual user
+        user = AppUser(
+            email=email,
+            first_name=serializer.validated_data['first_name'],
+            last_name=serializer.validated_data['last_name']
+        )
+        user.set_password(serializer.validated_data['password'])
     user.save()
     
     # Send welcome email
     send_welcome_complete_email(user)
     
-    # Delete pending user
-    pending_user.delete()
-    
     # Set session for auto-login
     request.session['app_user_id'] = user.id
     request.session['app_user_email'] = user.email
@@ -264,7 +258,8 @@ def api_complete_signup(request):
             'last_name': user.last_name,
             'full_name': f"{user.first_name} {user.last_name}".strip(),
             'initials': f"{user.first_name[0] if user.first_name else ''}{user.last_name[0] if user.last_name else ''}"
-        }
+        },
+        'tokens': issue_tokens(user)
     })
 
 
@@ -278,7 +273,8 @@ def api_signup(request):
     serializer = AppUserSignupSerializer(data=request.data)
     
     if serializer.is_valid():
-        user = serializer.save()
+        with hashing_slot():
+            user = serializer.save()
         
         # Set user session
         request.session['app_user_id'] = user.id
@@ -305,13 +301,18 @@ def api_signup(request):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @renderer_classes([JSONRenderer])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def api_login(request):
     """
     REST API endpoint for user login
     """
     serializer = AppUserLoginSerializer(data=request.data)
     
-    if serializer.is_valid():
+    # Validation checks the password hash
+    with hashing_slot():
+        valid = serializer.is_valid()
+    
+    if valid:
         user = serializer.validated_data['user']
         
         # Store comprehensive user data in session
@@ -320,10 +321,7 @@ def api_login(request):
         request.session['app_user_first_name'] = user.first_name
         request.session['app_user_last_name'] = user.last_name
         
-        # Force session save
-        request.session.save()
-        
-        # Set session expiry to 2 weeks
+        # Set session expiry to 2 weeks; SessionMiddleware saves it once
         request.session.set_expiry(1209600)  # 2 weeks in seconds
         
         return Response({
@@ -335,7 +333,8 @@ def api_login(request):
                 'last_name': user.last_name,
                 'full_name': f"{user.first_name} {user.last_name}".strip(),
                 'initials': f"{user.first_name[0] if user.first_name else ''}{user.last_name[0] if user.last_name else ''}"
-            }
+            },
+            'tokens': issue_tokens(user)
         }, status=status.HTTP_200_OK)
     
     return Response({
@@ -415,6 +414,17 @@ def api_get_current_user(request):
 @renderer_classes([JSONRenderer])
 def api_logout(request):
     """REST API endpoint for user logout"""
+    # Token clients: revoke the access token used for this request and,
+    # if one is supplied, the refresh token
+    if isinstance(request.auth, dict):
+        revoke_access_token(request.auth)
+    refresh = request.data.get('refresh')
+    if refresh:
+        try:
+            revoke_refresh_token(load_refresh_token(refresh))
+        except InvalidToken:
+            pass
+    
     request.session.flush()
     return Response({
         'success': True,
@@ -434,6 +444,32 @@ def api_check_session(request):
         }
     })
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@renderer_classes([JSONRenderer])
+def api_token_refresh(request):
+    """Exchange a refresh token for a new access/refresh token pair"""
+    refresh = request.data.get('refresh')
+    
+    if not refresh:
+        return Response({
+            'success': False,
+            'error': 'Refresh token is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        tokens = refresh_tokens(refresh)
+    except InvalidToken as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_401_UNAUTHORIZED)
+    
+    return Response({
+        'success': True,
+        'tokens': tokens
+    })
+
 # ==================== PASSWORD RESET PAGE RENDERING VIEWS ====================
 
 def forgot_password_email_page(request):
@@ -455,6 +491,7 @@ def reset_password_page(request):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @renderer_classes([JSONRenderer])
+@throttle_classes([OTPIPThrottle, OTPEmailThrottle])
 def api_forgot_password_send_otp(request):
     """
     Send OTP for password reset
@@ -473,17 +510,8 @@ def api_forgot_password_send_otp(request):
         # Get user to fetch first_name
         user = AppUser.objects.get(email=email)
         
-        # Generate OTP
-        otp = generate_otp()
-        
-        # Delete any existing password reset for this email
-        PasswordReset.objects.filter(email=email, is_used=False).delete()
-        
-        # Create new password reset record
-        password_reset = PasswordReset.objects.create(
-            email=email,
-            otp=otp
-        )
+        # Generate OTP, replacing any earlier one for this email
+        otp = get_otp_store().issue(RESET, email)
         
         # Send OTP email
         send_password_reset_otp(email, otp, user.first_name)
@@ -530,49 +558,38 @@ def api_forgot_password_verify_otp(request):
     
     logger.info(f"Verifying OTP for email: {email}, OTP: {otp}")
     
+    # Check the code; codes expire after OTP_LIFETIME (10 minutes)
     try:
-        # Find valid password reset record
-        password_reset = PasswordReset.objects.get(
-            email=email,
-            otp=otp,
-            is_used=False
-        )
-        
-        logger.info(f"Found password reset record: {password_reset}")
-        
-        # Check if expired (10 minutes)
-        time_diff = timezone.now() - password_reset.created_at
-        logger.info(f"Time difference: {time_diff.total_seconds()} seconds")
-        
-        if time_diff > timedelta(minutes=10):
-            logger.info(f"OTP expired, deleting record")
-            password_reset.delete()
-            return Response({
-                'success': False,
-                'error': 'Code expired. Please request a new one.'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
+        get_otp_store().verify(RESET, email, otp)
+    except ExpiredOTP:
+        logger.info(f"No live reset code for {email}")
         return Response({
-            'success': True,
-            'message': 'Code verified successfully',
-            'email': email
-        })
-        
-    except PasswordReset.DoesNotExist:
-        logger.error(f"No password reset record found for email: {email}, OTP: {otp}")
-        # Check if any record exists for this email
-        existing = PasswordReset.objects.filter(email=email)
-        if existing.exists():
-            logger.error(f"Existing records for {email}: {list(existing.values())}")
+            'success': False,
+            'error': 'Code expired. Please request a new one.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    except TooManyAttempts:
+        logger.info(f"Too many reset code attempts for {email}")
+        return Response({
+            'success': False,
+            'error': 'Too many attempts. Please request a new code.'
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    except InvalidOTP:
         return Response({
             'success': False,
             'error': 'Invalid verification code'
         }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'success': True,
+        'message': 'Code verified successfully',
+        'email': email
+    })
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 @renderer_classes([JSONRenderer])
+@throttle_classes([OTPIPThrottle, OTPEmailThrottle])
 def api_forgot_password_resend_otp(request):
     """
     Resend OTP for password reset
@@ -588,17 +605,8 @@ def api_forgot_password_resend_otp(request):
     try:
         user = AppUser.objects.get(email=email)
         
-        # Delete old OTP
-        PasswordReset.objects.filter(email=email, is_used=False).delete()
-        
-        # Generate new OTP
-        new_otp = generate_otp()
-        
-        # Create new record
-        password_reset = PasswordReset.objects.create(
-            email=email,
-            otp=new_otp
-        )
+        # Generate new OTP, replacing the old one
+        new_otp = get_otp_store().issue(RESET, email)
         
         # Send email
         send_password_reset_otp(email, new_otp, user.first_name)
@@ -632,27 +640,31 @@ def api_reset_password(request):
     
     email = serializer.validated_data['email']
     
-    try:
-        # Check if there's a verified OTP (optional - you can track this in session)
-        user = AppUser.objects.get(email=email)
+    # Taken before the code is used up, so a busy server does not cost it
+    with hashing_slot():
+        # Only a verified reset code allows setting a new password; this uses it up
+        if get_otp_store().consume(RESET, email) is None:
+            return Response({
+                'success': False,
+                'error': 'Please verify your reset code first.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            user = AppUser.objects.get(email=email)
+        except AppUser.DoesNotExist:
+            return Response({
+                'success': False,
+                'error': 'Account not found'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         # Update password
         user.set_password(serializer.validated_data['password'])
-        user.save()
-        
-        # Mark all password reset records as used
-        PasswordReset.objects.filter(email=email, is_used=False).update(is_used=True)
-        
-        # Send success email
-        send_password_reset_success(email, user.first_name)
-        
-        return Response({
-            'success': True,
-            'message': 'Password reset successfully'
-        })
-        
-    except AppUser.DoesNotExist:
-        return Response({
-            'success': False,
-            'error': 'Account not found'
-        }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+    user.save()
+    
+    # Send success email
+    send_password_reset_success(email, user.first_name)
+    
+    return Response({
+        'success': True,
+        'message': 'Password reset successfully'
+    })
\ No newline at end of file